@@ -0,0 +1,129 @@
+from typing import Callable
+
+
+# Each generator takes a size and returns the text of an nl file stressing one dimension of the converter.
+
+def wide_linear(n: int) -> str:
+    """10 linear constraints and a linear objective over n variables, all in the J and G segments."""
+    n_cons = 10
+    jacobian = [[(j, (i + j) % 7 + 1) for j in range(n)] for i in range(n_cons)]
+    return _nl(n, [], [["n0"] for _ in range(n_cons)], ["n0"], jacobian, [(j, 1) for j in range(n)])
+
+
+def deep_nested(n: int) -> str:
+    """A constraint nesting n operators: sin(x0 + sin(x1 + ...))."""
+    lines = []
+    for i in range(n):
+        lines.extend(("o41", "o0", f"v{i % 10}"))
+    lines.append("n1")
+    return _nl(10, [], [lines], ["n0"])
+
+
+def shared_dag(n: int) -> str:
+    """
+    A chain of n common expressions, each using the previous one twice: the DAG has O(n) nodes, its tree 2^n.
+    """
+    defs = [["o5", "v0", "n2"]]
+    for i in range(1, n):
+        defs.append(["o0", "o2", f"v{10 + i - 1}", f"v{10 + i - 1}", f"v{i % 10}"])
+    return _nl(10, defs, [[f"v{10 + n - 1}"]], ["n0"])
+
+
+def many_defs(n: int) -> str:
+    """n common expressions, each with a linear term and defined on the previous one, and a constraint per def."""
+    defs = [["o5", "v0", "n2"]]
+    for i in range(1, n):
+        defs.append(["o2", "n0.5", "o39", "o15", f"v{10 + i - 1}"])
+    linear = [[(i % 10, 1)] for i in range(n)]
+    return _nl(10, defs, [[f"v{10 + i}"] for i in range(n)], ["n0"], def_linear=linear)
+
+
+def huge_sum(n: int) -> str:
+    """An objective summing n squares with a single o54 operator."""
+    lines = ["o54", str(n)]
+    for i in range(n):
+        lines.extend(("o2", f"n{i % 5 + 1}", "o5", f"v{i}", "n2"))
+    return _nl(n, [], [], lines)
+
+
+GENERATORS: dict[str, Callable[[int], str]] = {
+    "wide_linear": wide_linear,
+    "deep_nested": deep_nested,
+    "shared_dag": shared_dag,
+    "many_defs": many_defs,
+    "huge_sum": huge_sum,
+}
+
+# Sizes of the benchmarked instances; the quick sizes keep a run under a second.
+SIZES = {
+    "wide_linear": 5000,
+    "deep_nested": 100,
+    "shared_dag": 16,
+    "many_defs": 300,
+    "huge_sum": 20000,
+}
+QUICK_SIZES = {
+    "wide_linear": 200,
+    "deep_nested": 50,
+    "shared_dag": 8,
+    "many_defs": 50,
+    "huge_sum": 500,
+}
+
+
+def _nl(n_vars: int, defs: list[list[str]], cons: list[list[str]], obj: list[str],
+        jacobian: list[list[tuple[int, float]]] | None = None, gradient: list[tuple[int, float]] | None = None,
+        def_linear: list[list[tuple[int, float]]] | None = None) -> str:
+    """
+    Assemble an nl file with the given expressions (in prefix notation) and linear parts.
+
+    The instances are meaningful only as workloads: all variables are bounded in [-10, 10] and every constraint body
+    is bounded above by 100.
+    """
+    n_cons = len(cons)
+    jacobian = jacobian if jacobian is not None else [[] for _ in cons]
+    gradient = gradient if gradient is not None else []
+    lines = [
+        "g3 1 1 0\t# synthetic",
+        f" {n_vars} {n_cons} 1 0 0\t# vars, constraints, objectives, ranges, eqns",
+        f" {n_cons} 1\t# nonlinear constraints, objectives",
+        " 0 0\t# network constraints: nonlinear, linear",
+        f" {n_vars} {n_vars} {n_vars}\t# nonlinear vars in constraints, objectives, both",
+        " 0 0 0 1\t# linear network variables; functions; arith, flags",
+        " 0 0 0 0 0\t# discrete variables: binary, integer, nonlinear (b,c,o)",
+        f" {sum(map(len, jacobian))} {len(gradient)}\t# nonzeros in Jacobian, gradients",
+        " 0 0\t# max name lengths: constraints, variables",
+        f" {len(defs)} 0 0 0 0\t# common exprs: b,c,o,c1,o1",
+    ]
+    for i, expression in enumerate(defs):
+        linear = def_linear[i] if def_linear is not None and i < len(def_linear) else []
+        lines.append(f"V{n_vars + i} {len(linear)} 0")
+        lines.extend(f"{j} {c}" for j, c in linear)
+        lines.extend(expression)
+    for i, expression in enumerate(cons):
+        lines.append(f"C{i}")
+        lines.extend(expression)
+    lines.append("O0 0")
+    lines.extend(obj)
+    if cons:
+        lines.append("r")
+        lines.extend("1 100" for _ in cons)
+    lines.append("b")
+    lines.extend("0 -10 10" for _ in range(n_vars))
+    counts = [0] * n_vars
+    for row in jacobian:
+        for j, _ in row:
+            counts[j] += 1
+    lines.append(f"k{n_vars - 1}")
+    total = 0
+    for j in range(n_vars - 1):
+        total += counts[j]
+        lines.append(str(total))
+    for i, row in enumerate(jacobian):
+        if row:
+            lines.append(f"J{i} {len(row)}")
+            lines.extend(f"{j} {c}" for j, c in row)
+    if gradient:
+        lines.append(f"G0 {len(gradient)}")
+        lines.extend(f"{j} {c}" for j, c in gradient)
+    return "\n".join(lines) + "\n"
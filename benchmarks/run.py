@@ -0,0 +1,44 @@
+import argparse as ap
+import json
+import sys
+
+from benchmarks.generators import GENERATORS
+from benchmarks.suite import run, check_regressions
+
+
+def parse_args():
+    parser = ap.ArgumentParser(description="Run the ampl2omt benchmarks, optionally checking them against a baseline")
+    parser.add_argument("--quick", action="store_true", help="Use small instances, for a smoke run")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions of each benchmark (default: 3)")
+    parser.add_argument("--only", type=str, default=None, metavar="GENERATORS",
+                        help=f"Comma-separated generators to run end to end, skipping the micro-benchmarks, "
+                             f"among {','.join(GENERATORS)}")
+    parser.add_argument("--save", type=str, default=None, metavar="PATH", help="Save the report as JSON")
+    parser.add_argument("--baseline", type=str, default=None, metavar="PATH",
+                        help="Compare against a JSON baseline, exiting with status 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=1.5,
+                        help="Ratio to the baseline above which a benchmark regressed (default: 1.5)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    report = run(args.quick, args.repeat, None if args.only is None else args.only.split(","))
+    width = max(map(len, report["results"]), default=0)
+    for name, m in report["results"].items():
+        print(f"{name:<{width}}  {m['seconds'] * 1000:10.2f} ms  {m['peak_bytes'] / 2 ** 20:8.2f} MiB")
+    if args.save is not None:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = check_regressions(report, baseline, args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from typing import Callable
+
+from ampl2omt.parsing.nlparser import NLParser
+from ampl2omt.term.manager import TermManager
+from ampl2omt.term.term import Term, topo_sort, topo_sort_all
+from ampl2omt.term.types import PLUS
+from ampl2omt.writing.smtlibwriter import SmtlibWriter
+from benchmarks.generators import GENERATORS, SIZES, QUICK_SIZES
+
+# The number of terms created and sorted by the micro-benchmarks.
+MICRO_SIZE = 50000
+QUICK_MICRO_SIZE = 2000
+# The numbers of threads sharing a manager in the scaling benchmark.
+THREADS = (1, 2, 4)
+# Iterations of the calibration loop, whose time is the unit of the normalized timings.
+CALIBRATION_LOOPS = 200000
+# Timings below this many seconds are too noisy to be compared against a baseline.
+MIN_SECONDS = 1e-2
+# Likewise for peak memory below this many bytes.
+MIN_BYTES = 1 << 16
+
+
+@dataclass
+class Measurement:
+    """The best time of a benchmark over the repetitions, and its peak memory (in a separate, traced run)."""
+    seconds: float
+    peak_bytes: int
+
+
+def calibrate(repeat: int = 5) -> float:
+    """
+    Time a fixed pure-Python loop, so that timings taken on different machines can be compared.
+
+    :param repeat: The number of repetitions.
+    :return: The best time of the loop, in seconds.
+    """
+
+    def loop():
+        total = 0
+        for i in range(CALIBRATION_LOOPS):
+            total += i % 7
+        return total
+
+    return best_time(loop, repeat)
+
+
+def best_time(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(fn: Callable[[], object]) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure(fn: Callable[[], object], repeat: int) -> Measurement:
+    return Measurement(best_time(fn, repeat), peak_memory(fn))
+
+
+def _chain(mgr: TermManager, n: int, prefix: str = "x") -> Term:
+    """A chain of n sums over 100 variables: ((x0 + x1) + x2) + ..."""
+    variables = [mgr.VarReal(f"{prefix}{i}") for i in range(100)]
+    plus = mgr.term_type(PLUS)
+    term = variables[0]
+    for i in range(1, n + 1):
+        term = mgr.create(plus, (term, variables[i % 100]))
+    return term
+
+
+def micro_benchmarks(n: int, repeat: int) -> dict[str, Measurement]:
+    """
+    Benchmark the creation of terms, new and already cached, also from several threads sharing a manager, the
+    topological sorts of a chain of n terms and its import into another manager.
+
+    :param n: The number of terms.
+    :param repeat: The number of repetitions of each benchmark.
+    :return: The measurements, by name.
+    """
+    results = {"create_new": measure(lambda: _chain(TermManager(), n), repeat)}
+    mgr = TermManager()
+    term = _chain(mgr, n)
+    results["create_cached"] = measure(lambda: _chain(mgr, n), repeat)
+    results["topo_sort"] = measure(lambda: sum(1 for _ in topo_sort(term)), repeat)
+    results["topo_sort_all"] = measure(lambda: sum(1 for _ in topo_sort_all([term, term.children[0]])), repeat)
+    results["import_terms"] = measure(lambda: TermManager().import_terms(mgr, [term]), repeat)
+    for n_threads in THREADS:
+        results[f"create_threads.{n_threads}"] = measure(lambda: _threaded_chains(n, n_threads), repeat)
+    return results
+
+
+def _threaded_chains(n: int, n_threads: int) -> TermManager:
+    """
+    Create n terms on a shared manager from n_threads threads, each building a chain on its own variables.
+
+    The total work does not depend on the number of threads, so the times show how creation scales: on builds with
+    the GIL, they can only get worse with more threads.
+    """
+    mgr = TermManager()
+    threads = [threading.Thread(target=_chain, args=(mgr, n // n_threads, f"t{t}_")) for t in range(n_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return mgr
+
+
+def end_to_end(sizes: dict[str, int], repeat: int, only: list[str] | None = None) -> dict[str, Measurement]:
+    """
+    Benchmark parsing the generated nl instances and writing them as daggified SMT-LIB scripts.
+
+    :param sizes: The size of the instance of each generator.
+    :param repeat: The number of repetitions of each benchmark.
+    :param only: The generators to run, all if None.
+    :return: The measurements, named <generator>.parse and <generator>.write.
+    """
+    results = {}
+    for name, generator in GENERATORS.items():
+        if only is not None and name not in only:
+            continue
+        text = generator(sizes[name])
+        results[f"{name}.parse"] = measure(lambda: NLParser(TermManager()).parse_string(text), repeat)
+        problem = NLParser(TermManager()).parse_string(text)
+        results[f"{name}.write"] = measure(lambda: SmtlibWriter().to_smtlib(problem, daggify=True), repeat)
+    return results
+
+
+def run(quick=False, repeat: int = 3, only: list[str] | None = None) -> dict:
+    """
+    Run the benchmark suite.
+
+    :param quick: Whether to use the small instances, for a smoke run.
+    :param repeat: The number of repetitions of each benchmark.
+    :param only: The generators to run end to end, all if None; the micro-benchmarks are run only if None.
+    :return: The report: the calibration time, the sizes and the measurements by name, as JSON-serializable data.
+    """
+    sizes = QUICK_SIZES if quick else SIZES
+    results = {}
+    if only is None:
+        results.update(micro_benchmarks(QUICK_MICRO_SIZE if quick else MICRO_SIZE, repeat))
+    results.update(end_to_end(sizes, repeat, only))
+    return {
+        "calibration": calibrate(),
+        "quick": quick,
+        "sizes": dict(sizes),
+        "results": {name: asdict(m) for name, m in results.items()},
+    }
+
+
+def check_regressions(report: dict, baseline: dict, threshold: float = 1.5) -> list[str]:
+    """
+    Compare a report against a baseline, with times normalized by the calibration of each run.
+
+    Benchmarks missing from either report, and timings (peaks) below MIN_SECONDS (MIN_BYTES) in both, are not
+    compared; reports taken with different sizes cannot be compared at all.
+
+    :param report: The report of the current run.
+    :param baseline: The report of the baseline run.
+    :param threshold: The ratio to the baseline above which a time or a peak memory is a regression.
+    :return: A description of each regression.
+    """
+    if report["sizes"] != baseline["sizes"]:
+        raise ValueError("The report and the baseline were run with different sizes")
+    regressions = []
+    for name, current in report["results"].items():
+        if name not in baseline["results"]:
+            continue
+        previous = baseline["results"][name]
+        if max(current["seconds"], previous["seconds"]) >= MIN_SECONDS:
+            ratio = (current["seconds"] / report["calibration"]) / (previous["seconds"] / baseline["calibration"])
+            if ratio > threshold:
+                regressions.append(f"{name}: time {ratio:.2f}x the baseline")
+        if max(current["peak_bytes"], previous["peak_bytes"]) >= MIN_BYTES and previous["peak_bytes"] > 0:
+            ratio = current["peak_bytes"] / previous["peak_bytes"]
+            if ratio > threshold:
+                regressions.append(f"{name}: peak memory {ratio:.2f}x the baseline")
+    return regressions
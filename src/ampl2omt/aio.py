@@ -0,0 +1,78 @@
+import asyncio
+from collections.abc import Callable, Iterable
+from concurrent.futures import Executor
+from typing import TypeVar
+
+from ampl2omt.progress import CancelToken
+from ampl2omt.streams import open_input, open_output
+
+T = TypeVar("T")
+
+# The number of characters read or written at a time by the asynchronous I/O, between which the event loop runs.
+CHUNK_SIZE = 1 << 20
+
+
+async def read_text(path: str, compression: str | None = None, chunk_size: int = CHUNK_SIZE) -> str:
+    """
+    Read a text input without blocking the event loop: the input is opened, decompressed and read in chunks in
+    worker threads, and the event loop runs between the chunks.
+
+    :param path: The path, or - for the standard input.
+    :param compression: The compression of the input, detected from its content if None (see open_input).
+    :param chunk_size: The number of characters read at a time.
+    :return: The content of the input.
+    """
+    context = open_input(path, compression)
+    stream = await asyncio.to_thread(context.__enter__)
+    chunks = []
+    try:
+        while chunk := await asyncio.to_thread(stream.read, chunk_size):
+            chunks.append(chunk)
+    finally:
+        await asyncio.to_thread(context.__exit__, None, None, None)
+    return "".join(chunks)
+
+
+async def write_text(path: str, parts: Iterable[str], compression: str | None = None,
+                     chunk_size: int = CHUNK_SIZE) -> None:
+    """
+    Write a text output without blocking the event loop: the output is opened, compressed and written in chunks in
+    worker threads, and the event loop runs between the chunks.
+
+    :param path: The path, or - for the standard output.
+    :param parts: The parts of the content, written one after the other.
+    :param compression: The compression of the output, given by the extension of the path if None (see open_output).
+    :param chunk_size: The number of characters written at a time.
+    """
+    context = open_output(path, compression)
+    stream = await asyncio.to_thread(context.__enter__)
+    try:
+        for part in parts:
+            for start in range(0, len(part), chunk_size):
+                await asyncio.to_thread(stream.write, part[start:start + chunk_size])
+    finally:
+        await asyncio.to_thread(context.__exit__, None, None, None)
+
+
+async def run_cancellable(executor: Executor | None, fn: Callable[..., T], *args,
+                          token: CancelToken | None = None) -> T:
+    """
+    Run a function in an executor, cancelling its token when the awaiting task is cancelled.
+
+    A function running in a thread cannot be interrupted: it gets a CancelToken as keyword argument token, and is
+    expected to check it regularly and stop early (see ampl2omt.progress), so that the thread is released.
+
+    :param executor: The executor, the default one of the event loop if None. Its workers must share the memory of
+        the caller, e.g. a ThreadPoolExecutor, as terms belong to the manager of the process that created them.
+    :param fn: The function.
+    :param args: The arguments of the function.
+    :param token: The token given to the function, e.g. with a deadline; a new token if None.
+    :return: The result of the function.
+    """
+    token = token if token is not None else CancelToken()
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(executor, lambda: fn(*args, token=token))
+    except asyncio.CancelledError:
+        token.cancel()
+        raise
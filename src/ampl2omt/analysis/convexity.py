@@ -0,0 +1,199 @@
+from enum import IntFlag
+
+from ampl2omt.analysis.interval import Interval, IntervalEvaluator
+from ampl2omt.term.term import Term, topo_sort_all, is_var, is_const
+from ampl2omt.term.types import NEG, PLUS, MINUS, SUM, MULT, DIV, POW, ABS, MIN, MAX, EXP, LOG, LOG10, SQRT, COSH, \
+    SINH, TANH, ATAN, ASINH, LT, LE, EQ, GE, GT
+
+
+class Curvature(IntFlag):
+    """
+    The curvature of a term, as a set of properties: an affine term is both convex and concave.
+    """
+    UNKNOWN = 0
+    CONVEX = 1
+    CONCAVE = 2
+    AFFINE = CONVEX | CONCAVE
+
+
+# Monotonicity of a function on the range of its argument.
+INCREASING = 1
+DECREASING = -1
+NON_MONOTONE = 0
+
+
+def _flip(c: Curvature) -> Curvature:
+    """The curvature of -t, given the one of t."""
+    return Curvature((Curvature.CONVEX if c & Curvature.CONCAVE else 0)
+                     | (Curvature.CONCAVE if c & Curvature.CONVEX else 0))
+
+
+def _scale(c: Curvature, factor: Interval) -> Curvature:
+    """The curvature of k * t, given the one of t and the range of the variable-free factor k."""
+    if factor.lo >= 0:
+        return c
+    if factor.hi <= 0:
+        return _flip(c)
+    return c if c == Curvature.AFFINE else Curvature.UNKNOWN
+
+
+def _compose(shape: Curvature, monotonicity: int, arg: Curvature) -> Curvature:
+    """
+    The curvature of f(g), given the curvature and monotonicity of f on the range of g, and the curvature of g.
+
+    These are the composition rules of disciplined convex programming.
+    """
+    if arg == Curvature.AFFINE:
+        return shape & Curvature.AFFINE
+    result = Curvature.UNKNOWN
+    if shape & Curvature.CONVEX and ((monotonicity == INCREASING and arg & Curvature.CONVEX)
+                                     or (monotonicity == DECREASING and arg & Curvature.CONCAVE)):
+        result |= Curvature.CONVEX
+    if shape & Curvature.CONCAVE and ((monotonicity == INCREASING and arg & Curvature.CONCAVE)
+                                      or (monotonicity == DECREASING and arg & Curvature.CONVEX)):
+        result |= Curvature.CONCAVE
+    return result
+
+
+def _sign_monotonicity(arg: Interval) -> int:
+    """Monotonicity of an even function (e.g. |t|, t^2) decreasing on the negatives, on the range of its argument."""
+    if arg.lo >= 0:
+        return INCREASING
+    if arg.hi <= 0:
+        return DECREASING
+    return NON_MONOTONE
+
+
+def _odd(arg: Interval, on_positives: Curvature) -> tuple[Curvature, int]:
+    """Shape of an increasing odd function with the given curvature on the positives, on the range of its argument."""
+    if arg.lo >= 0:
+        return on_positives, INCREASING
+    if arg.hi <= 0:
+        return _flip(on_positives), INCREASING
+    return Curvature.UNKNOWN, INCREASING
+
+
+def _power(arg: Interval, p: float) -> tuple[Curvature, int]:
+    """Shape of t^p for a constant exponent p, on the range of t."""
+    if p == 0:
+        return Curvature.AFFINE, NON_MONOTONE
+    if p == 1:
+        return Curvature.AFFINE, INCREASING
+    if p.is_integer() and int(p) % 2 == 0 and p > 0:
+        return Curvature.CONVEX, _sign_monotonicity(arg)
+    if p.is_integer() and p > 0:
+        return _odd(arg, Curvature.CONVEX)
+    if p < 0:
+        # t^p is convex on the positives; on the negatives it is only defined for integer p
+        if arg.lo > 0:
+            return Curvature.CONVEX, DECREASING
+        if arg.hi < 0 and p.is_integer():
+            return (Curvature.CONVEX, INCREASING) if int(p) % 2 == 0 else (Curvature.CONCAVE, DECREASING)
+        return Curvature.UNKNOWN, NON_MONOTONE
+    # fractional exponent: only defined on the non-negatives
+    return (Curvature.CONVEX if p > 1 else Curvature.CONCAVE), INCREASING
+
+
+# Shape of unary functions on the range of their argument: (curvature, monotonicity).
+_UNARY = {
+    EXP: lambda arg: (Curvature.CONVEX, INCREASING),
+    LOG: lambda arg: (Curvature.CONCAVE, INCREASING),
+    LOG10: lambda arg: (Curvature.CONCAVE, INCREASING),
+    SQRT: lambda arg: (Curvature.CONCAVE, INCREASING),
+    ABS: lambda arg: (Curvature.CONVEX, _sign_monotonicity(arg)),
+    COSH: lambda arg: (Curvature.CONVEX, _sign_monotonicity(arg)),
+    SINH: lambda arg: _odd(arg, Curvature.CONVEX),
+    TANH: lambda arg: _odd(arg, Curvature.CONCAVE),
+    ATAN: lambda arg: _odd(arg, Curvature.CONCAVE),
+    ASINH: lambda arg: _odd(arg, Curvature.CONCAVE),
+}
+
+
+def curvatures(roots: list[Term], bounds: dict[Term, Interval] | None = None) -> dict[Term, Curvature]:
+    """
+    Syntactically detect the curvature of every node of the DAG rooted at roots, visiting shared nodes once.
+
+    The detection applies the composition rules of disciplined convex programming, using the variable bounds to
+    determine the sign of factors and the monotonicity of functions on the range of their arguments.
+    It is sound but incomplete: a term detected as convex is convex on the domain given by bounds (where defined),
+    but a convex term may be reported as UNKNOWN.
+
+    :param roots: The terms to analyze.
+    :param bounds: The bounds of the variables, unbounded if missing.
+    :return: The curvature of each node.
+    """
+    evaluator = IntervalEvaluator(bounds)
+    curvature: dict[Term, Curvature] = {}
+    constant: set[Term] = set()
+    for node in topo_sort_all(roots):
+        evaluator.values[node] = evaluator.evaluate_node(node)
+        if is_var(node):
+            curvature[node] = Curvature.AFFINE
+            continue
+        if is_const(node) or all(c in constant for c in node.children):
+            constant.add(node)
+            curvature[node] = Curvature.AFFINE
+            continue
+        curvature[node] = _curvature(node, curvature, constant, evaluator.values)
+    return curvature
+
+
+def _curvature(node: Term, curvature: dict[Term, Curvature], constant: set[Term],
+               values: dict[Term, Interval]) -> Curvature:
+    type_id = node.term_type.id
+    children = node.children
+    if type_id in (PLUS, SUM):
+        result = Curvature.AFFINE
+        for c in children:
+            result &= curvature[c]
+        return result
+    if type_id == MINUS:
+        return curvature[children[0]] & _flip(curvature[children[1]])
+    if type_id == NEG:
+        return _flip(curvature[children[0]])
+    if type_id == MULT:
+        a, b = children
+        if a in constant:
+            return _scale(curvature[b], values[a])
+        if b in constant:
+            return _scale(curvature[a], values[b])
+        return Curvature.UNKNOWN
+    if type_id == DIV:
+        a, b = children
+        if b in constant:
+            return _scale(curvature[a], values[b].reciprocal())
+        if a in constant:
+            # k / t = k * t^-1
+            return _scale(_compose(*_power(values[b], -1.), curvature[b]), values[a])
+        return Curvature.UNKNOWN
+    if type_id == POW:
+        a, b = children
+        if b in constant and values[b].is_point():
+            return _compose(*_power(values[a], values[b].lo), curvature[a])
+        if a in constant and values[a].is_point() and values[a].lo > 0:
+            # k^t = exp(t log k)
+            k = values[a].lo
+            shape = Curvature.AFFINE if k == 1 else Curvature.CONVEX
+            return _compose(shape, INCREASING if k > 1 else DECREASING, curvature[b])
+        return Curvature.UNKNOWN
+    if type_id == MAX:
+        return Curvature.CONVEX if all(curvature[c] & Curvature.CONVEX for c in children) else Curvature.UNKNOWN
+    if type_id == MIN:
+        return Curvature.CONCAVE if all(curvature[c] & Curvature.CONCAVE for c in children) else Curvature.UNKNOWN
+    if type_id in _UNARY:
+        child, = children
+        return _compose(*_UNARY[type_id](values[child]), curvature[child])
+    return Curvature.UNKNOWN
+
+
+def constraint_curvature(constraint: Term, curvature: dict[Term, Curvature]) -> Curvature:
+    """
+    The curvature of the body a - b of a comparison a <op> b, or UNKNOWN if constraint is not a comparison.
+
+    :param constraint: The constraint.
+    :param curvature: The curvature of the nodes of the constraint, as computed by curvatures.
+    """
+    if constraint.term_type.id not in (LT, LE, EQ, GE, GT):
+        return Curvature.UNKNOWN
+    a, b = constraint.children
+    return curvature[a] & _flip(curvature[b])
@@ -0,0 +1,136 @@
+from dataclasses import dataclass
+
+from ampl2omt.problem.objective import Objective
+from ampl2omt.problem.problem import NLPProblem
+from ampl2omt.term.manager import TermManager
+from ampl2omt.term.term import Term, topo_sort_all, is_var
+from ampl2omt.term.types import PLUS, MINUS, SUM, NEG
+
+
+class UnionFind:
+    """Disjoint sets with union by size and path halving."""
+
+    def __init__(self, elements):
+        self.parent = {e: e for e in elements}
+        self.size = {e: 1 for e in self.parent}
+
+    def find(self, e):
+        parent = self.parent
+        while parent[e] is not e:
+            parent[e] = parent[parent[e]]
+            e = parent[e]
+        return e
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a is b:
+            return a
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        return a
+
+
+@dataclass
+class Decomposition:
+    """
+    A problem split into independent components.
+
+    Each component is a problem over a disjoint set of variables. Every objective of the original problem is the sum
+    of the homonymous objectives of the components, so the solutions of the components can be merged into a solution
+    of the original problem, adding up the objective values.
+
+    :param components: The independent subproblems.
+    """
+    components: list[NLPProblem]
+
+
+def separable_parts(mgr: TermManager, term: Term) -> list[Term]:
+    """
+    Split a term into addends, looking through sums, differences and negations.
+
+    :param mgr: The term manager.
+    :param term: The term to split.
+    :return: The addends, whose sum is equal to term.
+    """
+    parts = []
+    stack = [(term, False)]
+    while stack:
+        node, negated = stack.pop()
+        type_id = node.term_type.id
+        if type_id in (PLUS, SUM):
+            stack.extend((c, negated) for c in reversed(node.children))
+        elif type_id == MINUS:
+            stack.append((node.children[1], not negated))
+            stack.append((node.children[0], negated))
+        elif type_id == NEG:
+            stack.append((node.children[0], not negated))
+        else:
+            parts.append(mgr.Neg(node) if negated else node)
+    return parts
+
+
+def decompose(mgr: TermManager, problem: NLPProblem) -> Decomposition:
+    """
+    Detect the independent components of a problem.
+
+    Two variables are in the same component if they occur together in a constraint or in an addend of an objective.
+    Constraints and addends without variables, as well as unused variables, are assigned to the first component.
+
+    :param mgr: The term manager of the problem.
+    :param problem: The problem to decompose.
+    :return: The decomposition of the problem.
+    """
+    objective_parts = [separable_parts(mgr, o.term) for o in problem.objectives]
+    uf = UnionFind(problem.variables)
+    # a variable occurring in each node, if any, after merging all the variables below it
+    representative: dict[Term, Term | None] = {}
+    roots = problem.constraints + [p for parts in objective_parts for p in parts]
+    for node in topo_sort_all(roots):
+        if is_var(node):
+            representative[node] = node
+            continue
+        reps = [r for r in (representative[c] for c in node.children) if r is not None]
+        for r in reps[1:]:
+            uf.union(reps[0], r)
+        representative[node] = reps[0] if reps else None
+
+    index: dict[Term, int] = {}
+    for v in problem.variables:
+        if v in representative:
+            index.setdefault(uf.find(v), len(index))
+    n_components = max(len(index), 1)
+
+    def component_of(term: Term) -> int:
+        r = representative.get(term)
+        return index[uf.find(r)] if r is not None else 0
+
+    variables: list[list[Term]] = [[] for _ in range(n_components)]
+    for v in problem.variables:
+        variables[component_of(v)].append(v)
+
+    constraints: list[list[Term]] = [[] for _ in range(n_components)]
+    for c in problem.constraints:
+        constraints[component_of(c)].append(c)
+
+    objectives: list[list[Objective]] = [[] for _ in range(n_components)]
+    for o, parts in zip(problem.objectives, objective_parts):
+        addends: list[list[Term]] = [[] for _ in range(n_components)]
+        for p in parts:
+            addends[component_of(p)].append(p)
+        for i, a in enumerate(addends):
+            term = mgr.Real(0) if not a else a[0] if len(a) == 1 else mgr.Sum(a)
+            objectives[i].append(Objective(o.kind, term))
+
+    # the primal initial guess follows the variables; dual guesses refer to the original constraints and are dropped
+    position = {v: i for i, v in enumerate(problem.variables)}
+    guesses: list[dict[int, float]] = [{} for _ in range(n_components)]
+    for i in range(n_components):
+        for j, v in enumerate(variables[i]):
+            if position[v] in problem.primal_initial_guess:
+                guesses[i][j] = problem.primal_initial_guess[position[v]]
+
+    return Decomposition([NLPProblem(variables=variables[i], objectives=objectives[i], constraints=constraints[i],
+                                     primal_initial_guess=guesses[i])
+                          for i in range(n_components)])
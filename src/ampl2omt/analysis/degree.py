@@ -0,0 +1,144 @@
+from collections import Counter
+from dataclasses import dataclass
+from enum import IntEnum
+
+from ampl2omt.problem.problem import NLPProblem
+from ampl2omt.term.term import Term, topo_sort_all, is_var, is_const
+from ampl2omt.term.types import NEG, PLUS, MINUS, SUM, MULT, DIV, POW, ABS, MIN, MAX, NOT, OR, AND, IF, IMPLIES, \
+    IFF, ANDN, ORN, LT, LE, EQ, GE, GT, NE, REAL, INT
+
+
+class Degree(IntEnum):
+    """
+    The degree class of a term, from the simplest to the most general.
+
+    POLYNOMIAL also covers rational functions (division by non-constant terms), as they are still expressible in
+    nonlinear real arithmetic.
+    TRANSCENDENTAL covers every other operator (exp, sin, floor, ...), even on constant arguments.
+    """
+    CONSTANT = 0
+    LINEAR = 1
+    QUADRATIC = 2
+    POLYNOMIAL = 3
+    TRANSCENDENTAL = 4
+
+
+LOGICS = {
+    Degree.CONSTANT: "QF_LRA",
+    Degree.LINEAR: "QF_LRA",
+    Degree.QUADRATIC: "QF_NRA",
+    Degree.POLYNOMIAL: "QF_NRA",
+    Degree.TRANSCENDENTAL: "QF_NRAT",
+}
+
+# Internal degrees: exact for polynomials, then two markers larger than any polynomial degree.
+RATIONAL = 1 << 62
+NON_ALGEBRAIC = 1 << 63
+
+# Operators whose degree is the maximum degree of their children.
+_PIECEWISE = {NEG, PLUS, MINUS, SUM, ABS, MIN, MAX, NOT, OR, AND, IF, IMPLIES, IFF, ANDN, ORN, LT, LE, EQ, GE, GT, NE}
+
+
+def degree_class(degree: int) -> Degree:
+    """The degree class of an internal degree, as computed by degrees."""
+    if degree >= NON_ALGEBRAIC:
+        return Degree.TRANSCENDENTAL
+    return Degree(min(degree, Degree.POLYNOMIAL))
+
+
+def _mult(a: int, b: int) -> int:
+    if max(a, b) >= RATIONAL:
+        return max(a, b)
+    return min(a + b, RATIONAL - 1)
+
+
+def _pow(base: int, exponent: Term) -> int:
+    if exponent.term_type.id in (REAL, INT) and float(exponent.payload).is_integer():
+        k = int(exponent.payload)
+        if base == 0:
+            return 0
+        if base >= RATIONAL:
+            return base
+        if k >= 0:
+            return min(base * k, RATIONAL - 1)
+        return RATIONAL
+    return NON_ALGEBRAIC
+
+
+def degrees(roots: list[Term]) -> dict[Term, int]:
+    """
+    Compute the internal degree of every node of the DAG rooted at roots, visiting shared nodes once.
+
+    Polynomials get their exact degree, rational functions RATIONAL and anything else NON_ALGEBRAIC.
+    """
+    degree: dict[Term, int] = {}
+    for node in topo_sort_all(roots):
+        degree[node] = node_degree(node, [degree[c] for c in node.children])
+    return degree
+
+
+def node_degree(node: Term, children: list[int]) -> int:
+    """The internal degree of a node, given those of its children (see degrees)."""
+    if is_var(node):
+        return 1
+    if is_const(node):
+        return 0
+    type_id = node.term_type.id
+    if type_id in _PIECEWISE:
+        return max(children)
+    if type_id == MULT:
+        return _mult(*children)
+    if type_id == DIV:
+        numerator, denominator = children
+        return numerator if denominator == 0 else max(numerator, denominator, RATIONAL)
+    if type_id == POW:
+        return _pow(children[0], node.children[1])
+    return NON_ALGEBRAIC
+
+
+@dataclass
+class DegreeReport:
+    """
+    The degree class of each constraint and objective of a problem.
+
+    :param constraints: The degree class of each constraint.
+    :param objectives: The degree class of each objective.
+    """
+    constraints: list[Degree]
+    objectives: list[Degree]
+
+    @property
+    def degree(self) -> Degree:
+        """The degree class of the whole problem."""
+        return max(self.constraints + self.objectives, default=Degree.CONSTANT)
+
+    @property
+    def logic(self) -> str:
+        """The tightest SMT-LIB logic the problem can be expressed in."""
+        return LOGICS[self.degree]
+
+    def __str__(self):
+        constraints = Counter(self.constraints)
+        objectives = Counter(self.objectives)
+        lines = [f"logic: {self.logic}", f"{'degree':<16}{'constraints':>12}{'objectives':>12}"]
+        for d in Degree:
+            lines.append(f"{d.name.lower():<16}{constraints[d]:>12}{objectives[d]:>12}")
+        return "\n".join(lines)
+
+
+def classify(problem: NLPProblem) -> DegreeReport:
+    """
+    Classify the constraints and objectives of a problem by degree.
+
+    The report is cached on the problem, and recomputed only if the problem changes.
+    """
+    return problem.cached("degrees", lambda: _classify(problem))
+
+
+def _classify(problem: NLPProblem) -> DegreeReport:
+    objectives = [o.term for o in problem.objectives]
+    degree = degrees(problem.constraints + objectives)
+    return DegreeReport(
+        constraints=[degree_class(degree[c]) for c in problem.constraints],
+        objectives=[degree_class(degree[o]) for o in objectives],
+    )
@@ -0,0 +1,297 @@
+import math
+import time
+from dataclasses import dataclass, field
+
+from ampl2omt.analysis.interval import Interval, IntervalEvaluator, EXTENSIONS, TRUE, FALSE, INF, NON_NEGATIVE
+from ampl2omt.problem.problem import NLPProblem
+from ampl2omt.term.manager import TermManager
+from ampl2omt.term.term import Term, topo_sort_all
+from ampl2omt.term.types import NEG, PLUS, MINUS, MULT, DIV, POW, SUM, SQRT, EXP, LOG, LOG10, TANH, SINH, ASINH, \
+    ATANH, ATAN, ABS, MIN, MAX, LT, LE, EQ, GE, GT, NOT, AND, ANDN, OR, ORN, IF, IFS, IMPLIES
+
+
+@dataclass
+class FBBTResult:
+    """
+    The outcome of feasibility-based bound tightening.
+
+    :param bounds: The tightened bounds of each problem variable.
+    :param objective_bounds: The bounds derived for each objective, in the order of the problem objectives.
+    :param iterations: The number of propagation sweeps performed.
+    :param infeasible: Whether propagation proved the constraints to be infeasible.
+    :param converged: Whether a fixpoint was reached within the budget.
+    """
+    bounds: dict[Term, Interval]
+    objective_bounds: list[Interval] = field(default_factory=list)
+    iterations: int = 0
+    infeasible: bool = False
+    converged: bool = False
+
+
+class FBBT:
+    """
+    Feasibility-based bound tightening.
+
+    Alternates forward interval evaluation and backward propagation of the constraints over the shared term DAG,
+    until the variable bounds stop improving or the iteration/time budget is exhausted.
+
+    Backward propagation (including the domains of functions such as sqrt and log) only goes through the nodes that
+    are evaluated whenever the constraints hold, e.g. not through the branches of an ite or the operands of a
+    disjunction, which may be undefined at feasible points.
+
+    :param max_iter: The maximum number of propagation sweeps.
+    :param time_limit: The maximum time in seconds, or None for no limit.
+    :param tol: The minimum (relative) improvement of a bound to keep iterating.
+    """
+
+    def __init__(self, max_iter: int = 10, time_limit: float | None = None, tol: float = 1e-6):
+        self.max_iter = max_iter
+        self.time_limit = time_limit
+        self.tol = tol
+
+    def run(self, problem: NLPProblem) -> FBBTResult:
+        start = time.perf_counter()
+        order = list(topo_sort_all(problem.constraints))
+        bounds = {v: Interval.entire() for v in problem.variables}
+        result = FBBTResult(bounds)
+        while result.iterations < self.max_iter and not self._timed_out(start):
+            result.iterations += 1
+            values = self._forward(order, bounds)
+            for c in problem.constraints:
+                values[c] = values[c].intersect(TRUE)
+            # parents come before their children: a node is evaluated once one of its evaluated parents evaluates it
+            evaluated = set(problem.constraints)
+            for node in reversed(order):
+                if node not in evaluated:
+                    continue
+                if values[node].is_empty():
+                    result.infeasible = True
+                    return result
+                self._backward(node, values)
+                evaluated.update(_evaluated_children(node, values))
+            improved = False
+            for v in bounds:
+                if v not in values:
+                    continue
+                new = values[v].intersect(bounds[v])
+                if new.is_empty():
+                    result.infeasible = True
+                    return result
+                improved = improved or self._improves(new, bounds[v])
+                bounds[v] = new
+            if not improved:
+                result.converged = True
+                break
+
+        evaluator = IntervalEvaluator(bounds)
+        result.objective_bounds = [evaluator.evaluate(o.term) for o in problem.objectives]
+        return result
+
+    def _timed_out(self, start: float) -> bool:
+        return self.time_limit is not None and time.perf_counter() - start > self.time_limit
+
+    def _improves(self, new: Interval, old: Interval) -> bool:
+        return (new.lo - old.lo > self.tol * max(1., abs(new.lo))
+                or old.hi - new.hi > self.tol * max(1., abs(new.hi)))
+
+    @staticmethod
+    def _forward(order: list[Term], bounds: dict[Term, Interval]) -> dict[Term, Interval]:
+        evaluator = IntervalEvaluator(bounds)
+        for node in order:
+            evaluator.values[node] = evaluator.evaluate_node(node)
+        return evaluator.values
+
+    @staticmethod
+    def _backward(node: Term, values: dict[Term, Interval]) -> None:
+        """Tighten the intervals of the children of node, given the (already tightened) interval of node."""
+        rule = BACKWARD.get(node.term_type.id)
+        if rule is None:
+            return
+        target = values[node]
+        children = [values[c] for c in node.children]
+        for child, tightened in zip(node.children, rule(target, *children)):
+            if tightened is not None:
+                values[child] = values[child].intersect(tightened)
+
+
+def _evaluated_children(node: Term, values: dict[Term, Interval]) -> tuple[Term, ...]:
+    """The children of node that are evaluated whenever node is, given the (tightened) intervals of the nodes."""
+    type_id = node.term_type.id
+    if type_id in (IF, IFS):
+        condition, then, other = node.children
+        if values[condition] == TRUE:
+            return condition, then
+        if values[condition] == FALSE:
+            return condition, other
+        return condition,
+    if type_id in (OR, ORN, IMPLIES):
+        # a false disjunction (or implication) needs all of its operands
+        return node.children if values[node] == FALSE else ()
+    return node.children
+
+
+def _inverse(fn, domain: Interval = Interval.entire(), image: Interval = Interval.entire()):
+    """Backward rule of an increasing unary function with the given inverse, defined on domain with given image."""
+
+    def rule(target: Interval, child: Interval):
+        target = target.intersect(image)
+        if target.is_empty():
+            return [target]
+        lo = _call(fn, target.lo, domain.lo) if target.lo > image.lo else domain.lo
+        hi = _call(fn, target.hi, domain.hi) if target.hi < image.hi else domain.hi
+        return [Interval.outward(lo, hi).intersect(domain)]
+
+    return rule
+
+
+def _sum(target: Interval, *children: Interval):
+    # child_i in target - sum_{j != i} child_j, using prefix and suffix sums to avoid O(n^2)
+    n = len(children)
+    prefix = [Interval.point(0.)]
+    for c in children:
+        prefix.append(prefix[-1] + c)
+    suffix = [Interval.point(0.)]
+    for c in reversed(children):
+        suffix.append(suffix[-1] + c)
+    suffix.reverse()
+    return [target - (prefix[i] + suffix[i + 1]) for i in range(n)]
+
+
+def _pow(target: Interval, base: Interval, exponent: Interval):
+    if not exponent.is_point() or exponent.lo <= 0:
+        return [None, None]
+    p = exponent.lo
+    if p.is_integer() and int(p) % 2 == 1:
+        n = int(p)
+        root = lambda v: math.copysign(abs(v) ** (1 / n), v)
+        return [_call_bounds(root, target), None]
+    # even or fractional exponents: |base|^p in target
+    target = target.intersect(NON_NEGATIVE)
+    if target.is_empty():
+        return [target, None]
+    r = _call(lambda v: v ** (1 / p), target.hi, INF)
+    if not p.is_integer() or base.lo >= 0:
+        return [Interval.outward(_call(lambda v: v ** (1 / p), target.lo, 0.), r), None]
+    if base.hi <= 0:
+        return [Interval.outward(-r, -_call(lambda v: v ** (1 / p), target.lo, 0.)), None]
+    return [Interval.outward(-r, r), None]
+
+
+def _call(fn, value: float, fallback: float) -> float:
+    """Apply fn to a finite value, falling back to a conservative bound on infinities and errors."""
+    if not math.isfinite(value):
+        return fallback
+    try:
+        return fn(value)
+    except (ValueError, OverflowError, ZeroDivisionError):
+        return fallback
+
+
+def _call_bounds(fn, target: Interval) -> Interval:
+    return Interval.outward(fn(target.lo) if target.lo != -INF else -INF, fn(target.hi) if target.hi != INF else INF)
+
+
+def _abs(target: Interval, child: Interval):
+    target = target.intersect(NON_NEGATIVE)
+    if target.is_empty():
+        return [target]
+    if child.lo >= 0:
+        return [target]
+    if child.hi <= 0:
+        return [-target]
+    return [Interval(-target.hi, target.hi)]
+
+
+def _relation(left_rule, right_rule):
+    """Backward rule of a comparison: when it must hold, each side is bounded by the other."""
+
+    def rule(target: Interval, left: Interval, right: Interval):
+        if target != TRUE:
+            return [None, None]
+        return [left_rule(right), right_rule(left)]
+
+    return rule
+
+
+def _all_true(target: Interval, *children: Interval):
+    if target != TRUE:
+        return [None] * len(children)
+    return [TRUE] * len(children)
+
+
+def _all_false(target: Interval, *children: Interval):
+    if target != FALSE:
+        return [None] * len(children)
+    return [FALSE] * len(children)
+
+
+# Backward propagation rules, keyed by term type id.
+# Each rule gets the interval of the node and of its children, and returns a tightening (or None) for each child.
+BACKWARD = {
+    NEG: lambda target, a: [-target],
+    PLUS: lambda target, a, b: [target - b, target - a],
+    MINUS: lambda target, a, b: [target + b, a - target],
+    SUM: _sum,
+    MULT: lambda target, a, b: [target / b if not b.contains(0.) else None,
+                                target / a if not a.contains(0.) else None],
+    DIV: lambda target, a, b: [target * b, a / target if not target.contains(0.) else None],
+    POW: _pow,
+    SQRT: _inverse(lambda v: v * v, NON_NEGATIVE, NON_NEGATIVE),
+    EXP: _inverse(math.log, Interval.entire(), Interval(0., INF)),
+    LOG: _inverse(math.exp, Interval(0., INF)),
+    LOG10: _inverse(lambda v: 10. ** v, Interval(0., INF)),
+    TANH: _inverse(math.atanh, Interval.entire(), Interval(-1., 1.)),
+    SINH: _inverse(math.asinh),
+    ASINH: _inverse(math.sinh),
+    ATANH: _inverse(math.tanh, Interval(-1., 1.)),
+    ATAN: _inverse(math.tan, Interval.entire(), Interval(-math.pi / 2, math.pi / 2)),
+    ABS: _abs,
+    MIN: lambda target, *children: [Interval(target.lo, INF)] * len(children),
+    MAX: lambda target, *children: [Interval(-INF, target.hi)] * len(children),
+    LT: _relation(lambda r: Interval(-INF, r.hi), lambda l: Interval(l.lo, INF)),
+    LE: _relation(lambda r: Interval(-INF, r.hi), lambda l: Interval(l.lo, INF)),
+    GT: _relation(lambda r: Interval(r.lo, INF), lambda l: Interval(-INF, l.hi)),
+    GE: _relation(lambda r: Interval(r.lo, INF), lambda l: Interval(-INF, l.hi)),
+    EQ: _relation(lambda r: r, lambda l: l),
+    NOT: lambda target, a: [EXTENSIONS[NOT](target)],
+    AND: _all_true,
+    ANDN: _all_true,
+    OR: _all_false,
+    ORN: _all_false,
+    IF: lambda target, c, then, other: [None, target if c == TRUE else None, target if c == FALSE else None],
+}
+
+
+def bound_constraints(mgr: TermManager, problem: NLPProblem, result: FBBTResult) -> list[Term]:
+    """
+    Encode the bounds found by FBBT as constraints.
+
+    Variable bounds already present among the problem constraints are skipped.
+    Finite objective bounds are stated as constraints on the objective terms.
+    No constraints are derived if FBBT proved the problem infeasible, as its bounds are then meaningless.
+
+    :param mgr: The term manager of the problem.
+    :param problem: The problem the bounds were computed for.
+    :param result: The result of FBBT on the problem.
+    :return: The list of constraints implied by the bounds.
+    """
+    if result.infeasible:
+        return []
+    existing = set(problem.constraints)
+    constraints = []
+    for v in problem.variables:
+        constraints.extend(_interval_constraints(mgr, v, result.bounds[v]))
+    for o, interval in zip(problem.objectives, result.objective_bounds):
+        constraints.extend(_interval_constraints(mgr, o.term, interval))
+    return [c for c in constraints if c not in existing]
+
+
+def _interval_constraints(mgr: TermManager, term: Term, interval: Interval) -> list[Term]:
+    if math.isfinite(interval.lo) and interval.lo == interval.hi:
+        return [mgr.Eq(term, mgr.Real(interval.lo))]
+    constraints = []
+    if math.isfinite(interval.lo):
+        constraints.append(mgr.Ge(term, mgr.Real(interval.lo)))
+    if math.isfinite(interval.hi):
+        constraints.append(mgr.Le(term, mgr.Real(interval.hi)))
+    return constraints
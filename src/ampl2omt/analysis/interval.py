@@ -0,0 +1,418 @@
+import math
+import sys
+from dataclasses import dataclass
+from typing import Callable
+
+from ampl2omt.term.term import Term, is_var, topo_sort_all
+from ampl2omt.term.types import FLOOR, CEIL, ABS, NEG, TANH, TAN, SQRT, SINH, SIN, LOG10, LOG, EXP, COSH, COS, \
+    ATANH, ATAN, ASINH, ASIN, ACOSH, ACOS, PLUS, MINUS, MULT, DIV, REM, POW, ATAN2, INTDIV, PRECISION, ROUND, TRUNC, \
+    NOT, OR, AND, IF, IMPLIES, IFF, ANDN, ORN, LT, LE, EQ, GE, GT, NE, MIN, MAX, SUM, COUNT, NUMBEROF, ALLDIFF, \
+    LESS, REAL, INT, BOOL
+
+INF = math.inf
+
+
+def _down(x: float) -> float:
+    """Round a lower bound outwards (towards -inf)."""
+    if math.isnan(x):
+        return -INF
+    return math.nextafter(x, -INF) if math.isfinite(x) else x
+
+
+def _up(x: float) -> float:
+    """Round an upper bound outwards (towards +inf)."""
+    if math.isnan(x):
+        return INF
+    return math.nextafter(x, INF) if math.isfinite(x) else x
+
+
+def _mul(a: float, b: float) -> float:
+    # 0 * inf = 0 in interval arithmetic
+    if a == 0 or b == 0:
+        return 0.
+    return a * b
+
+
+def _call(fn: Callable[[float], float], x: float, overflow: float) -> float:
+    # domain errors left after intersecting with the domain are poles at its bounds, e.g. pow(0, -0.5)
+    try:
+        return fn(x)
+    except (OverflowError, ZeroDivisionError, ValueError):
+        return overflow
+
+
+@dataclass(frozen=True)
+class Interval:
+    """
+    A closed interval of real numbers [lo, hi].
+
+    Bounds may be infinite. An interval with lo > hi is empty.
+    """
+    lo: float
+    hi: float
+
+    @staticmethod
+    def entire() -> 'Interval':
+        return Interval(-INF, INF)
+
+    @staticmethod
+    def point(value: float) -> 'Interval':
+        return Interval(value, value)
+
+    @staticmethod
+    def outward(lo: float, hi: float) -> 'Interval':
+        """Create an interval rounding both bounds outwards, to stay sound under floating point errors."""
+        return Interval(_down(lo), _up(hi))
+
+    def is_empty(self) -> bool:
+        return self.lo > self.hi
+
+    def is_point(self) -> bool:
+        return self.lo == self.hi
+
+    def contains(self, value: float) -> bool:
+        return self.lo <= value <= self.hi
+
+    def width(self) -> float:
+        return self.hi - self.lo
+
+    def intersect(self, other: 'Interval') -> 'Interval':
+        return Interval(max(self.lo, other.lo), min(self.hi, other.hi))
+
+    def hull(self, other: 'Interval') -> 'Interval':
+        if self.is_empty():
+            return other
+        if other.is_empty():
+            return self
+        return Interval(min(self.lo, other.lo), max(self.hi, other.hi))
+
+    def __neg__(self) -> 'Interval':
+        return Interval(-self.hi, -self.lo)
+
+    def __add__(self, other: 'Interval') -> 'Interval':
+        return Interval.outward(self.lo + other.lo, self.hi + other.hi)
+
+    def __sub__(self, other: 'Interval') -> 'Interval':
+        return Interval.outward(self.lo - other.hi, self.hi - other.lo)
+
+    def __mul__(self, other: 'Interval') -> 'Interval':
+        products = [_mul(a, b) for a in (self.lo, self.hi) for b in (other.lo, other.hi)]
+        return Interval.outward(min(products), max(products))
+
+    def __truediv__(self, other: 'Interval') -> 'Interval':
+        return self * other.reciprocal()
+
+    def reciprocal(self) -> 'Interval':
+        if self.lo > 0 or self.hi < 0:
+            return Interval.outward(1 / self.hi if self.hi != INF else 0., 1 / self.lo if self.lo != -INF else 0.)
+        if self.lo == 0 and self.hi > 0:
+            return Interval(_down(1 / self.hi) if self.hi != INF else 0., INF)
+        if self.hi == 0 and self.lo < 0:
+            return Interval(-INF, _up(1 / self.lo) if self.lo != -INF else 0.)
+        return Interval.entire()
+
+    def __str__(self):
+        return f"[{self.lo}, {self.hi}]"
+
+
+EMPTY = Interval(INF, -INF)
+BOOLEAN = Interval(0., 1.)
+TRUE = Interval(1., 1.)
+FALSE = Interval(0., 0.)
+
+
+def monotone(fn: Callable[[float], float], domain: Interval = Interval.entire(), increasing: bool = True,
+             image: Interval = Interval.entire()):
+    """Interval extension of a monotone function defined on domain, with values in image."""
+
+    def extension(x: Interval) -> Interval:
+        x = x.intersect(domain)
+        if x.is_empty():
+            return EMPTY
+        lo = _call(fn, x.lo, -INF if increasing else INF)
+        hi = _call(fn, x.hi, INF if increasing else -INF)
+        # outward rounding must not leave the image, e.g. exp(x) >= 0
+        return (Interval.outward(lo, hi) if increasing else Interval.outward(hi, lo)).intersect(image)
+
+    return extension
+
+
+def _even(fn: Callable[[float], float]):
+    """Interval extension of an even function, increasing on [0, inf)."""
+
+    def extension(x: Interval) -> Interval:
+        if x.is_empty():
+            return EMPTY
+        a, b = abs(x.lo), abs(x.hi)
+        lo = 0. if x.contains(0.) else min(a, b)
+        return Interval.outward(_call(fn, lo, sys.float_info.max), _call(fn, max(a, b), INF)).intersect(
+            Interval(fn(0.), INF))
+
+    return extension
+
+
+def _periodic(fn: Callable[[float], float], maxima_offset: float):
+    """Interval extension of sin-like functions, with maxima at maxima_offset + 2k*pi and minima pi away."""
+
+    def extension(x: Interval) -> Interval:
+        if x.is_empty():
+            return EMPTY
+        if x.width() >= 2 * math.pi:
+            return Interval(-1., 1.)
+        lo, hi = sorted((fn(x.lo), fn(x.hi)))
+        if _contains_periodic(x, maxima_offset):
+            hi = 1.
+        if _contains_periodic(x, maxima_offset + math.pi):
+            lo = -1.
+        return Interval.outward(max(lo, -1.), min(hi, 1.)).intersect(Interval(-1., 1.))
+
+    return extension
+
+
+def _contains_periodic(x: Interval, offset: float) -> bool:
+    """Whether x contains offset + 2k*pi for some integer k."""
+    k = math.ceil((x.lo - offset) / (2 * math.pi))
+    return offset + 2 * k * math.pi <= x.hi
+
+
+def _tan(x: Interval) -> Interval:
+    if x.is_empty():
+        return EMPTY
+    if x.width() >= math.pi:
+        return Interval.entire()
+    # tan is increasing between consecutive asymptotes at pi/2 + k*pi
+    k = math.floor((x.lo + math.pi / 2) / math.pi)
+    if x.hi >= math.pi / 2 + k * math.pi:
+        return Interval.entire()
+    return Interval.outward(math.tan(x.lo), math.tan(x.hi))
+
+
+def _pow(base: Interval, exponent: Interval) -> Interval:
+    if base.is_empty() or exponent.is_empty():
+        return EMPTY
+    if exponent.is_point():
+        p = exponent.lo
+        if p == 0:
+            return TRUE
+        if p.is_integer():
+            n = int(p)
+            if n < 0:
+                return _pow(base, Interval.point(-p)).reciprocal()
+            fn = lambda v: math.pow(v, n)
+            if n % 2 == 1:
+                return monotone(fn)(base)
+            return _even(fn)(base)
+        # non-integer exponents are only defined for non-negative bases
+        return monotone(lambda v: math.pow(v, p), Interval(0., INF), increasing=p > 0)(base)
+    base = base.intersect(Interval(0., INF))
+    if base.is_empty():
+        return EMPTY
+    if base.lo > 0:
+        return EXTENSIONS[EXP](exponent * EXTENSIONS[LOG](base))
+    return Interval(0., INF)
+
+
+def _rem(a: Interval, b: Interval) -> Interval:
+    # fmod: the result has the sign of a and is strictly smaller than |b| in magnitude
+    m = max(abs(b.lo), abs(b.hi))
+    lo = 0. if a.lo >= 0 else max(a.lo, -m)
+    hi = 0. if a.hi <= 0 else min(a.hi, m)
+    return Interval(lo, hi)
+
+
+def _round_digits(a: Interval, n: Interval, slack: float) -> Interval:
+    """Rounding a to n decimal digits moves it by less than slack * 10^-n."""
+    if not n.is_point():
+        return Interval.entire()
+    eps = slack * 10 ** -n.lo
+    return Interval.outward(a.lo - eps, a.hi + eps)
+
+
+def _precision(a: Interval, n: Interval) -> Interval:
+    """Rounding a to n significant digits changes it by a relative error of at most 5 * 10^-n."""
+    if not n.is_point():
+        return Interval.entire()
+    factor = Interval(1 - 5 * 10 ** -n.lo, 1 + 5 * 10 ** -n.lo)
+    return a * factor
+
+
+def _trunc_div(a: Interval, b: Interval) -> Interval:
+    q = a / b
+    return Interval(math.floor(q.lo) if math.isfinite(q.lo) else q.lo,
+                    math.ceil(q.hi) if math.isfinite(q.hi) else q.hi)
+
+
+def _compare(fn: Callable[[Interval, Interval], bool | None]):
+    """Interval extension of a comparison, given a function deciding it (True/False) or not (None)."""
+
+    def extension(a: Interval, b: Interval) -> Interval:
+        outcome = fn(a, b)
+        if outcome is None:
+            return BOOLEAN
+        return TRUE if outcome else FALSE
+
+    return extension
+
+
+def _decide(certainly: bool, certainly_not: bool) -> bool | None:
+    if certainly:
+        return True
+    if certainly_not:
+        return False
+    return None
+
+
+def _sum(*children: Interval) -> Interval:
+    lo = math.fsum(c.lo for c in children) if all(c.lo != -INF for c in children) else -INF
+    hi = math.fsum(c.hi for c in children) if all(c.hi != INF for c in children) else INF
+    return Interval.outward(lo, hi)
+
+
+def _min(*children: Interval) -> Interval:
+    return Interval(min(c.lo for c in children), min(c.hi for c in children))
+
+
+def _max(*children: Interval) -> Interval:
+    return Interval(max(c.lo for c in children), max(c.hi for c in children))
+
+
+def _truth(fn: Callable[[list[bool | None]], bool | None]):
+    """Interval extension of a logical connective over {0, 1}-valued intervals."""
+
+    def extension(*children: Interval) -> Interval:
+        values = [True if c == TRUE else False if c == FALSE else None for c in children]
+        outcome = fn(values)
+        if outcome is None:
+            return BOOLEAN
+        return TRUE if outcome else FALSE
+
+    return extension
+
+
+def _and(values: list[bool | None]) -> bool | None:
+    if any(v is False for v in values):
+        return False
+    return True if all(v is True for v in values) else None
+
+
+def _or(values: list[bool | None]) -> bool | None:
+    if any(v is True for v in values):
+        return True
+    return False if all(v is False for v in values) else None
+
+
+def _if(cond: Interval, then: Interval, other: Interval) -> Interval:
+    if cond == TRUE:
+        return then
+    if cond == FALSE:
+        return other
+    return then.hull(other)
+
+
+def _count(*children: Interval) -> Interval:
+    return Interval(float(sum(1 for c in children if c == TRUE)), float(sum(1 for c in children if c != FALSE)))
+
+
+def _numberof(value: Interval, *children: Interval) -> Interval:
+    return Interval(0., float(len(children)))
+
+
+PI_2 = math.pi / 2
+NON_NEGATIVE = Interval(0., INF)
+
+# Interval extensions of the arithmetic, transcendental and logical operators, keyed by term type id.
+EXTENSIONS: dict[int, Callable[..., Interval]] = {
+    # Unary operators
+    FLOOR: monotone(math.floor),
+    CEIL: monotone(math.ceil),
+    ABS: _even(abs),
+    NEG: lambda a: -a,
+    TANH: monotone(math.tanh),
+    TAN: _tan,
+    SQRT: monotone(math.sqrt, NON_NEGATIVE, image=NON_NEGATIVE),
+    SINH: monotone(math.sinh),
+    SIN: _periodic(math.sin, PI_2),
+    LOG10: monotone(lambda v: math.log10(v) if v > 0 else -INF, NON_NEGATIVE),
+    LOG: monotone(lambda v: math.log(v) if v > 0 else -INF, NON_NEGATIVE),
+    EXP: monotone(math.exp, image=NON_NEGATIVE),
+    COSH: _even(math.cosh),
+    COS: _periodic(math.cos, 0.),
+    ATANH: monotone(lambda v: math.atanh(v) if abs(v) < 1 else math.copysign(INF, v), Interval(-1., 1.)),
+    ATAN: monotone(math.atan),
+    ASINH: monotone(math.asinh),
+    ASIN: monotone(math.asin, Interval(-1., 1.)),
+    ACOSH: monotone(math.acosh, Interval(1., INF), image=NON_NEGATIVE),
+    ACOS: monotone(math.acos, Interval(-1., 1.), increasing=False),
+    # Binary operators
+    PLUS: lambda a, b: a + b,
+    MINUS: lambda a, b: a - b,
+    MULT: lambda a, b: a * b,
+    DIV: lambda a, b: a / b,
+    REM: _rem,
+    POW: _pow,
+    LESS: lambda a, b: _max(a - b, Interval.point(0.)),
+    ATAN2: lambda a, b: Interval.outward(-math.pi, math.pi),
+    INTDIV: _trunc_div,
+    PRECISION: _precision,
+    ROUND: lambda a, n: _round_digits(a, n, 0.5),
+    TRUNC: lambda a, n: _round_digits(a, n, 1.),
+    # Logical operators
+    NOT: lambda a: TRUE if a == FALSE else FALSE if a == TRUE else BOOLEAN,
+    OR: _truth(_or),
+    AND: _truth(_and),
+    IF: _if,
+    IMPLIES: lambda a, b: _truth(_or)(EXTENSIONS[NOT](a), b),
+    IFF: lambda a, b: BOOLEAN if not a.is_point() or not b.is_point() else TRUE if a == b else FALSE,
+    ANDN: _truth(_and),
+    ORN: _truth(_or),
+    # Comparison operators
+    LT: _compare(lambda a, b: _decide(a.hi < b.lo, a.lo >= b.hi)),
+    LE: _compare(lambda a, b: _decide(a.hi <= b.lo, a.lo > b.hi)),
+    EQ: _compare(lambda a, b: _decide(a.is_point() and a == b, a.intersect(b).is_empty())),
+    GE: _compare(lambda a, b: _decide(a.lo >= b.hi, a.hi < b.lo)),
+    GT: _compare(lambda a, b: _decide(a.lo > b.hi, a.hi <= b.lo)),
+    NE: _compare(lambda a, b: _decide(a.intersect(b).is_empty(), a.is_point() and a == b)),
+    # N-ary operators
+    MIN: _min,
+    MAX: _max,
+    SUM: _sum,
+    COUNT: _count,
+    NUMBEROF: _numberof,
+    ALLDIFF: lambda *children: BOOLEAN,
+}
+
+
+class IntervalEvaluator:
+    """
+    Forward interval evaluation of terms.
+
+    Variables take their value from the given bounds (unbounded if missing).
+    Results are memoized per node, so shared subterms are evaluated once.
+    """
+
+    def __init__(self, bounds: dict[Term, Interval] | None = None):
+        self.bounds = bounds if bounds is not None else {}
+        self.values: dict[Term, Interval] = {}
+
+    def evaluate(self, term: Term) -> Interval:
+        # the nodes evaluated by previous calls are cut off
+        for node in topo_sort_all([term], skip=self.values.__contains__):
+            self.values[node] = self.evaluate_node(node)
+        return self.values[term]
+
+    def evaluate_node(self, node: Term) -> Interval:
+        """Evaluate a single node, assuming its children have already been evaluated."""
+        if is_var(node):
+            return self.bounds.get(node, Interval.entire())
+        type_id = node.term_type.id
+        if type_id in (REAL, INT):
+            return Interval.point(float(node.payload))
+        if type_id == BOOL:
+            return TRUE if node.payload else FALSE
+        extension = EXTENSIONS.get(type_id)
+        if extension is None:
+            return Interval.entire()
+        children = [self.values[c] for c in node.children]
+        if any(c.is_empty() for c in children):
+            return EMPTY
+        return extension(*children)
@@ -0,0 +1,195 @@
+from dataclasses import dataclass, field
+
+from ampl2omt.problem.objective import Objective
+from ampl2omt.problem.problem import NLPProblem
+from ampl2omt.term.term import Term, is_var, is_const
+from ampl2omt.term.types import NEG, PLUS, MINUS, SUM, MULT, DIV, LT, LE, EQ, GE, GT
+
+Bounds = tuple[float | None, float | None]
+
+# The constraints that can be split into ranges.
+COMPARISONS = frozenset({LT, LE, EQ, GE, GT})
+
+
+@dataclass
+class LinearPart:
+    """
+    A term split as sum_x coefficients[x] * x + constant + sum_t nonlinear[t] * t.
+
+    The nonlinear addends are the maximal non-additive subterms whose operator is not linear in its arguments, with
+    their (non-zero) scale.
+    """
+    coefficients: dict[Term, float] = field(default_factory=dict)
+    constant: float = 0.
+    nonlinear: dict[Term, float] = field(default_factory=dict)
+
+    def is_linear(self) -> bool:
+        return not self.nonlinear
+
+    def minus(self, other: 'LinearPart') -> 'LinearPart':
+        """The part of the difference of the two terms, e.g. of the body a - b of a comparison a <op> b."""
+        coefficients = dict(self.coefficients)
+        for x, c in other.coefficients.items():
+            coefficients[x] = coefficients.get(x, 0.) - c
+        nonlinear = dict(self.nonlinear)
+        for t, s in other.nonlinear.items():
+            nonlinear[t] = nonlinear.get(t, 0.) - s
+        return LinearPart({x: c for x, c in coefficients.items() if c != 0}, self.constant - other.constant,
+                          {t: s for t, s in nonlinear.items() if s != 0})
+
+
+def linear_part(term: Term) -> LinearPart:
+    """
+    Extract the linear part of a term, distributing constant factors over sums, differences and negations.
+
+    Zero coefficients and scales are dropped, so x - x has no linear part. The extraction is syntactic: a
+    variable-free addend that is not a constant (e.g. 2^3) is reported as nonlinear.
+
+    :param term: The term.
+    :return: The linear part, the constant and the nonlinear addends of the term, in order of occurrence.
+    """
+    part = LinearPart()
+    stack = [(1., term)]
+    while stack:
+        scale, node = stack.pop()
+        type_id = node.term_type.id
+        children = node.children
+        if is_var(node):
+            part.coefficients[node] = part.coefficients.get(node, 0.) + scale
+        elif is_const(node):
+            part.constant += scale * float(node.payload)
+        elif type_id in (PLUS, SUM):
+            stack.extend((scale, c) for c in reversed(children))
+        elif type_id == MINUS:
+            stack.append((-scale, children[1]))
+            stack.append((scale, children[0]))
+        elif type_id == NEG:
+            stack.append((-scale, children[0]))
+        elif type_id == MULT and is_const(children[0]):
+            stack.append((scale * float(children[0].payload), children[1]))
+        elif type_id == MULT and is_const(children[1]):
+            stack.append((scale * float(children[1].payload), children[0]))
+        elif type_id == DIV and is_const(children[1]) and float(children[1].payload) != 0:
+            stack.append((scale / float(children[1].payload), children[0]))
+        else:
+            part.nonlinear[node] = part.nonlinear.get(node, 0.) + scale
+    part.coefficients = {x: c for x, c in part.coefficients.items() if c != 0}
+    part.nonlinear = {t: s for t, s in part.nonlinear.items() if s != 0}
+    return part
+
+
+@dataclass
+class RangeConstraint:
+    """A constraint lower <= body <= upper, with the body given by its linear part and nonlinear addends."""
+    part: LinearPart
+    lower: float | None
+    upper: float | None
+
+
+def split_constraints(constraints: list[Term]) -> tuple[dict[Term, Bounds], list[RangeConstraint]]:
+    """
+    Split comparison constraints into variable bounds and range constraints on the other bodies, as in nl files.
+
+    Each comparison a <op> b is rewritten as a range on the body a - b, with its constant moved to the bounds.
+    Constraints with the same body are merged into a single range, and linear constraints on a single variable
+    become bounds of the variable. Strict inequalities are treated as non-strict ones.
+
+    :param constraints: The constraints, all comparisons.
+    :return: The bounds of each bounded variable, and the range constraints, in order of first occurrence.
+    """
+    var_bounds: dict[Term, Bounds] = {}
+    rows: dict[tuple, RangeConstraint] = {}
+    for c in constraints:
+        type_id = c.term_type.id
+        if type_id not in COMPARISONS:
+            raise ValueError(f"Only comparisons can be split into ranges, got {c.term_type.name}")
+        a, b = c.children
+        part = linear_part(a).minus(linear_part(b))
+        lower = -part.constant if type_id in (EQ, GE, GT) else None
+        upper = -part.constant if type_id in (EQ, LE, LT) else None
+        part.constant = 0.
+        if not part.nonlinear and len(part.coefficients) == 1:
+            (v, k), = part.coefficients.items()
+            lower, upper = (lower, upper) if k > 0 else (upper, lower)
+            var_bounds[v] = _intersect(var_bounds.get(v, (None, None)),
+                                       (None if lower is None else lower / k, None if upper is None else upper / k))
+            continue
+        key = (tuple(part.coefficients.items()), tuple(part.nonlinear.items()))
+        if key in rows:
+            rows[key].lower, rows[key].upper = _intersect((rows[key].lower, rows[key].upper), (lower, upper))
+        else:
+            rows[key] = RangeConstraint(part, lower, upper)
+    return var_bounds, list(rows.values())
+
+
+def _intersect(a: Bounds, b: Bounds) -> Bounds:
+    lower = max((x for x in (a[0], b[0]) if x is not None), default=None)
+    upper = min((x for x in (a[1], b[1]) if x is not None), default=None)
+    return lower, upper
+
+
+@dataclass
+class LinearModel:
+    """
+    A linear problem: optimize objective . x + objective_constant subject to row_lower <= matrix x <= row_upper and
+    lower <= x <= upper, with the matrix stored as sparse rows ({column: coefficient}). None bounds are infinite.
+    """
+    variables: list[Term]
+    lower: list[float | None]
+    upper: list[float | None]
+    matrix: list[dict[int, float]]
+    row_lower: list[float | None]
+    row_upper: list[float | None]
+    objective: dict[int, float]
+    objective_constant: float
+    minimize: bool
+    # the number of nonlinear (or non-comparison) constraints dropped by the relaxation
+    relaxed: int = 0
+
+
+def linear_model(problem: NLPProblem, relax_nonlinear=False, objective: int = 0) -> LinearModel:
+    """
+    Extract the linear model of a problem.
+
+    :param problem: The problem.
+    :param relax_nonlinear: Whether to drop the nonlinear constraints, and those that are not comparisons (e.g.
+        disjunctions), to get a linear relaxation; otherwise they are an error.
+    :param objective: The index of the objective to keep, as linear models have a single objective.
+    :return: The linear model.
+    """
+    comparisons = [c for c in problem.constraints if c.term_type.id in COMPARISONS]
+    others = len(problem.constraints) - len(comparisons)
+    if others and not relax_nonlinear:
+        raise ValueError(f"{others} constraints are not comparisons (they can be relaxed with relax_nonlinear)")
+    var_bounds, rows = split_constraints(comparisons)
+    column = {v: j for j, v in enumerate(problem.variables)}
+    unknown = [v for v in var_bounds if v not in column] + [v for r in rows for v in r.part.coefficients
+                                                            if v not in column]
+    if unknown:
+        raise ValueError(f"Variable {unknown[0].payload} is not a variable of the problem")
+    nonlinear = [r for r in rows if r.part.nonlinear]
+    if nonlinear and not relax_nonlinear:
+        raise ValueError(f"{len(nonlinear)} constraints are not linear (they can be relaxed with relax_nonlinear)")
+    rows = [r for r in rows if not r.part.nonlinear]
+
+    objective_part, minimize = LinearPart(), True
+    if problem.objectives:
+        objective_part = linear_part(problem.objectives[objective].term)
+        minimize = problem.objectives[objective].kind == Objective.MINIMIZE
+        if objective_part.nonlinear:
+            # dropping the nonlinear addends of the objective would not give a bound
+            raise ValueError(f"Objective {objective} is not linear")
+        if any(v not in column for v in objective_part.coefficients):
+            raise ValueError("The objective has variables not in the problem")
+    return LinearModel(
+        variables=list(problem.variables),
+        lower=[var_bounds.get(v, (None, None))[0] for v in problem.variables],
+        upper=[var_bounds.get(v, (None, None))[1] for v in problem.variables],
+        matrix=[{column[v]: k for v, k in r.part.coefficients.items()} for r in rows],
+        row_lower=[r.lower for r in rows],
+        row_upper=[r.upper for r in rows],
+        objective={column[v]: k for v, k in objective_part.coefficients.items()},
+        objective_constant=objective_part.constant,
+        minimize=minimize,
+        relaxed=len(nonlinear) + others,
+    )
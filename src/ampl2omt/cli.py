@@ -1,24 +1,121 @@
 import argparse as ap
+import os
+import signal
+import sys
 
-from ampl2omt.parsing.nlparser import NLParser
-from ampl2omt.term.manager import TermManager
-from ampl2omt.writing.smtlibwriter import SmtlibWriter
+# only the options and the client are imported upfront: the converter is imported when converting locally
+from ampl2omt.client import ConversionClient, SERVER_ENV
+from ampl2omt.options import ConversionOptions, FORMATS, ALL_RULES, ALL_POINTS, GUESS_POINT, MIDPOINT_POINT, MODES, \
+    CONCAT_MODE
+from ampl2omt.streams import COMPRESSIONS, STDIO
 
 
 def parse_args():
     parser = ap.ArgumentParser(
-        description="Convert NonLinear Programming problems from AMPL (.nl) to OMT (.smt2) format")
-    parser.add_argument("input", type=str, help="Path to the input file")
-    parser.add_argument("output", type=str, help="Path to the output file")
+        description="Convert NonLinear Programming problems from AMPL (.nl) to OMT (.smt2) format",
+        epilog=f"Run 'ampl2omt serve ADDRESS' to start a conversion server; conversions go through the server at "
+               f"${SERVER_ENV}, if set and running.")
+    parser.add_argument("input", type=str,
+                        help="Path to the input file, possibly compressed (gzip, xz or zstd), or - for stdin")
+    parser.add_argument("output", type=str,
+                        help="Path to the output file: an nl, MPS or LP file if it ends with .nl, .mps or .lp, "
+                             "an SMT-LIBv2 script otherwise, compressed if it also ends with .gz, .xz or .zst "
+                             "(e.g. out.smt2.gz); - for stdout")
+    parser.add_argument("--format", type=str, default=None, choices=FORMATS,
+                        help="Output format, instead of the one given by the extension of the output path")
+    parser.add_argument("--compress", type=str, default=None, choices=COMPRESSIONS,
+                        help="Compression of the output, instead of the one given by the extension of the output path")
     parser.add_argument("--daggify", action="store_true", help="Use daggified terms")
+    parser.add_argument("--canonical", action="store_true",
+                        help="Share the terms equal up to the order and nesting of commutative and associative "
+                             "operators, e.g. x + y and y + x")
+    parser.add_argument("--logic", type=str, default=None,
+                        help="SMT-LIB logic to declare (default: the tightest logic for the problem degree)")
+    parser.add_argument("--report", action="store_true",
+                        help="Print the degree classification of constraints and objectives to stderr")
+    parser.add_argument("--normalize", nargs="?", const=",".join(ALL_RULES), default=None, metavar="RULES",
+                        help=f"Rewrite terms into solver-friendly forms, with the given comma-separated rules "
+                             f"(default: {','.join(ALL_RULES)})")
+    parser.add_argument("--fbbt", action="store_true",
+                        help="Tighten variable and objective bounds with feasibility-based bound tightening")
+    parser.add_argument("--fbbt-max-iter", type=int, default=10, help="Maximum number of FBBT sweeps")
+    parser.add_argument("--fbbt-time-limit", type=float, default=None, help="Time limit for FBBT in seconds")
+    parser.add_argument("--cuts", type=int, default=0, metavar="K",
+                        help="Add up to K tangent cuts per convex constraint (default: 0)")
+    parser.add_argument("--cut-points", type=str, default=f"{GUESS_POINT},{MIDPOINT_POINT}", metavar="STRATEGIES",
+                        help=f"Comma-separated strategies choosing the cut points, among {','.join(ALL_POINTS)} "
+                             f"(default: {GUESS_POINT},{MIDPOINT_POINT})")
+    parser.add_argument("--pwl", nargs="?", type=float, const=1e-3, default=None, metavar="ERROR",
+                        help="Approximate transcendental functions with bounded arguments by piecewise-linear "
+                             "functions, with the given maximum error (default: 1e-3)")
+    parser.add_argument("--pwl-max-segments", type=int, default=64,
+                        help="Maximum number of segments of each piecewise-linear approximation")
+    parser.add_argument("--warm-start", action="store_true",
+                        help="Bound the objective by its value at the initial guess of the nl file, if feasible")
+    parser.add_argument("--decompose", action="store_true",
+                        help="Split the problem into independent components, "
+                             "writing component i to the output path with suffix .i (e.g. out.0.smt2)")
+    parser.add_argument("--split-objectives", nargs="?", const=CONCAT_MODE, default=None, choices=MODES,
+                        help="Write one script per objective, to the output path with suffix .objK: complete scripts "
+                             "(concat, the default), or objective chunks sharing a .preamble file (split)")
+    parser.add_argument("--relax-nonlinear", action="store_true",
+                        help="Drop the nonlinear constraints when writing MPS or LP files, to get a linear relaxation")
+    parser.add_argument("--out-of-core", type=str, default=None, metavar="DIR",
+                        help="Keep the terms in memory-mapped files in DIR rather than in memory, for problems larger "
+                             "than the RAM (SMT-LIB output only, without transformations)")
     return parser.parse_args()
 
 
+def parse_serve_args(argv: list[str]):
+    parser = ap.ArgumentParser(prog="ampl2omt serve",
+                               description="Run a conversion server, used by ampl2omt when its address is in "
+                                           f"${SERVER_ENV}")
+    parser.add_argument("address", type=str,
+                        help="Address to listen on: the path of a Unix socket, or [host]:port for TCP (default host: "
+                             "localhost)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of worker processes (default: the number of CPUs)")
+    parser.add_argument("--max-pending", type=int, default=None,
+                        help="Maximum number of running and queued jobs, further jobs are rejected "
+                             "(default: 4 per worker)")
+    parser.add_argument("--allow-remote", action="store_true",
+                        help="Allow listening on a TCP host other than the loopback, e.g. 0.0.0.0; any client that "
+                             "can connect can then read and write files as the server")
+    return parser.parse_args(argv)
+
+
 def main():
+    if sys.argv[1:2] == ["serve"]:
+        serve(parse_serve_args(sys.argv[2:]))
+        return
     args = parse_args()
-    mgr = TermManager()
-    parser = NLParser(mgr)
-    problem = parser.parse_file(args.input)
-    writer = SmtlibWriter()
-    with open(args.output, "w") as f:
-        f.write(writer.to_smtlib(problem, daggify=args.daggify))
+    options = ConversionOptions.from_args(args)
+    result = None
+    # the server cannot read our stdin nor write to our stdout
+    if os.environ.get(SERVER_ENV) and STDIO not in (args.input, args.output):
+        try:
+            result = ConversionClient(os.environ[SERVER_ENV]).convert(args.input, args.output, options)
+        except OSError:
+            # no server running, or busy: convert locally
+            pass
+        except ValueError as e:
+            sys.exit(f"ampl2omt: error: {e}")
+    if result is None:
+        from ampl2omt.conversion import convert
+        result = convert(args.input, args.output, options)
+    for message in result.messages:
+        print(message, file=sys.stderr)
+
+
+def serve(args):
+    from ampl2omt.server import ConversionServer
+    server = ConversionServer(args.address, workers=args.workers, max_pending=args.max_pending,
+                              allow_remote=args.allow_remote)
+    # stop cleanly on SIGTERM as on Ctrl-C, removing the socket file
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    with server:
+        print(f"Listening on {server.address}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,94 @@
+import dataclasses
+import ipaddress
+import json
+import os
+import socket
+
+from ampl2omt.options import ConversionOptions, ConversionResult, SMTLIB_FORMAT
+
+# The environment variable with the address of the server used by the command line, if running.
+SERVER_ENV = "AMPL2OMT_SERVER"
+LOCALHOST = "127.0.0.1"
+
+
+def parse_address(address: str) -> str | tuple[str, int]:
+    """
+    Parse a server address: host:port (or :port, on localhost) for TCP, a path for a Unix socket.
+
+    :param address: The address.
+    :return: The (host, port) pair, or the path of the socket.
+    """
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit() and "/" not in address:
+        return host or LOCALHOST, int(port)
+    return address
+
+
+def is_loopback(host: str) -> bool:
+    """Whether a host is "localhost" or a loopback IP address, only reachable from this machine."""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host.strip("[]")).is_loopback
+    except ValueError:
+        return False
+
+
+class ConversionClient:
+    """
+    Client of a conversion server (see ampl2omt.server).
+
+    Connection errors, and the rejections of a busy server, are raised as OSError, so that callers can fall back to
+    converting locally; failed jobs are raised as ValueError, with the error reported by the server.
+    """
+
+    def __init__(self, address: str, timeout: float | None = None):
+        """
+        :param address: The address of the server (see parse_address).
+        :param timeout: The timeout of the connection and of each job, in seconds, None to wait indefinitely.
+        """
+        self.address = parse_address(address)
+        self.timeout = timeout
+
+    def convert(self, input_path: str, output_path: str, options: ConversionOptions) -> ConversionResult:
+        """
+        Convert a file, as ampl2omt.conversion.convert; relative paths are resolved here, not by the server.
+
+        :param input_path: The path of the nl file.
+        :param output_path: The output path.
+        :param options: The options.
+        :return: The written paths and the messages.
+        """
+        return self._submit({"input": os.path.abspath(input_path), "output": os.path.abspath(output_path),
+                             "options": dataclasses.asdict(options)})
+
+    def convert_string(self, text: str, fmt: str = SMTLIB_FORMAT,
+                       options: ConversionOptions | None = None) -> ConversionResult:
+        """
+        Convert the content of an nl file, as ampl2omt.conversion.convert_string.
+
+        :param text: The content of the nl file.
+        :param fmt: The output format.
+        :param options: The options, the default ones if None.
+        :return: The output and the messages.
+        """
+        return self._submit({"data": text, "format": fmt,
+                             "options": dataclasses.asdict(options or ConversionOptions())})
+
+    def _submit(self, job: dict) -> ConversionResult:
+        family = socket.AF_INET if isinstance(self.address, tuple) else socket.AF_UNIX
+        with socket.socket(family, socket.SOCK_STREAM) as s:
+            s.settimeout(self.timeout)
+            s.connect(self.address)
+            with s.makefile("rwb") as f:
+                f.write(json.dumps(job).encode() + b"\n")
+                f.flush()
+                line = f.readline()
+        if not line:
+            raise ConnectionError("The server closed the connection")
+        response = json.loads(line)
+        if response.get("busy"):
+            raise ConnectionRefusedError(response["error"])
+        if not response["ok"]:
+            raise ValueError(response["error"])
+        return ConversionResult(paths=response["paths"], output=response["output"], messages=response["messages"])
@@ -0,0 +1,270 @@
+import asyncio
+import dataclasses
+import os
+from collections.abc import Iterator
+from concurrent.futures import Executor
+
+from ampl2omt.aio import write_text, run_cancellable
+from ampl2omt.analysis.decomposition import decompose
+from ampl2omt.analysis.degree import classify
+from ampl2omt.analysis.fbbt import FBBT, bound_constraints
+from ampl2omt.options import ConversionOptions, ConversionResult, SMTLIB_FORMAT, NL_FORMAT, MPS_FORMAT, LP_FORMAT, \
+    FORMATS
+from ampl2omt.parsing.nlparser import NLParser
+from ampl2omt.problem.problem import NLPProblem
+from ampl2omt.progress import CancelToken, ProgressCallback
+from ampl2omt.streams import open_output, split_extension, strip_compression, STDIO
+from ampl2omt.term.manager import TermManager
+from ampl2omt.term.store import MappedTermManager
+from ampl2omt.transform.cuts import TangentCuts
+from ampl2omt.transform.normalize import Normalizer
+from ampl2omt.transform.pwl import PiecewiseLinearizer
+from ampl2omt.writing.fanout import render_per_objective
+from ampl2omt.writing.lpwriter import LpWriter
+from ampl2omt.writing.nlwriter import NlWriter
+from ampl2omt.writing.smtlibwriter import SmtlibWriter
+from ampl2omt.writing.streaming import StreamingSmtlibWriter
+
+
+def output_format(path: str) -> str:
+    """The output format of a path, given by its extension before the compression one (SMT-LIB for stdout)."""
+    ext = os.path.splitext(strip_compression(path))[1].lstrip(".")
+    return ext if ext in FORMATS else SMTLIB_FORMAT
+
+
+def prepare(mgr: TermManager, problem: NLPProblem, options: ConversionOptions) -> tuple[NLPProblem, list[str]]:
+    """
+    Apply the transformations selected by the options: normalization, FBBT, tangent cuts and piecewise-linear
+    approximations, in this order.
+
+    :param mgr: The term manager of the problem.
+    :param problem: The problem.
+    :param options: The options.
+    :return: The transformed problem, and the messages for the user.
+    """
+    messages = []
+    if options.normalize is not None:
+        problem = Normalizer(mgr, options.normalize.split(",")).normalize(problem)
+    bounds = None
+    if options.fbbt:
+        result = FBBT(max_iter=options.fbbt_max_iter, time_limit=options.fbbt_time_limit).run(problem)
+        if result.infeasible:
+            messages.append("FBBT: the constraints are infeasible, no bounds added")
+        problem = dataclasses.replace(
+            problem, constraints=problem.constraints + bound_constraints(mgr, problem, result))
+        bounds = None if result.infeasible else result.bounds
+    if options.cuts > 0:
+        generator = TangentCuts(mgr, n_cuts=options.cuts, points=options.cut_points.split(","), bounds=bounds)
+        problem = dataclasses.replace(problem, constraints=problem.constraints + generator.cuts(problem))
+    if options.pwl is not None:
+        linearizer = PiecewiseLinearizer(mgr, error=options.pwl, max_segments=options.pwl_max_segments, bounds=bounds)
+        problem = linearizer.linearize(problem)
+    if options.report:
+        messages.append(str(classify(problem)))
+    return problem, messages
+
+
+def render(problem: NLPProblem, fmt: str, options: ConversionOptions, name: str = "ampl2omt",
+           progress: ProgressCallback | None = None, token: CancelToken | None = None) -> str:
+    """
+    Write a problem in the given format.
+
+    :param problem: The problem.
+    :param fmt: The output format, one of FORMATS.
+    :param options: The options.
+    :param name: The name of the problem, written in the nl, MPS and LP files.
+    :param progress: The progress callback of the SMT-LIB writer (see SmtlibWriter.to_smtlib).
+    :param token: The cancel token of the SMT-LIB writer (see SmtlibWriter.to_smtlib), only checked before
+        rendering the other formats.
+    :return: The output.
+    """
+    if fmt != SMTLIB_FORMAT and token is not None:
+        token.check()
+    if fmt == NL_FORMAT:
+        return NlWriter().to_nl(problem, name)
+    if fmt in (MPS_FORMAT, LP_FORMAT):
+        lp_writer = LpWriter()
+        to_text = lp_writer.to_mps if fmt == MPS_FORMAT else lp_writer.to_lp
+        return to_text(problem, relax_nonlinear=options.relax_nonlinear, name=name)
+    if fmt != SMTLIB_FORMAT:
+        raise ValueError(f"Unknown output format: {fmt}")
+    return SmtlibWriter().to_smtlib(problem, daggify=options.daggify, logic=options.logic,
+                                    warm_start=options.warm_start, progress=progress, token=token)
+
+
+def render_files(problem: NLPProblem, path: str, options: ConversionOptions, progress: ProgressCallback | None = None,
+                 token: CancelToken | None = None) -> list[tuple[str, list[str]]]:
+    """
+    Render the files written by write, without writing them.
+
+    :param problem: The problem.
+    :param path: The output path, or - for the standard output.
+    :param options: The options.
+    :param progress: The progress callback of the writer (see render).
+    :param token: The cancel token of the writer (see render).
+    :return: The path of each file, and the parts of its content, to be written one after the other.
+    """
+    fmt = options.format or output_format(path)
+    if fmt == SMTLIB_FORMAT and options.split_objectives is not None:
+        if path == STDIO:
+            raise ValueError("Split objectives are written to several files, and need an output path")
+        return render_per_objective(SmtlibWriter(), problem, path, options.split_objectives, daggify=options.daggify,
+                                    logic=options.logic, warm_start=options.warm_start, progress=progress,
+                                    token=token)
+    name = "ampl2omt" if path == STDIO else os.path.splitext(os.path.basename(strip_compression(path)))[0]
+    return [(path, [render(problem, fmt, options, name, progress, token)])]
+
+
+def conversion_files(mgr: TermManager, problem: NLPProblem, output_path: str, options: ConversionOptions,
+                     progress: ProgressCallback | None = None,
+                     token: CancelToken | None = None) -> Iterator[tuple[str, list[str]]]:
+    """
+    Render the files of a conversion lazily, the files of component i of a decomposed problem to the output path with
+    suffix .i.
+
+    :param mgr: The term manager of the problem.
+    :param problem: The prepared problem.
+    :param output_path: The output path, or - for the standard output.
+    :param options: The options.
+    :param progress: The progress callback of the writer (see render).
+    :param token: The cancel token of the writer (see render).
+    :return: An iterator over the path of each file and the parts of its content (see render_files).
+    """
+    if not options.decompose:
+        yield from render_files(problem, output_path, options, progress, token)
+        return
+    if output_path == STDIO:
+        raise ValueError("Components are written to several files, and need an output path")
+    root, ext = split_extension(output_path)
+    for i, component in enumerate(decompose(mgr, problem).components):
+        yield from render_files(component, f"{root}.{i}{ext}", options, progress, token)
+
+
+def convert(input_path: str, output_path: str, options: ConversionOptions, progress: ProgressCallback | None = None,
+            token: CancelToken | None = None) -> ConversionResult:
+    """
+    Convert an nl file, writing component i of a decomposed problem to the output path with suffix .i.
+
+    :param input_path: The path of the nl file, possibly compressed, or - for the standard input.
+    :param output_path: The output path, or - for the standard output.
+    :param options: The options.
+    :param progress: The progress callback of the parse and of the SMT-LIB writes (see ampl2omt.progress).
+    :param token: The cancel token of the conversion, checked during the parse and the SMT-LIB writes, and between
+        the phases.
+    :return: The written paths and the messages.
+    """
+    if options.out_of_core is not None:
+        return convert_out_of_core(input_path, output_path, options, progress, token)
+    mgr = TermManager(canonical=options.canonical)
+    problem = NLParser(mgr).parse_file(input_path, progress, token)
+    problem, messages = prepare(mgr, problem, options)
+    if token is not None:
+        token.check()
+    paths = []
+    for path, parts in conversion_files(mgr, problem, output_path, options, progress, token):
+        paths.append(path)
+        with open_output(path, options.compress) as f:
+            f.writelines(parts)
+    return ConversionResult(paths=paths, messages=messages)
+
+
+def convert_out_of_core(input_path: str, output_path: str, options: ConversionOptions,
+                        progress: ProgressCallback | None = None,
+                        token: CancelToken | None = None) -> ConversionResult:
+    """
+    Convert an nl file as convert, keeping the terms in a disk-backed store in the directory options.out_of_core (see
+    MappedTermManager), and writing the script with the StreamingSmtlibWriter, for problems larger than memory.
+
+    The transformations, decomposition, split objectives, warm start and formats other than SMT-LIB work on in-memory
+    structures as large as the problem, and are not supported.
+
+    :param input_path: The path of the nl file, possibly compressed, or - for the standard input.
+    :param output_path: The output path, or - for the standard output.
+    :param options: The options.
+    :param progress: The progress callback of the parse and of the write (see ampl2omt.progress).
+    :param token: The cancel token of the conversion (see convert).
+    :return: The written path and the messages.
+    """
+    unsupported = {
+        "normalize": options.normalize is not None,
+        "fbbt": options.fbbt,
+        "cuts": options.cuts > 0,
+        "pwl": options.pwl is not None,
+        "warm_start": options.warm_start,
+        "decompose": options.decompose,
+        "split_objectives": options.split_objectives is not None,
+    }
+    for name, enabled in unsupported.items():
+        if enabled:
+            raise ValueError(f"Option {name} is not supported out of core")
+    fmt = options.format or output_format(output_path)
+    if fmt != SMTLIB_FORMAT:
+        raise ValueError(f"Only SMT-LIB is written out of core, got {fmt}")
+    writer = StreamingSmtlibWriter()
+    with MappedTermManager(options.out_of_core, canonical=options.canonical) as mgr:
+        problem = NLParser(mgr).parse_file(input_path, progress, token)
+        messages = [str(writer.classify(problem))] if options.report else []
+        if token is not None:
+            token.check()
+        with open_output(output_path, options.compress) as f:
+            writer.write(problem, f, daggify=options.daggify, logic=options.logic, progress=progress, token=token)
+    return ConversionResult(paths=[output_path], messages=messages)
+
+
+async def convert_async(input_path: str, output_path: str, options: ConversionOptions,
+                        executor: Executor | None = None, progress: ProgressCallback | None = None,
+                        token: CancelToken | None = None) -> ConversionResult:
+    """
+    Convert an nl file as convert, without blocking the event loop.
+
+    The files are read and written in chunks with non-blocking I/O (see ampl2omt.aio), while parsing, transforming
+    and rendering run in the executor, one output file at a time. Cancelling the awaiting task cancels the token, which
+    stops the conversion as in convert.
+
+    :param input_path: The path of the nl file, possibly compressed, or - for the standard input.
+    :param output_path: The output path, or - for the standard output.
+    :param options: The options.
+    :param executor: The executor running the CPU-heavy phases, the default one of the event loop if None; it must
+        share the memory of the caller, e.g. a ThreadPoolExecutor.
+    :param progress: The progress callback (see convert), called in the threads of the executor.
+    :param token: The cancel token (see convert), a new one if None.
+    :return: The written paths and the messages.
+    """
+    token = token if token is not None else CancelToken()
+    if options.out_of_core is not None:
+        # the streaming writer writes as it renders, in the executor
+        return await run_cancellable(executor, convert, input_path, output_path, options, progress, token=token)
+    loop = asyncio.get_running_loop()
+    mgr = TermManager(canonical=options.canonical)
+    try:
+        problem = await NLParser(mgr).parse_file_async(input_path, executor, progress=progress, token=token)
+        problem, messages = await loop.run_in_executor(executor, prepare, mgr, problem, options)
+        token.check()
+        files = conversion_files(mgr, problem, output_path, options, progress, token)
+        paths = []
+        while (file := await loop.run_in_executor(executor, next, files, None)) is not None:
+            path, parts = file
+            await write_text(path, parts, options.compress)
+            paths.append(path)
+    except asyncio.CancelledError:
+        token.cancel()
+        raise
+    return ConversionResult(paths=paths, messages=messages)
+
+
+def convert_string(text: str, fmt: str, options: ConversionOptions) -> ConversionResult:
+    """
+    Convert the content of an nl file in memory.
+
+    :param text: The content of the nl file.
+    :param fmt: The output format, one of FORMATS.
+    :param options: The options; decomposition and split objectives need files, and are not supported.
+    :return: The output and the messages.
+    """
+    if options.decompose or options.split_objectives is not None:
+        raise ValueError("Decomposition and split objectives write several files, and need an output path")
+    if options.out_of_core is not None:
+        raise ValueError("Out-of-core conversions write files, and need an output path")
+    mgr = TermManager(canonical=options.canonical)
+    problem, messages = prepare(mgr, NLParser(mgr).parse_string(text), options)
+    return ConversionResult(output=render(problem, fmt, options), messages=messages)
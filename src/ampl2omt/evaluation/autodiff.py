@@ -0,0 +1,251 @@
+import math
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from ampl2omt.evaluation.numpy_ops import np, require_numpy
+from ampl2omt.evaluation.tape import Tape
+from ampl2omt.problem.occurrence import SparsityPattern, variable_pattern
+from ampl2omt.problem.problem import NLPProblem
+from ampl2omt.term.term import Term, is_var, is_const
+from ampl2omt.term.types import FLOOR, CEIL, ABS, NEG, TANH, TAN, SQRT, SINH, SIN, LOG10, LOG, EXP, COSH, COS, \
+    ATANH, ATAN, ASINH, ASIN, ACOSH, ACOS, PLUS, MINUS, MULT, DIV, REM, POW, ATAN2, INTDIV, PRECISION, ROUND, TRUNC, \
+    IF, IFS, LT, LE, EQ, GE, GT, MIN, MAX, SUM
+
+# Comparisons, differentiated as the difference of their sides.
+_RELATIONS = {LT, LE, EQ, GE, GT}
+
+
+@dataclass
+class Gradients:
+    """
+    Values and gradients of some terms at a batch of points.
+
+    The jacobian is sparse, over the variables occurring in each term: for constraints, its pattern is the
+    constraint_vars of the OccurrenceIndex of the problem.
+
+    :param values: Array of shape (n_points, n_terms), with the value of each term at each point.
+    :param pattern: The sparsity pattern of the jacobian, one row per term.
+    :param data: Array of shape (n_points, nnz): data[p, pattern.indptr[k] + j] is the partial derivative of term k
+        in the variable pattern.row(k)[j], at point p.
+    """
+    values: Any
+    pattern: SparsityPattern
+    data: Any
+
+    def row(self, k: int) -> tuple[memoryview, Any]:
+        """The variables occurring in term k, and its partial derivatives in them at each point, of shape
+        (n_points, len(variables))."""
+        return self.pattern.row(k), self.data[:, self.pattern.indptr[k]:self.pattern.indptr[k + 1]]
+
+    def dense(self) -> Any:
+        """The jacobian as a dense array of shape (n_points, n_terms, n_vars), e.g. for small problems."""
+        pattern = self.pattern
+        jacobian = np.zeros((self.data.shape[0], pattern.n_rows, pattern.n_cols))
+        rows = np.repeat(np.arange(pattern.n_rows), np.diff(np.asarray(pattern.indptr)))
+        jacobian[:, rows, np.asarray(pattern.indices)] = self.data
+        return jacobian
+
+
+def _pow(v, a, b):
+    # the partial in the exponent is only defined for a positive base (or when the power vanishes)
+    log_a = np.log(np.where(a > 0, a, 1.))
+    return [b * np.power(a, b - 1), np.where(a > 0, v * log_a, np.where(v == 0, 0., np.nan))]
+
+
+def _selected(v, *children):
+    """Partials of min and max: 1 for the first child attaining the value, 0 for the others."""
+    taken = np.zeros(np.shape(v), dtype=bool)
+    partials = []
+    for c in children:
+        selected = (c == v) & ~taken
+        taken = taken | selected
+        partials.append(selected.astype(float))
+    return partials
+
+
+def _if(v, condition, a, b):
+    condition = np.asarray(condition, dtype=bool)
+    return [None, condition.astype(float), (~condition).astype(float)]
+
+
+def _constant(v, *children):
+    return [None] * len(children)
+
+
+def partials() -> dict[int, Callable[..., list]]:
+    """
+    Vectorized partial derivatives of each operator, keyed by term type id.
+
+    Each function gets the value of the node and of its children, and returns the partial derivative of the node with
+    respect to each child, or None where it is identically 0. Operators missing from the table are not differentiable
+    (logical operators and comparisons): no derivative flows through them.
+    """
+    return {
+        # Unary operators
+        FLOOR: _constant,
+        CEIL: _constant,
+        ABS: lambda v, a: [np.sign(a)],
+        NEG: lambda v, a: [-1.],
+        TANH: lambda v, a: [1. - v * v],
+        TAN: lambda v, a: [1. + v * v],
+        SQRT: lambda v, a: [0.5 / v],
+        SINH: lambda v, a: [np.cosh(a)],
+        SIN: lambda v, a: [np.cos(a)],
+        LOG10: lambda v, a: [1. / (a * math.log(10.))],
+        LOG: lambda v, a: [1. / a],
+        EXP: lambda v, a: [v],
+        COSH: lambda v, a: [np.sinh(a)],
+        COS: lambda v, a: [-np.sin(a)],
+        ATANH: lambda v, a: [1. / (1. - a * a)],
+        ATAN: lambda v, a: [1. / (1. + a * a)],
+        ASINH: lambda v, a: [1. / np.sqrt(a * a + 1.)],
+        ASIN: lambda v, a: [1. / np.sqrt(1. - a * a)],
+        ACOSH: lambda v, a: [1. / np.sqrt(a * a - 1.)],
+        ACOS: lambda v, a: [-1. / np.sqrt(1. - a * a)],
+        # Binary operators
+        PLUS: lambda v, a, b: [1., 1.],
+        MINUS: lambda v, a, b: [1., -1.],
+        MULT: lambda v, a, b: [b, a],
+        DIV: lambda v, a, b: [1. / b, -v / b],
+        REM: lambda v, a, b: [1., -np.trunc(a / b)],
+        POW: _pow,
+        ATAN2: lambda v, a, b: [b / (a * a + b * b), -a / (a * a + b * b)],
+        INTDIV: _constant,
+        PRECISION: _constant,
+        ROUND: _constant,
+        TRUNC: _constant,
+        # Conditionals
+        IF: _if,
+        IFS: _if,
+        # N-ary operators
+        MIN: _selected,
+        MAX: _selected,
+        SUM: lambda v, *children: [1.] * len(children),
+    }
+
+
+class ReverseAD:
+    """
+    Reverse-mode automatic differentiation of terms over their shared DAG.
+
+    The DAG is linearized once into a tape. A forward sweep evaluates every node at a batch of points; backward
+    sweeps then propagate the adjoints of chunks of at most max_outputs_per_sweep terms at once, each over the
+    subgraph of the terms of its chunk only, so that the work and memory of a sweep follow the size of its terms
+    rather than that of the whole tape. The jacobian is sparse (see Gradients).
+
+    Comparisons are differentiated as the difference of their sides, e.g. the gradient of a <= b is the one of a - b.
+    Piecewise-constant operators (floor, round, ...) have derivative 0; min, max and if-then-else take the derivative
+    of the selected child. Derivatives are nan where undefined (e.g. sqrt at 0).
+
+    :param variables: The variables, in the order of the columns of the points and of the gradients.
+    :param terms: The terms to differentiate.
+    :param max_outputs_per_sweep: The maximum number of terms differentiated in one backward sweep.
+    """
+
+    def __init__(self, variables: list[Term], terms: list[Term], max_outputs_per_sweep: int = 256):
+        require_numpy()
+        assert max_outputs_per_sweep > 0, "max_outputs_per_sweep must be positive"
+        self.partials = partials()
+        self.n_vars = len(variables)
+        self.max_outputs_per_sweep = max_outputs_per_sweep
+        # each output is a list of (root, sign) seeds
+        self.outputs: list[list[tuple[Term, float]]] = []
+        roots = []
+        for t in terms:
+            if t.term_type.id in _RELATIONS:
+                self.outputs.append([(t.children[0], 1.), (t.children[1], -1.)])
+                roots.extend(t.children)
+            else:
+                self.outputs.append([(t, 1.)])
+                roots.append(t)
+        self.tape = Tape(variables, roots)
+        self.pattern = variable_pattern(variables, terms)
+        # the position in the tape of the variable of each column occurring in the terms
+        self._var_positions = {j: self.tape.index[v] for v, j in self.tape.columns.items() if v in self.tape.index}
+
+    @classmethod
+    def for_constraints(cls, problem: NLPProblem, **kwargs) -> "ReverseAD":
+        """Differentiate the constraints of a problem, as the difference of their sides."""
+        return cls(problem.variables, problem.constraints, **kwargs)
+
+    @classmethod
+    def for_objectives(cls, problem: NLPProblem, **kwargs) -> "ReverseAD":
+        """Differentiate the objectives of a problem."""
+        return cls(problem.variables, [o.term for o in problem.objectives], **kwargs)
+
+    def gradient(self, point) -> tuple[Any, Any]:
+        """
+        Evaluate and differentiate the terms at a single point.
+
+        :param point: Array-like of shape (n_vars,).
+        :return: The values, of shape (n_terms,), and the jacobian, of shape (nnz,), over the sparsity pattern
+            self.pattern (see Gradients).
+        """
+        result = self.gradient_batch(np.asarray(point, dtype=float).reshape(1, -1))
+        return result.values[0], result.data[0]
+
+    def gradient_batch(self, points) -> Gradients:
+        """
+        Evaluate and differentiate the terms at a batch of points.
+
+        :param points: Array-like of shape (n_points, n_vars).
+        :return: The values and the gradients of the terms at each point.
+        """
+        points = self.tape.check_points(points)
+        n_points, n_outputs = points.shape[0], len(self.outputs)
+        values = np.empty((n_points, n_outputs))
+        data = np.zeros((n_points, self.pattern.nnz))
+        with np.errstate(all="ignore"):
+            forward = self.tape.forward(points)
+            for k, seeds in enumerate(self.outputs):
+                values[:, k] = sum(sign * forward[self.tape.index[t]] for t, sign in seeds)
+            for start in range(0, n_outputs, self.max_outputs_per_sweep):
+                stop = min(start + self.max_outputs_per_sweep, n_outputs)
+                self._backward(forward, n_points, start, stop, data)
+        return Gradients(values, self.pattern, data)
+
+    def _backward(self, forward: list, n_points: int, start: int, stop: int, data) -> None:
+        """Propagate the adjoints of outputs start..stop-1 back to the variables, into their rows of data."""
+        tape = self.tape
+        seeds = [tape.index[t] for k in range(start, stop) for t, _ in self.outputs[k]]
+        # the subgraph of the chunk, parents before children (the tape has children before parents)
+        subgraph = set(seeds)
+        stack = list(seeds)
+        while stack:
+            for c in tape.children[stack.pop()]:
+                if c not in subgraph:
+                    subgraph.add(c)
+                    stack.append(c)
+        order = sorted(subgraph, reverse=True)
+        local = {i: j for j, i in enumerate(order)}
+
+        adjoints = np.zeros((len(order), n_points, stop - start))
+        for k in range(start, stop):
+            for t, sign in self.outputs[k]:
+                adjoints[local[tape.index[t]], :, k - start] += sign
+        # set by each node on its children, so that nodes no output depends on are skipped
+        reached = np.zeros(len(order), dtype=bool)
+        reached[[local[i] for i in seeds]] = True
+        for j, i in enumerate(order):
+            node = tape.nodes[i]
+            if not reached[j] or is_var(node) or is_const(node):
+                continue
+            rule = self.partials.get(node.term_type.id)
+            if rule is None:
+                continue
+            children = tape.children[i]
+            derivatives = rule(forward[i], *(forward[c] for c in children))
+            for c, child, d in zip(children, node.children, derivatives):
+                if d is None or is_const(child):
+                    continue
+                # partials are scalars or arrays of shape (n_points,): broadcast them over the outputs
+                adjoints[local[c]] += np.asarray(d, dtype=float)[..., None] * adjoints[j]
+                reached[local[c]] = True
+
+        # the adjoint of the variable of each nonzero of the rows of the chunk, for the output of its row
+        pattern = self.pattern
+        lo, hi = pattern.indptr[start], pattern.indptr[stop]
+        if hi > lo:
+            outputs = np.repeat(np.arange(stop - start), np.diff(np.asarray(pattern.indptr[start:stop + 1])))
+            variables = [local[self._var_positions[v]] for v in pattern.indices[lo:hi]]
+            data[:, lo:hi] = adjoints[variables, :, outputs].T
@@ -0,0 +1,73 @@
+from dataclasses import dataclass
+from typing import Any
+
+from ampl2omt.evaluation.numpy_ops import np, require_numpy, numpy_violations
+from ampl2omt.evaluation.tape import Tape
+from ampl2omt.problem.problem import NLPProblem
+from ampl2omt.term.term import Term
+
+
+@dataclass
+class BatchResult:
+    """
+    The evaluation of a problem at a batch of points.
+
+    :param violations: Array of shape (n_points, n_constraints), with the violation of each constraint at each point
+        (0 if satisfied, inf if undefined).
+    :param objectives: Array of shape (n_points, n_objectives), with the value of each objective at each point.
+    """
+    violations: Any
+    objectives: Any
+
+    def feasible(self, tol: float = 1e-6):
+        """Boolean array of shape (n_points,), telling which points satisfy all constraints up to tol."""
+        return np.all(self.violations <= tol, axis=1)
+
+
+class BatchEvaluator:
+    """
+    Vectorized evaluation of the terms of a problem at many points at once.
+
+    The shared DAG of constraints and objectives is linearized once into a tape; every node is then evaluated once per
+    batch, with NumPy ufuncs over arrays of shape (n_points,).
+
+    :param problem: The problem to evaluate. Points assign values to its variables, in order.
+    """
+
+    def __init__(self, problem: NLPProblem):
+        require_numpy()
+        self.violations = numpy_violations()
+        self.constraints = list(problem.constraints)
+        self.objectives = [o.term for o in problem.objectives]
+        # relational constraints are not evaluated themselves: their violation is computed from their sides
+        roots = []
+        for c in self.constraints:
+            roots.extend(c.children if c.term_type.id in self.violations else (c,))
+        self.tape = Tape(problem.variables, roots + self.objectives)
+
+    def evaluate(self, points) -> BatchResult:
+        """
+        Evaluate constraints and objectives at a batch of points.
+
+        :param points: Array-like of shape (n_points, n_vars).
+        :return: The constraint violations and objective values at each point.
+        """
+        points = self.tape.check_points(points)
+        n_points = points.shape[0]
+        with np.errstate(all="ignore"):
+            values = self.tape.forward(points)
+            violations = np.empty((n_points, len(self.constraints)))
+            for j, c in enumerate(self.constraints):
+                violations[:, j] = self._violation(c, values)
+            objectives = np.empty((n_points, len(self.objectives)))
+            for k, o in enumerate(self.objectives):
+                objectives[:, k] = values[self.tape.index[o]]
+        return BatchResult(violations, objectives)
+
+    def _violation(self, constraint: Term, values: list):
+        type_id = constraint.term_type.id
+        if type_id in self.violations:
+            left, right = (values[self.tape.index[c]] for c in constraint.children)
+            return self.violations[type_id](left, right)
+        return self.violations[None](values[self.tape.index[constraint]])
+
@@ -0,0 +1,278 @@
+import math
+from collections import Counter
+from typing import Any, Callable
+
+from ampl2omt.term.term import Term, topo_sort_all, is_var, is_const
+from ampl2omt.term.types import FLOOR, CEIL, ABS, NEG, TANH, TAN, SQRT, SINH, SIN, LOG10, LOG, EXP, COSH, COS, \
+    ATANH, ATAN, ASINH, ASIN, ACOSH, ACOS, PLUS, MINUS, MULT, DIV, REM, POW, ATAN2, INTDIV, PRECISION, ROUND, TRUNC, \
+    NOT, OR, AND, IF, IFS, IMPLIES, IFF, ANDN, ORN, LT, LE, EQ, GE, GT, NE, MIN, MAX, SUM, COUNT, NUMBEROF, \
+    ALLDIFF, REAL, INT
+
+# Deepest expression inlined in the generated code, before it is bound to a local variable.
+MAX_INLINE_DEPTH = 32
+
+
+def _round(a: float, n: float) -> float:
+    return round(a, int(n))
+
+
+def _trunc(a: float, n: float) -> float:
+    scale = 10. ** n
+    return math.trunc(a * scale) / scale
+
+
+def _precision(a: float, n: float) -> float:
+    return float(f"{a:.{int(n)}g}")
+
+
+def _violation(v: float) -> float:
+    return math.inf if math.isnan(v) else v
+
+
+def _safe(fn: Callable[..., float]) -> Callable[..., float]:
+    """Wrap a partial function so that it returns nan outside its domain, instead of raising."""
+
+    def call(*args):
+        try:
+            return fn(*args)
+        except (ValueError, ZeroDivisionError, OverflowError):
+            return math.nan
+
+    return call
+
+
+def _join(op: str) -> Callable[..., str]:
+    return lambda *children: f"({f' {op} '.join(children)})"
+
+
+def _call(fn: str) -> Callable[..., str]:
+    return lambda *children: f"{fn}({', '.join(children)})"
+
+
+# Functions that may raise on floats, called through the _f{id} globals: these are bound to the plain functions in
+# the fast version of the generated code, and to nan-returning wrappers in the safe version.
+_PARTIAL: dict[int, Callable[..., float]] = {
+    TANH: math.tanh,
+    TAN: math.tan,
+    SQRT: math.sqrt,
+    SINH: math.sinh,
+    SIN: math.sin,
+    LOG10: math.log10,
+    LOG: math.log,
+    EXP: math.exp,
+    COSH: math.cosh,
+    COS: math.cos,
+    ATANH: math.atanh,
+    ATAN: math.atan,
+    ASINH: math.asinh,
+    ASIN: math.asin,
+    ACOSH: math.acosh,
+    ACOS: math.acos,
+    ATAN2: math.atan2,
+    DIV: lambda a, b: a / b,
+    REM: math.fmod,
+    POW: math.pow,
+    INTDIV: lambda a, b: float(math.trunc(a / b)),
+    PRECISION: _precision,
+    ROUND: _round,
+    TRUNC: _trunc,
+    FLOOR: lambda a: float(math.floor(a)),
+    CEIL: lambda a: float(math.ceil(a)),
+}
+
+# Python source of each operator, given the source of its children, keyed by term type id.
+_TEMPLATES: dict[int, Callable[..., str]] = {
+    ABS: _call("abs"),
+    NEG: lambda a: f"(-{a})",
+    PLUS: _join("+"),
+    MINUS: _join("-"),
+    MULT: _join("*"),
+    NOT: lambda a: f"(not {a})",
+    OR: _join("or"),
+    AND: _join("and"),
+    IF: lambda c, a, b: f"({a} if {c} else {b})",
+    IFS: lambda c, a, b: f"({a} if {c} else {b})",
+    IMPLIES: lambda a, b: f"((not {a}) or {b})",
+    IFF: lambda a, b: f"(bool({a}) == bool({b}))",
+    ANDN: _join("and"),
+    ORN: _join("or"),
+    LT: _join("<"),
+    LE: _join("<="),
+    EQ: _join("=="),
+    GE: _join(">="),
+    GT: _join(">"),
+    NE: _join("!="),
+    MIN: lambda *children: f"min(({', '.join(children)},))",
+    MAX: lambda *children: f"max(({', '.join(children)},))",
+    SUM: _join("+"),
+    COUNT: lambda *children: f"({' + '.join(f'bool({c})' for c in children)})",
+    NUMBEROF: lambda value, *children: f"({' + '.join(f'({c} == {value})' for c in children)})",
+    ALLDIFF: lambda *children: f"(len({{{', '.join(children)}}}) == {len(children)})",
+}
+_TEMPLATES.update({type_id: _call(f"_f{type_id}") for type_id in _PARTIAL})
+
+# Violation of a constraint, given the source of its sides (comparisons) or of its value (key None).
+_VIOLATIONS: dict[int | None, Callable[..., str]] = {
+    LT: lambda a, b: f"_violation(max(0., {a} - {b}))",
+    LE: lambda a, b: f"_violation(max(0., {a} - {b}))",
+    EQ: lambda a, b: f"_violation(abs({a} - {b}))",
+    GE: lambda a, b: f"_violation(max(0., {b} - {a}))",
+    GT: lambda a, b: f"_violation(max(0., {b} - {a}))",
+    None: lambda value: f"(0. if {value} else 1.)",
+}
+
+
+class CompiledFunction:
+    """
+    A function evaluating a list of terms at a point, compiled to Python code.
+
+    The function takes a sequence with the values of the variables and returns a tuple with the value of each term.
+    In batch mode, it takes an array of shape (n_points, n_vars) and returns an array of shape (n_points, n_terms).
+    Evaluation outside the domain of an operator (e.g. log of a negative number) gives nan.
+
+    :param source: The generated Python source code, for inspection.
+    """
+
+    def __init__(self, source: str, n_outputs: int, fast: Callable, safe: Callable | None = None):
+        self.source = source
+        self.n_outputs = n_outputs
+        self._fast = fast
+        self._safe = safe
+
+    @property
+    def batch(self) -> bool:
+        return self._safe is None
+
+    def __call__(self, x) -> Any:
+        if self.batch:
+            return self._call_batch(x)
+        try:
+            return self._fast(x)
+        except (ValueError, ZeroDivisionError, OverflowError):
+            # rare: re-evaluate with functions returning nan outside their domain
+            return self._safe(x)
+
+    def _call_batch(self, x) -> Any:
+        from ampl2omt.evaluation.numpy_ops import np
+        x = np.asarray(x, dtype=float)
+        result = np.empty((x.shape[0], self.n_outputs))
+        with np.errstate(all="ignore"):
+            for k, value in enumerate(self._fast(x)):
+                result[:, k] = value
+        return result
+
+
+def compile_terms(variables: list[Term], terms: list[Term], violations: bool = False,
+                  batch: bool = False) -> CompiledFunction:
+    """
+    Compile terms to a Python function of the variables.
+
+    Shared subterms (and overly deep expressions) are bound to local variables, so they are evaluated once.
+
+    :param variables: The variables, in the order of the values passed to the function.
+    :param terms: The terms to evaluate.
+    :param violations: Whether terms are constraints, and their violation should be computed instead of their value.
+        The violation is 0 if the constraint is satisfied, a positive amount otherwise, inf if undefined.
+    :param batch: Whether to generate NumPy code evaluating a batch of points.
+    :return: The compiled function.
+    """
+    columns = {v: i for i, v in enumerate(variables)}
+    roots = []
+    for t in terms:
+        if violations and t.term_type.id in _VIOLATIONS:
+            roots.extend(t.children)
+        else:
+            roots.append(t)
+
+    order = list(topo_sort_all(roots))
+    parents = Counter(c for node in order for c in node.children)
+    parents.update(roots)
+
+    lines = []
+    expressions: dict[Term, str] = {}
+    depths: dict[Term, int] = {}
+    for node in order:
+        if is_var(node):
+            if node not in columns:
+                raise ValueError(f"Variable {node.payload} is not a problem variable")
+            name = f"v{columns[node]}"
+            lines.append(f"{name} = x[:, {columns[node]}]" if batch else f"{name} = x[{columns[node]}]")
+            expressions[node], depths[node] = name, 0
+        elif is_const(node):
+            expressions[node], depths[node] = _literal(node), 0
+        else:
+            expression = _expression(node, [expressions[c] for c in node.children], batch)
+            depth = 1 + max(depths[c] for c in node.children)
+            if parents[node] > 1 or depth > MAX_INLINE_DEPTH:
+                name = f"t{len(lines)}"
+                lines.append(f"{name} = {expression}")
+                expression, depth = name, 0
+            expressions[node], depths[node] = expression, depth
+
+    outputs = []
+    for t in terms:
+        if not violations:
+            outputs.append(expressions[t])
+        elif t.term_type.id in _VIOLATIONS:
+            outputs.append(_violation_source(t.term_type.id, [expressions[c] for c in t.children], batch))
+        else:
+            outputs.append(_violation_source(None, [expressions[t]], batch))
+
+    body = "".join(f"    {line}\n" for line in lines)
+    returned = "".join(f"{o}, " for o in outputs)
+    source = f"def f(x):\n{body}    return ({returned})\n"
+    if batch:
+        return CompiledFunction(source, len(outputs), _exec(source, _batch_globals()))
+    fast = _exec(source, _math_globals(safe=False))
+    safe = _exec(source, _math_globals(safe=True))
+    return CompiledFunction(source, len(outputs), fast, safe)
+
+
+def _literal(node: Term) -> str:
+    if node.term_type.id not in (REAL, INT):
+        return repr(bool(node.payload))
+    value = float(node.payload)
+    return repr(value) if math.isfinite(value) else f"float('{value}')"
+
+
+def _expression(node: Term, children: list[str], batch: bool) -> str:
+    type_id = node.term_type.id
+    if batch:
+        return _call(f"_f{type_id}")(*children)
+    exponent = node.children[1] if type_id == POW else None
+    if exponent is not None and is_const(exponent) and float(exponent.payload).is_integer() and exponent.payload >= 0:
+        # much faster than math.pow, and only raises on overflow (the safe version then falls back to math.pow)
+        return f"_ipow({children[0]}, {int(exponent.payload)})"
+    if type_id not in _TEMPLATES:
+        raise ValueError(f"Cannot compile operator {node.term_type.name}")
+    return _TEMPLATES[type_id](*children)
+
+
+def _violation_source(type_id: int | None, children: list[str], batch: bool) -> str:
+    if batch:
+        return _call(f"_v{type_id}")(*children)
+    return _VIOLATIONS[type_id](*children)
+
+
+def _ipow(a: float, k: int) -> float:
+    return a ** k
+
+
+def _math_globals(safe: bool) -> dict[str, Any]:
+    namespace = {"math": math, "_violation": _violation, "_ipow": _safe(math.pow) if safe else _ipow}
+    for type_id, fn in _PARTIAL.items():
+        namespace[f"_f{type_id}"] = _safe(fn) if safe else fn
+    return namespace
+
+
+def _batch_globals() -> dict[str, Any]:
+    from ampl2omt.evaluation.numpy_ops import require_numpy, numpy_ops, numpy_violations
+    require_numpy()
+    namespace: dict[str, Any] = {f"_f{type_id}": fn for type_id, fn in numpy_ops().items()}
+    namespace.update({f"_v{type_id}": fn for type_id, fn in numpy_violations().items()})
+    return namespace
+
+
+def _exec(source: str, namespace: dict[str, Any]) -> Callable:
+    exec(compile(source, "<ampl2omt-compiled>", "exec"), namespace)
+    return namespace["f"]
@@ -0,0 +1,126 @@
+from functools import reduce
+from typing import Any, Callable
+
+from ampl2omt.term.types import FLOOR, CEIL, ABS, NEG, TANH, TAN, SQRT, SINH, SIN, LOG10, LOG, EXP, COSH, COS, \
+    ATANH, ATAN, ASINH, ASIN, ACOSH, ACOS, PLUS, MINUS, MULT, DIV, REM, POW, ATAN2, INTDIV, PRECISION, ROUND, TRUNC, \
+    NOT, OR, AND, IF, IFS, IMPLIES, IFF, ANDN, ORN, LT, LE, EQ, GE, GT, NE, MIN, MAX, SUM, COUNT, NUMBEROF, \
+    ALLDIFF
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+def require_numpy():
+    if np is None:
+        raise ImportError("NumPy is required for batch evaluation: pip install ampl2omt[numpy]")
+    return np
+
+
+def _round(a, n):
+    scale = 10. ** n
+    return np.round(a * scale) / scale
+
+
+def _trunc(a, n):
+    scale = 10. ** n
+    return np.trunc(a * scale) / scale
+
+
+def _precision(a, n):
+    magnitude = np.floor(np.log10(np.abs(np.where(a == 0, 1., a))))
+    return _round(a, n - 1 - magnitude)
+
+
+def _alldiff(*children):
+    result = True
+    for i in range(len(children)):
+        for j in range(i + 1, len(children)):
+            result = result & (children[i] != children[j])
+    return result
+
+
+def numpy_ops() -> dict[int, Callable[..., Any]]:
+    """Vectorized implementation of each operator, keyed by term type id."""
+    return {
+        # Unary operators
+        FLOOR: np.floor,
+        CEIL: np.ceil,
+        ABS: np.abs,
+        NEG: np.negative,
+        TANH: np.tanh,
+        TAN: np.tan,
+        SQRT: np.sqrt,
+        SINH: np.sinh,
+        SIN: np.sin,
+        LOG10: np.log10,
+        LOG: np.log,
+        EXP: np.exp,
+        COSH: np.cosh,
+        COS: np.cos,
+        ATANH: np.arctanh,
+        ATAN: np.arctan,
+        ASINH: np.arcsinh,
+        ASIN: np.arcsin,
+        ACOSH: np.arccosh,
+        ACOS: np.arccos,
+        # Binary operators
+        PLUS: np.add,
+        MINUS: np.subtract,
+        MULT: np.multiply,
+        DIV: np.true_divide,
+        REM: np.fmod,
+        POW: np.power,
+        ATAN2: np.arctan2,
+        INTDIV: lambda a, b: np.trunc(np.true_divide(a, b)),
+        PRECISION: _precision,
+        ROUND: _round,
+        TRUNC: _trunc,
+        # Logical operators
+        NOT: np.logical_not,
+        OR: np.logical_or,
+        AND: np.logical_and,
+        IF: np.where,
+        IFS: np.where,
+        IMPLIES: lambda a, b: np.logical_or(np.logical_not(a), b),
+        IFF: np.equal,
+        ANDN: lambda *children: reduce(np.logical_and, children),
+        ORN: lambda *children: reduce(np.logical_or, children),
+        # Comparison operators
+        LT: np.less,
+        LE: np.less_equal,
+        EQ: np.equal,
+        GE: np.greater_equal,
+        GT: np.greater,
+        NE: np.not_equal,
+        # N-ary operators
+        MIN: lambda *children: reduce(np.minimum, children),
+        MAX: lambda *children: reduce(np.maximum, children),
+        SUM: lambda *children: reduce(np.add, children),
+        COUNT: lambda *children: reduce(np.add, (np.asarray(c, dtype=float) for c in children)),
+        NUMBEROF: lambda value, *children: reduce(np.add, (np.asarray(c == value, dtype=float) for c in children),
+                                                  0.),
+        ALLDIFF: _alldiff,
+    }
+
+
+def _undefined_as_infinite(violation):
+    return np.where(np.isnan(violation), np.inf, violation)
+
+
+def numpy_violations() -> dict[int | None, Callable[..., Any]]:
+    """
+    Vectorized violation of constraints: 0 if satisfied, a positive amount otherwise, inf if undefined.
+
+    Comparisons, keyed by term type id, get the values of their sides; any other constraint (key None) gets its
+    boolean value.
+    """
+    return {
+        LT: lambda a, b: _undefined_as_infinite(np.maximum(0., np.subtract(a, b))),
+        LE: lambda a, b: _undefined_as_infinite(np.maximum(0., np.subtract(a, b))),
+        EQ: lambda a, b: _undefined_as_infinite(np.abs(np.subtract(a, b))),
+        GE: lambda a, b: _undefined_as_infinite(np.maximum(0., np.subtract(b, a))),
+        GT: lambda a, b: _undefined_as_infinite(np.maximum(0., np.subtract(b, a))),
+        None: lambda value: np.where(value, 0., 1.),
+    }
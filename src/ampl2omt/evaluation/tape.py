@@ -0,0 +1,60 @@
+from typing import Any, Callable
+
+from ampl2omt.evaluation.numpy_ops import np, require_numpy, numpy_ops
+from ampl2omt.term.term import Term, topo_sort_all, is_var, is_const
+
+
+class Tape:
+    """
+    The shared DAG of some terms, linearized in topological order (children before parents).
+
+    Node i is nodes[i], and its children are at positions children[i] of the tape.
+
+    :param variables: The variables, in the order of the columns of the evaluated points.
+    :param roots: The terms to linearize.
+    """
+
+    def __init__(self, variables: list[Term], roots: list[Term]):
+        require_numpy()
+        self.ops: dict[int, Callable[..., Any]] = numpy_ops()
+        self.columns = {v: i for i, v in enumerate(variables)}
+        self.nodes: list[Term] = []
+        self.children: list[tuple[int, ...]] = []
+        self.index: dict[Term, int] = {}
+        for node in topo_sort_all(roots):
+            if is_var(node):
+                if node not in self.columns:
+                    raise ValueError(f"Variable {node.payload} is not a problem variable")
+            elif not is_const(node) and node.term_type.id not in self.ops:
+                raise ValueError(f"Cannot evaluate operator {node.term_type.name}")
+            self.index[node] = len(self.nodes)
+            self.nodes.append(node)
+            self.children.append(tuple(self.index[c] for c in node.children))
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def check_points(self, points) -> Any:
+        """Convert points to a float array of shape (n_points, n_vars)."""
+        points = np.asarray(points, dtype=float)
+        if points.ndim != 2 or points.shape[1] != len(self.columns):
+            raise ValueError(f"Expected points of shape (n_points, {len(self.columns)}), got {points.shape}")
+        return points
+
+    def forward(self, points) -> list:
+        """
+        Evaluate every node of the tape once, at a batch of points.
+
+        :param points: Array of shape (n_points, n_vars).
+        :return: The value of each node: an array of shape (n_points,), or a scalar for constants.
+        """
+        values = []
+        ops = self.ops
+        for node, children in zip(self.nodes, self.children):
+            if is_var(node):
+                values.append(points[:, self.columns[node]])
+            elif is_const(node):
+                values.append(node.payload)
+            else:
+                values.append(ops[node.term_type.id](*(values[c] for c in children)))
+        return values
@@ -0,0 +1,95 @@
+import dataclasses
+from dataclasses import dataclass, field
+
+# The options of the conversions and their values, without importing the converter, so that the command line can
+# parse its arguments and delegate to a server (see ampl2omt.client) without paying for it.
+
+# Output formats, named after the extensions of the output paths; any other extension is written as SMT-LIB.
+SMTLIB_FORMAT = "smt2"
+NL_FORMAT = "nl"
+MPS_FORMAT = "mps"
+LP_FORMAT = "lp"
+FORMATS = (SMTLIB_FORMAT, NL_FORMAT, MPS_FORMAT, LP_FORMAT)
+
+# Rules of the Normalizer (see ampl2omt.transform.normalize).
+POW_RULE = "pow"
+SQRT_RULE = "sqrt"
+LOG10_RULE = "log10"
+ABS_RULE = "abs"
+MINMAX_RULE = "minmax"
+NEG_RULE = "neg"
+
+ALL_RULES = (POW_RULE, SQRT_RULE, LOG10_RULE, ABS_RULE, MINMAX_RULE, NEG_RULE)
+
+# Strategies choosing the points of the TangentCuts (see ampl2omt.transform.cuts).
+GUESS_POINT = "guess"
+MIDPOINT_POINT = "midpoint"
+SAMPLE_POINT = "sample"
+
+ALL_POINTS = (GUESS_POINT, MIDPOINT_POINT, SAMPLE_POINT)
+
+# Modes of writing one script per objective (see ampl2omt.writing.fanout).
+# Each objective file is a complete script: the preamble followed by the objective.
+CONCAT_MODE = "concat"
+# The preamble is written once; objective files only hold the objective, to be appended to the preamble.
+SPLIT_MODE = "split"
+
+MODES = (CONCAT_MODE, SPLIT_MODE)
+
+
+@dataclass
+class ConversionOptions:
+    """The options of a conversion, one per command-line option (see ampl2omt.cli)."""
+    daggify: bool = False
+    canonical: bool = False
+    logic: str | None = None
+    report: bool = False
+    # comma-separated normalization rules, no normalization if None
+    normalize: str | None = None
+    fbbt: bool = False
+    fbbt_max_iter: int = 10
+    fbbt_time_limit: float | None = None
+    cuts: int = 0
+    cut_points: str = f"{GUESS_POINT},{MIDPOINT_POINT}"
+    pwl: float | None = None
+    pwl_max_segments: int = 64
+    warm_start: bool = False
+    decompose: bool = False
+    split_objectives: str | None = None
+    relax_nonlinear: bool = False
+    # the output format, given by the extension of the output path if None
+    format: str | None = None
+    # the compression of the output, given by the extension of the output path if None
+    compress: str | None = None
+    # the directory of the disk-backed term store (see MappedTermManager), terms in memory if None
+    out_of_core: str | None = None
+
+    @classmethod
+    def from_dict(cls, options: dict) -> 'ConversionOptions':
+        """
+        Create options from a dictionary, e.g. decoded from JSON.
+
+        :param options: The values of the options, by name; missing options take their default value.
+        :return: The options.
+        """
+        names = {f.name for f in dataclasses.fields(cls)}
+        unknown = [name for name in options if name not in names]
+        if unknown:
+            raise ValueError(f"Unknown conversion option: {unknown[0]}")
+        return cls(**options)
+
+    @classmethod
+    def from_args(cls, args) -> 'ConversionOptions':
+        """Create options from the parsed command-line arguments."""
+        return cls(**{f.name: getattr(args, f.name) for f in dataclasses.fields(cls)})
+
+
+@dataclass
+class ConversionResult:
+    """
+    The result of a conversion: the written paths (for file conversions) or the output (for in-memory ones), and the
+    messages for the user, e.g. the degree report.
+    """
+    paths: list[str] = field(default_factory=list)
+    output: str | None = None
+    messages: list[str] = field(default_factory=list)
@@ -1,5 +1,5 @@
 from ampl2omt.problem.objective import Objective
-from ampl2omt.problem.problem import NLPProblem
+from ampl2omt.problem.problem import NLPProblem, range_constraints
 from ampl2omt.term.manager import TermManager
 from ampl2omt.term.term import Term, is_const
 
@@ -20,9 +20,14 @@ class ProblemBuilder:
 
         self.cons_body: dict[int, Term] = {}
         self.obj: dict[int, Objective] = {}
+        # linear parts of the constraints and objectives (J and G segments): (variable index, coefficient) pairs
+        self.cons_linear: dict[int, list[tuple[int, float]]] = {}
+        self.obj_linear: dict[int, list[tuple[int, float]]] = {}
         self.cons_ranges: dict[int, tuple[float | None, float | None]] = {}
         self.var_ranges: dict[int, tuple[float | None, float | None]] = {}
         self.lns: list[Term] = []
+        self.primal_initial_guess: dict[int, float] = {}
+        self.dual_initial_guess: dict[int, float] = {}
 
     def __repr__(self):
         return (f"ProblemBuilder("
@@ -36,9 +41,13 @@ class ProblemBuilder:
                 f"\tdefined_vars=\n\t\t{'\n\t\t'.join(map(str, self.defined_vars.values()))},\n"
                 f"\tcons_body=\n\t\t{'\n\t\t'.join(map(str, self.cons_body.values()))},\n"
                 f"\tobj=\n\t\t{'\n\t\t'.join(map(str, self.obj.values()))},\n"
+                f"\tcons_linear={self.cons_linear},\n"
+                f"\tobj_linear={self.obj_linear},\n"
                 f"\tcons_ranges={self.cons_ranges.values()},\n"
                 f"\tvar_ranges={self.var_ranges.values()},\n"
-                f"\tlns={self.lns})")
+                f"\tlns={self.lns},\n"
+                f"\tprimal_initial_guess={self.primal_initial_guess},\n"
+                f"\tdual_initial_guess={self.dual_initial_guess})")
 
     def with_n_vars(self, n_vars: int):
         self.n_vars = n_vars
@@ -102,6 +111,16 @@ class ProblemBuilder:
         self.obj[i] = obj
         return self
 
+    def with_cons_linear_term(self, i: int, j: int, coefficient: float):
+        assert 0 <= i < self.n_cons, f"Constraint {i} not defined"
+        self.cons_linear.setdefault(i, []).append((j, coefficient))
+        return self
+
+    def with_obj_linear_term(self, i: int, j: int, coefficient: float):
+        assert 0 <= i < self.n_obj, f"Objective {i} not defined"
+        self.obj_linear.setdefault(i, []).append((j, coefficient))
+        return self
+
     def with_cons_range(self, i: int, lower: float | None, upper: float | None):
         self.cons_ranges[i] = (lower, upper)
         return self
@@ -110,36 +129,47 @@ class ProblemBuilder:
         self.var_ranges[i] = (lower, upper)
         return self
 
+    def with_primal_initial_guess(self, i: int, value: float):
+        assert 0 <= i < self.n_vars, f"Variable {i} not defined"
+        self.primal_initial_guess[i] = value
+        return self
+
+    def with_dual_initial_guess(self, i: int, value: float):
+        assert 0 <= i < self.n_cons, f"Constraint {i} not defined"
+        self.dual_initial_guess[i] = value
+        return self
+
     def build_problem(self) -> NLPProblem:
         self._check_integrity()
+        cons_bodies = {i: self._with_linear(body, self.cons_linear.get(i, [])) for i, body in self.cons_body.items()}
+        objectives = [Objective(o.kind, self._with_linear(o.term, self.obj_linear.get(i, [])))
+                      for i, o in self.obj.items()]
         constraints = []
         for i, (lower, upper) in self.var_ranges.items():
-            vi = self.get_problem_var(i)
-            self._add_constraints(vi, lower, upper, constraints)
+            constraints.extend(range_constraints(self.mgr, self.get_problem_var(i), lower, upper))
 
         for i, (lower, upper) in self.cons_ranges.items():
-            ci = self.get_cons_body(i)
-            self._add_constraints(ci, lower, upper, constraints)
+            constraints.extend(range_constraints(self.mgr, cons_bodies[i], lower, upper))
 
         return NLPProblem(
             variables=list(self.problem_vars.values()),
-            objectives=list(self.obj.values()),
+            objectives=objectives,
             constraints=constraints,
+            primal_initial_guess=dict(self.primal_initial_guess),
+            dual_initial_guess=dict(self.dual_initial_guess),
+            var_ranges=dict(self.var_ranges),
+            cons_bodies=cons_bodies,
+            cons_ranges=dict(self.cons_ranges),
         )
 
-    def _add_constraints(self, vi, lower, upper, constraints):
-        if is_const(vi):
-            # The constraint has been simplified out (not sure)
-            return
-        if lower is None and upper is None:
-            return
-        if lower == upper:
-            constraints.append(self.mgr.Eq(vi, self.mgr.Real(lower)))
-        else:
-            if lower is not None:
-                constraints.append(self.mgr.Ge(vi, self.mgr.Real(lower)))
-            if upper is not None:
-                constraints.append(self.mgr.Le(vi, self.mgr.Real(upper)))
+    def _with_linear(self, term: Term, linear: list[tuple[int, float]]) -> Term:
+        """Add the linear part of a constraint or objective to its nonlinear part, as in the V segments."""
+        addends = [self.mgr.Mult(self.get_problem_var(j), self.mgr.Real(c)) for j, c in linear if c != 0]
+        if not addends:
+            return term
+        if is_const(term) and term.payload == 0:
+            return addends[0] if len(addends) == 1 else self.mgr.Sum(addends)
+        return self.mgr.Sum(addends + [term])
 
     def _check_integrity(self):
         assert len(self.problem_vars) == self.n_vars, f"Expected {self.n_vars} variables, got {len(self.problem_vars)}"
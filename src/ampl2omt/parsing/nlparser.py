@@ -1,11 +1,15 @@
 import io
 import os
 from collections.abc import Callable
+from concurrent.futures import Executor
 
+from ampl2omt.aio import read_text, run_cancellable, CHUNK_SIZE
 from ampl2omt.parsing.builder import ProblemBuilder
 from ampl2omt.parsing.stream import LineStream
 from ampl2omt.problem.objective import Objective
 from ampl2omt.problem.problem import NLPProblem
+from ampl2omt.progress import CancelToken, Monitor, ProgressCallback, PARSE
+from ampl2omt.streams import open_input, compression_of, strip_compression, STDIO
 from ampl2omt.term.manager import TermManager
 from ampl2omt.term.term import Term
 
@@ -18,40 +22,89 @@ class NLParser:
     def __init__(self, term_manager: TermManager):
         self.term_manager = term_manager
 
-    def parse_file(self, path: str) -> NLPProblem:
+    def parse_file(self, path: str, progress: ProgressCallback | None = None,
+                   token: CancelToken | None = None) -> NLPProblem:
         """
-        Parse an NLP problem from a file.
+        Parse an NLP problem from a file, possibly compressed (e.g. .nl.gz), decompressing it on the fly.
 
-        :param path: The path to the file.
+        :param path: The path to the file, or - for the standard input.
+        :param progress: The progress callback (see parse_stream).
+        :param token: The cancel token (see parse_stream).
         :return: The parsed NLP problem.
         """
-        if not os.path.exists(path):
-            raise FileNotFoundError(f"File not found: {path}")
+        self._check_path(path)
+        # the size of compressed files and streams tells nothing of the text to parse
+        total_bytes = os.path.getsize(path) if path != STDIO and compression_of(path) is None else None
+        with open_input(path) as file:
+            return self._parse(file, self._monitor(progress, token, total_bytes))
+
+    async def parse_file_async(self, path: str, executor: Executor | None = None, chunk_size: int = CHUNK_SIZE,
+                               progress: ProgressCallback | None = None,
+                               token: CancelToken | None = None) -> NLPProblem:
+        """
+        Parse an NLP problem from a file as parse_file, without blocking the event loop.
+
+        The file is read in chunks with non-blocking I/O (see ampl2omt.aio.read_text), then parsed in the executor.
+        Cancelling the awaiting task stops the parse at the next segment of the file, or within CHECK_INTERVAL lines.
 
-        if not path.endswith(".nl"):
-            raise ValueError("File is not a .nl file")
+        :param path: The path to the file, or - for the standard input.
+        :param executor: The executor running the parse, the default one of the event loop if None; it must share
+            the memory of the caller, e.g. a ThreadPoolExecutor.
+        :param chunk_size: The number of characters read at a time.
+        :param progress: The progress callback (see parse_stream), called in the thread of the executor.
+        :param token: The cancel token (see parse_stream), cancelled as well if the awaiting task is.
+        :return: The parsed NLP problem.
+        """
+        self._check_path(path)
+        text = await read_text(path, chunk_size=chunk_size)
+        return await run_cancellable(executor, self.parse_string, text, progress, token=token)
 
-        with open(path, "r") as file:
-            return self.parse_stream(file)
+    @staticmethod
+    def _check_path(path: str) -> None:
+        if path != STDIO:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"File not found: {path}")
 
-    def parse_string(self, string: str) -> NLPProblem:
+            if not strip_compression(path).endswith(".nl"):
+                raise ValueError("File is not a .nl file")
+
+    def parse_string(self, string: str, progress: ProgressCallback | None = None,
+                     token: CancelToken | None = None) -> NLPProblem:
         """
         Parse an NLP problem from a string.
 
         :param string: The string to parse.
+        :param progress: The progress callback (see parse_stream).
+        :param token: The cancel token (see parse_stream).
         :return: The parsed NLP problem.
         """
-        return self.parse_stream(io.StringIO(string))
+        return self._parse(io.StringIO(string), self._monitor(progress, token, len(string)))
 
-    def parse_stream(self, stream: io.TextIOBase) -> NLPProblem:
+    def parse_stream(self, stream: io.TextIOBase, progress: ProgressCallback | None = None,
+                     token: CancelToken | None = None) -> NLPProblem:
         """
         Parse an NLP problem from a stream.
 
         :param stream: The stream to parse.
+        :param progress: The progress callback, given the bytes consumed, the segments parsed and the terms interned
+            every CHECK_INTERVAL lines and at the end (see ampl2omt.progress).
+        :param token: The cancel token, checked after each segment and every CHECK_INTERVAL lines: the parse raises
+            concurrent.futures.CancelledError if it was cancelled, TimeoutError if its deadline passed.
         :return: The parsed NLP problem.
         """
+        return self._parse(stream, self._monitor(progress, token))
+
+    def _monitor(self, progress: ProgressCallback | None, token: CancelToken | None,
+                 total_bytes: int | None = None) -> Monitor | None:
+        if progress is None and token is None:
+            return None
+        start = len(self.term_manager)
+        return Monitor(PARSE, progress, token, total_bytes=total_bytes,
+                       count_nodes=lambda: len(self.term_manager) - start)
+
+    def _parse(self, stream: io.TextIOBase, monitor: Monitor | None) -> NLPProblem:
         builder = ProblemBuilder(self.term_manager)
-        line_stream = LineStream(stream)
+        line_stream = LineStream(stream, monitor)
         try:
             self.parse_header(line_stream, builder)
         except EOFError:
@@ -61,8 +114,12 @@ class NLParser:
                 self.parse_segment(line_stream, builder)
             except EOFError:
                 break
-
-        return builder.build_problem()
+            if monitor is not None:
+                monitor.segment()
+        problem = builder.build_problem()
+        if monitor is not None:
+            monitor.report()
+        return problem
 
     def parse_header(self, line_stream: LineStream, problem_builder: ProblemBuilder) -> None:
         # line 1
@@ -118,9 +175,9 @@ class NLParser:
             case "O":
                 self.parse_objective_segment(line, line_stream, problem_builder)
             case "d":
-                self.parse_dual_initial_guess_segment(line, line_stream)
+                self.parse_dual_initial_guess_segment(line, line_stream, problem_builder)
             case "x":
-                self.parse_primal_initial_guess_segment(line, line_stream)
+                self.parse_primal_initial_guess_segment(line, line_stream, problem_builder)
             case "r":
                 self.parse_range_segment(line_stream, problem_builder)
             case "b":
@@ -212,17 +269,24 @@ class NLParser:
         obj = Objective(kind, expr)
         problem_builder.with_obj(i, obj)
 
-    def parse_dual_initial_guess_segment(self, line: str, line_stream: LineStream):
-        self._parse_initial_guess(line, line_stream)
+    def parse_dual_initial_guess_segment(self, line: str, line_stream: LineStream, problem_builder: ProblemBuilder):
+        self._parse_initial_guess(line, line_stream, problem_builder.with_dual_initial_guess)
 
-    def parse_primal_initial_guess_segment(self, line: str, line_stream: LineStream):
-        self._parse_initial_guess(line, line_stream)
+    def parse_primal_initial_guess_segment(self, line: str, line_stream: LineStream,
+                                           problem_builder: ProblemBuilder):
+        self._parse_initial_guess(line, line_stream, problem_builder.with_primal_initial_guess)
 
-    def _parse_initial_guess(self, line: str, line_stream: LineStream):
+    def _parse_initial_guess(self, line: str, line_stream: LineStream, add_guess_fn: Callable[[int, float], None]):
         m, = line_stream.parse_ints(1, line)
-        # consume m lines
         for _ in range(m):
-            line_stream.next_line()
+            line = line_stream.next_line()
+            try:
+                i, value = line.split()
+                i = int(i)
+                value = float(value)
+            except ValueError:
+                raise ValueError("Invalid initial guess: expected 'i value'")
+            add_guess_fn(i, value)
 
     def parse_range_segment(self, line_stream: LineStream, problem_builder: ProblemBuilder):
         self._parse_ranges(problem_builder.n_cons, line_stream, problem_builder.with_cons_range)
@@ -262,13 +326,21 @@ class NLParser:
             line_stream.next_line()
 
     def parse_jacobian_sparsity_segment(self, line: str, line_stream: LineStream, problem_builder: ProblemBuilder):
-        self._parse_sparse_matrix(line, line_stream)
+        self._parse_sparse_matrix(line, line_stream, problem_builder.with_cons_linear_term)
 
     def parse_gradient_sparsity_segment(self, line: str, line_stream: LineStream, problem_builder: ProblemBuilder):
-        self._parse_sparse_matrix(line, line_stream)
+        self._parse_sparse_matrix(line, line_stream, problem_builder.with_obj_linear_term)
 
-    def _parse_sparse_matrix(self, line: str, line_stream: LineStream):
-        _, k = line_stream.parse_ints(2, line)
-        # consume k lines
+    def _parse_sparse_matrix(self, line: str, line_stream: LineStream,
+                             add_term_fn: Callable[[int, int, float], None]):
+        i, k = line_stream.parse_ints(2, line)
+        # k lines 'j coefficient': the linear coefficient of variable j (0 if it only occurs in the nonlinear part)
         for _ in range(k):
-            line_stream.next_line()
+            line = line_stream.next_line()
+            try:
+                j, coefficient = line.split()
+                j = int(j)
+                coefficient = float(coefficient)
+            except ValueError:
+                raise ValueError("Invalid linear term: expected 'j coefficient'")
+            add_term_fn(i, j, coefficient)
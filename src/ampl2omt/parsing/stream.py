@@ -1,12 +1,33 @@
 import io
 
+from ampl2omt.progress import Monitor
+
 
 class LineStream:
-    def __init__(self, stream: io.TextIOBase):
+    def __init__(self, stream: io.TextIOBase, monitor: Monitor | None = None):
+        """
+        :param stream: The stream to read.
+        :param monitor: The monitor counting the lines read, None to not count them.
+        """
         self.stream = stream
+        self.monitor = monitor
+        # the line read by peek, not consumed yet: streams such as pipes cannot seek back
+        self._peeked: str | None = None
 
-    def next_line(self) -> str:
+    def _read(self) -> str:
         line = self.stream.readline()
+        if self.monitor is not None:
+            self.monitor.step(len(line))
+        return line
+
+    def _readline(self) -> str:
+        if self._peeked is not None:
+            line, self._peeked = self._peeked, None
+            return line
+        return self._read()
+
+    def next_line(self) -> str:
+        line = self._readline()
         line = line.split("#")[0].strip()
         if not line:
             raise EOFError
@@ -36,7 +57,6 @@ class LineStream:
 
     def peek(self) -> str:
         """Return the next line without consuming it."""
-        pos = self.stream.tell()
-        line = self.stream.readline()
-        self.stream.seek(pos)
-        return line.strip()
+        if self._peeked is None:
+            self._peeked = self._read()
+        return self._peeked.strip()
@@ -0,0 +1,162 @@
+from array import array
+from dataclasses import dataclass
+from typing import Iterable
+
+from ampl2omt.term.term import Term, is_var
+
+
+@dataclass(frozen=True)
+class SparsityPattern:
+    """
+    A sparse boolean matrix in compressed sparse row (CSR) format.
+
+    The column indices of row i are indices[indptr[i]:indptr[i + 1]], in increasing order.
+    """
+    n_cols: int
+    indptr: array
+    indices: array
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def nnz(self) -> int:
+        return len(self.indices)
+
+    def row(self, i: int) -> memoryview:
+        """The column indices of row i, as a view (no copy)."""
+        return memoryview(self.indices)[self.indptr[i]:self.indptr[i + 1]]
+
+    def transpose(self) -> 'SparsityPattern':
+        counts = [0] * (self.n_cols + 1)
+        for j in self.indices:
+            counts[j + 1] += 1
+        for j in range(self.n_cols):
+            counts[j + 1] += counts[j]
+        indptr = array('q', counts)
+        indices = array('q', bytes(8 * self.nnz))
+        fill = counts[:-1]
+        for i in range(self.n_rows):
+            for j in self.row(i):
+                indices[fill[j]] = i
+                fill[j] += 1
+        return SparsityPattern(self.n_rows, indptr, indices)
+
+    @staticmethod
+    def from_rows(n_cols: int, rows: Iterable[Iterable[int]]) -> 'SparsityPattern':
+        indptr = array('q', [0])
+        indices = array('q')
+        for r in rows:
+            indices.extend(sorted(r))
+            indptr.append(len(indices))
+        return SparsityPattern(n_cols, indptr, indices)
+
+
+class OccurrenceIndex:
+    """
+    Index of the variables occurring in the constraints and objectives of a problem.
+
+    Variables are identified by their position in the problem variables, constraints and objectives by their position
+    in the respective lists.
+    Rows (constraint -> variables) and columns (variable -> constraints) are stored in CSR format, so each query is a
+    constant-time slice.
+    """
+
+    def __init__(self, variables: list[Term], constraints: list[Term], objectives: list[Term]):
+        self.constraint_vars = variable_pattern(variables, constraints)
+        self.objective_vars = variable_pattern(variables, objectives)
+        self.var_constraints = self.constraint_vars.transpose()
+        self.var_objectives = self.objective_vars.transpose()
+
+    def variables_of_constraint(self, j: int) -> memoryview:
+        return self.constraint_vars.row(j)
+
+    def constraints_of_variable(self, i: int) -> memoryview:
+        return self.var_constraints.row(i)
+
+    def variables_of_objective(self, k: int) -> memoryview:
+        return self.objective_vars.row(k)
+
+    def objectives_of_variable(self, i: int) -> memoryview:
+        return self.var_objectives.row(i)
+
+    def unused_variables(self) -> list[int]:
+        """The variables occurring in no constraint nor objective."""
+        return [i for i in range(self.constraint_vars.n_cols)
+                if not self.constraints_of_variable(i) and not self.objectives_of_variable(i)]
+
+
+def variable_pattern(variables: list[Term], roots: list[Term]) -> SparsityPattern:
+    """
+    The variables occurring in each root, as the rows of a sparsity pattern over the variables.
+
+    :param variables: The variables, in the order of the columns.
+    :param roots: The roots, in the order of the rows.
+    """
+    columns = {v: i for i, v in enumerate(variables)}
+    return SparsityPattern.from_rows(len(variables), _occurrences(roots, columns))
+
+
+def _occurrences(roots: list[Term], columns: dict[Term, int]) -> list[list[int]]:
+    """
+    The columns of the variables occurring in each root, in one pass over the shared DAG.
+
+    Nodes are marked with the last root reaching them, so that each root expands a node once. A node reached again by
+    a later root has the variables under it collected and cached, so that the following roots take them without
+    walking it again: only the nodes shared between roots keep a set, and a subterm shared by many constraints is
+    walked about twice rather than once per constraint.
+    """
+    last_root: dict[Term, int] = {}
+    shared: dict[Term, frozenset[int]] = {}
+    rows = []
+    for k, root in enumerate(roots):
+        row: set[int] = set()
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            seen = last_root.get(node)
+            if seen == k:
+                continue
+            last_root[node] = k
+            if is_var(node):
+                row.add(_column(node, columns))
+            elif node in shared:
+                row |= shared[node]
+            elif seen is not None and node.children:
+                # reached by an earlier root: cache its variables for the later ones
+                variables, visited = _variables_under(node, columns, shared)
+                shared[node] = variables
+                row |= variables
+                for n in visited:
+                    last_root[n] = k
+            else:
+                stack.extend(node.children)
+        rows.append(list(row))
+    return rows
+
+
+def _variables_under(node: Term, columns: dict[Term, int],
+                     shared: dict[Term, frozenset[int]]) -> tuple[frozenset[int], set[Term]]:
+    """The columns of the variables under a node, taking those of the cached nodes, and the nodes visited."""
+    variables: set[int] = set()
+    visited = {node}
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        if is_var(n):
+            variables.add(_column(n, columns))
+        elif n in shared:
+            variables |= shared[n]
+        else:
+            for c in n.children:
+                if c not in visited:
+                    visited.add(c)
+                    stack.append(c)
+    return frozenset(variables), visited
+
+
+def _column(variable: Term, columns: dict[Term, int]) -> int:
+    if variable not in columns:
+        raise ValueError(f"Variable {variable.payload} is not a problem variable")
+    return columns[variable]
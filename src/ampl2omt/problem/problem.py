@@ -1,7 +1,12 @@
-from dataclasses import dataclass
+import dataclasses
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable
 
+from ampl2omt.evaluation.compiled import CompiledFunction, compile_terms
 from ampl2omt.problem.objective import Objective
-from ampl2omt.term.term import Term
+from ampl2omt.problem.occurrence import OccurrenceIndex
+from ampl2omt.term.manager import TermManager
+from ampl2omt.term.term import Term, is_const
 
 
 @dataclass
@@ -9,3 +14,138 @@ class NLPProblem:
     variables: list[Term]
     objectives: list[Objective]
     constraints: list[Term]
+    # sparse initial guesses from the x and d segments, keyed by variable index and nl constraint index
+    primal_initial_guess: dict[int, float] = field(default_factory=dict)
+    dual_initial_guess: dict[int, float] = field(default_factory=dict)
+    # the nl data the constraints were built from (see range_constraints): variable bounds, constraint bodies and
+    # constraint ranges, keyed by nl index
+    var_ranges: dict[int, tuple[float | None, float | None]] = field(default_factory=dict)
+    cons_bodies: dict[int, Term] = field(default_factory=dict)
+    cons_ranges: dict[int, tuple[float | None, float | None]] = field(default_factory=dict)
+
+    # derived data, with the version of the problem it was built from
+    _cache: dict[str, tuple[int, Any]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    # bumped by invalidate
+    _version: int = field(default=0, init=False, repr=False, compare=False)
+
+    def add_variables(self, variables: Iterable[Term]) -> None:
+        """Append variables to the problem, invalidating its derived data."""
+        self.variables.extend(variables)
+        self.invalidate()
+
+    def add_objectives(self, objectives: Iterable[Objective]) -> None:
+        """Append objectives to the problem, invalidating its derived data."""
+        self.objectives.extend(objectives)
+        self.invalidate()
+
+    def add_constraints(self, constraints: Iterable[Term]) -> None:
+        """Append constraints to the problem, invalidating its derived data."""
+        self.constraints.extend(constraints)
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """
+        Discard the derived data of the problem (see cached).
+
+        Called by the add_* methods; call it after mutating the variables, objectives or constraints otherwise, e.g.
+        after assigning them or the fields of an objective.
+        """
+        self._version += 1
+
+    def initial_point(self) -> list[float]:
+        """The primal initial guess as a dense point, with 0 for the variables without a guess (as in AMPL)."""
+        return [self.primal_initial_guess.get(i, 0.) for i in range(len(self.variables))]
+
+    def occurrences(self) -> OccurrenceIndex:
+        """
+        The index of the variables occurring in each constraint and objective (and vice versa).
+
+        The index is cached, and rebuilt only if the problem has been invalidated since the last call.
+        """
+        return self.cached("occurrences", lambda: OccurrenceIndex(
+            self.variables, self.constraints, [o.term for o in self.objectives]))
+
+    def compile_objectives(self, batch: bool = False) -> CompiledFunction:
+        """
+        Compile the objectives to a Python function of the variables, returning the value of each objective.
+
+        The function is cached, and recompiled only if the problem has been invalidated since the last call.
+
+        :param batch: Whether to compile a NumPy function evaluating a (n_points, n_vars) array of points.
+        """
+        return self.cached(f"compiled_objectives_{batch}", lambda: compile_terms(
+            self.variables, [o.term for o in self.objectives], batch=batch))
+
+    def compile_constraints(self, batch: bool = False) -> CompiledFunction:
+        """
+        Compile the constraints to a Python function of the variables, returning the violation of each constraint.
+
+        The violation is 0 if the constraint is satisfied, a positive amount otherwise, inf if undefined.
+        The function is cached, and recompiled only if the problem has been invalidated since the last call.
+
+        :param batch: Whether to compile a NumPy function evaluating a (n_points, n_vars) array of points.
+        """
+        return self.cached(f"compiled_constraints_{batch}", lambda: compile_terms(
+            self.variables, self.constraints, violations=True, batch=batch))
+
+    def cached(self, key: str, build: Callable[[], Any]) -> Any:
+        """
+        Get derived data of the problem, building it if missing or if the problem has been invalidated since.
+
+        The check is constant-time: the data is tagged with the version of the problem, bumped by invalidate.
+
+        :param key: The name of the data.
+        :param build: A function building the data from the current problem.
+        :return: The (possibly cached) data.
+        """
+        version = self._version
+        entry = self._cache.get(key)
+        if entry is None or entry[0] != version:
+            entry = (version, build())
+            self._cache[key] = entry
+        return entry[1]
+
+
+def range_constraints(mgr: TermManager, term: Term, lower: float | None, upper: float | None) -> list[Term]:
+    """
+    The constraints lower <= term <= upper, as built from the ranges of an nl file.
+
+    :param mgr: The term manager.
+    :param term: The bounded term (a variable or a constraint body).
+    :param lower: The lower bound, or None if unbounded below.
+    :param upper: The upper bound, or None if unbounded above.
+    :return: An equality if lower == upper, otherwise a constraint for each finite bound.
+    """
+    if is_const(term):
+        # The constraint has been simplified out (not sure)
+        return []
+    if lower is None and upper is None:
+        return []
+    if lower == upper:
+        return [mgr.Eq(term, mgr.Real(lower))]
+    constraints = []
+    if lower is not None:
+        constraints.append(mgr.Ge(term, mgr.Real(lower)))
+    if upper is not None:
+        constraints.append(mgr.Le(term, mgr.Real(upper)))
+    return constraints
+
+
+def import_problem(mgr: TermManager, other: TermManager, problem: NLPProblem) -> NLPProblem:
+    """
+    Import a problem built by another term manager (e.g. parsed in another thread) into a manager.
+
+    :param mgr: The term manager to import the problem into.
+    :param other: The term manager of the problem.
+    :param problem: The problem.
+    :return: The same problem, with the terms of mgr.
+    """
+    remap = mgr.import_terms(other, [*problem.variables, *(o.term for o in problem.objectives), *problem.constraints,
+                                     *problem.cons_bodies.values()])
+    return dataclasses.replace(
+        problem,
+        variables=[remap[v] for v in problem.variables],
+        objectives=[Objective(o.kind, remap[o.term]) for o in problem.objectives],
+        constraints=[remap[c] for c in problem.constraints],
+        cons_bodies={i: remap[t] for i, t in problem.cons_bodies.items()},
+    )
@@ -0,0 +1,158 @@
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import CancelledError
+from dataclasses import dataclass
+
+# The number of steps (lines read by the parser, nodes rendered by the writer) between two checks of the cancel token
+# and reports of the progress, besides the checks at the segment boundaries.
+CHECK_INTERVAL = 10000
+
+PARSE = "parse"
+WRITE = "write"
+
+
+@dataclass(frozen=True)
+class Progress:
+    """
+    The progress of a parse or of a write, as reported to a progress callback.
+
+    :param phase: PARSE or WRITE.
+    :param bytes: The characters of the nl file consumed by the parse (bytes, as the format is ASCII), or of the
+        constraints and objectives written.
+    :param total_bytes: The size of the nl file, None if unknown (compressed files and streams) and for writes.
+    :param segments: The segments of the nl file parsed, or the constraints and objectives written.
+    :param total_segments: The constraints and objectives to write, None for parses.
+    :param nodes: The terms interned by the parse, or the nodes rendered by the write.
+    :param elapsed: The seconds elapsed since the start.
+    """
+    phase: str
+    bytes: int
+    total_bytes: int | None
+    segments: int
+    total_segments: int | None
+    nodes: int
+    elapsed: float
+
+    @property
+    def fraction(self) -> float | None:
+        """The fraction of the work done, None if the total is unknown."""
+        if self.total_bytes:
+            return min(1., self.bytes / self.total_bytes)
+        if self.total_segments:
+            return self.segments / self.total_segments
+        return None
+
+    @property
+    def eta(self) -> float | None:
+        """The estimated seconds left, assuming a constant pace, None if the fraction done is unknown or zero."""
+        fraction = self.fraction
+        if not fraction:
+            return None
+        return self.elapsed * (1. - fraction) / fraction
+
+
+ProgressCallback = Callable[[Progress], None]
+
+
+class CancelToken:
+    """
+    A token stopping a long operation when cancelled, e.g. from another thread, or when its deadline passes.
+
+    The operation checks the token regularly (see Monitor): it stops by raising concurrent.futures.CancelledError if
+    the token was cancelled, TimeoutError if the deadline passed.
+
+    :param deadline: The deadline, as a time.monotonic() value, None for no deadline.
+    """
+
+    def __init__(self, deadline: float | None = None):
+        self.deadline = deadline
+        self._cancelled = threading.Event()
+
+    @classmethod
+    def after(cls, seconds: float) -> 'CancelToken':
+        """A token whose deadline is the given number of seconds from now."""
+        return cls(time.monotonic() + seconds)
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def check(self) -> None:
+        """Raise CancelledError if the token was cancelled, TimeoutError if the deadline passed."""
+        if self._cancelled.is_set():
+            raise CancelledError("Operation cancelled")
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise TimeoutError("Operation deadline exceeded")
+
+
+class Monitor:
+    """
+    The monitor of a parse or of a write: counts its progress, checks the cancel token at every segment boundary and
+    every `interval` steps, and reports the progress to the callback every `interval` steps and at the end.
+
+    :param phase: PARSE or WRITE.
+    :param callback: The progress callback, called in the thread running the operation; None for no reports.
+    :param token: The cancel token, None if the operation cannot be cancelled.
+    :param interval: The number of steps between two checks.
+    :param total_bytes: The total bytes, if known (see Progress).
+    :param total_segments: The total segments, if known (see Progress).
+    :param count_nodes: A function giving the number of nodes, if not counted by the steps (e.g. the terms interned
+        by a parse).
+    """
+
+    def __init__(self, phase: str, callback: ProgressCallback | None = None, token: CancelToken | None = None,
+                 interval: int = CHECK_INTERVAL, total_bytes: int | None = None, total_segments: int | None = None,
+                 count_nodes: Callable[[], int] | None = None):
+        self.phase = phase
+        self.callback = callback
+        self.token = token
+        self.interval = interval
+        self.total_bytes = total_bytes
+        self.total_segments = total_segments
+        self.count_nodes = count_nodes
+        self.bytes = 0
+        self.segments = 0
+        self.nodes = 0
+        self._start = time.monotonic()
+        self._steps = 0
+
+    def step(self, n_bytes: int = 0, nodes: int = 0) -> None:
+        """Count a step of the operation, e.g. a line read or a node rendered."""
+        self.bytes += n_bytes
+        self.nodes += nodes
+        self._steps += 1
+        if self._steps >= self.interval:
+            self._steps = 0
+            self.check()
+
+    def segment(self, n_bytes: int = 0) -> None:
+        """Count a segment of the operation, checking the token."""
+        self.bytes += n_bytes
+        self.segments += 1
+        if self.token is not None:
+            self.token.check()
+
+    def check(self) -> None:
+        """Check the token, and report the progress."""
+        if self.token is not None:
+            self.token.check()
+        self.report()
+
+    def report(self) -> None:
+        if self.callback is not None:
+            self.callback(self.progress())
+
+    def progress(self) -> Progress:
+        return Progress(
+            phase=self.phase,
+            bytes=self.bytes,
+            total_bytes=self.total_bytes,
+            segments=self.segments,
+            total_segments=self.total_segments,
+            nodes=self.count_nodes() if self.count_nodes is not None else self.nodes,
+            elapsed=time.monotonic() - self._start,
+        )
@@ -0,0 +1,154 @@
+import json
+import multiprocessing
+import os
+import socket
+import socketserver
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from ampl2omt.client import is_loopback, parse_address
+from ampl2omt.conversion import ConversionOptions, convert, convert_string, SMTLIB_FORMAT
+from ampl2omt.term.manager import TermManager
+
+
+def run_job(job: dict) -> dict:
+    """
+    Run a conversion job, in a worker of the server.
+
+    A job converts either a file, given its "input" and "output" paths, or the content of an nl file, given as "data"
+    and converted in memory to "format" (SMT-LIB by default). Its "options" are the fields of ConversionOptions.
+
+    :param job: The job, decoded from JSON.
+    :return: The response: "ok", and the written "paths", the "output" and the "messages" if ok, the "error" otherwise.
+    """
+    try:
+        options = ConversionOptions.from_dict(job.get("options", {}))
+        if "input" in job:
+            result = convert(job["input"], job["output"], options)
+        elif "data" in job:
+            result = convert_string(job["data"], job.get("format", SMTLIB_FORMAT), options)
+        else:
+            raise ValueError("A job needs an input path or data")
+    except Exception as e:
+        return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+    return {"ok": True, "paths": result.paths, "output": result.output, "messages": result.messages}
+
+
+def _warm_up():
+    # importing this module in the worker imports the whole converter; build the type table once as well
+    TermManager()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Handler of a connection: each line is a job in JSON, answered by a line with the response."""
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                job = json.loads(line)
+                if not isinstance(job, dict):
+                    raise ValueError("A job must be a JSON object")
+            except ValueError as e:
+                response = {"ok": False, "error": f"Invalid job: {e}"}
+            else:
+                response = self.server.conversion_server.submit(job)
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+
+class ConversionServer:
+    """
+    A server running conversion jobs in a pool of warm worker processes, so that clients do not pay for importing
+    the converter at every conversion.
+
+    The server listens on a Unix socket or on a local TCP port: since jobs read and write any path the server can
+    access, TCP hosts other than the loopback are refused unless allow_remote is set.
+
+    It speaks JSON lines: each line sent by a client is a job (see run_job), answered by a line with its response.
+    Jobs run in at most `workers` processes at once, and jobs beyond `max_pending` (running or queued) are rejected,
+    so that a burst of clients cannot exhaust the memory.
+    """
+
+    def __init__(self, address: str, workers: int | None = None, max_pending: int | None = None,
+                 allow_remote: bool = False):
+        """
+        :param address: The address to listen on (see parse_address).
+        :param workers: The number of worker processes (default: the number of CPUs).
+        :param max_pending: The maximum number of running and queued jobs (default: 4 jobs per worker).
+        :param allow_remote: Whether to listen on TCP hosts other than the loopback, reachable from other machines.
+        """
+        parsed = parse_address(address)
+        if isinstance(parsed, tuple) and not allow_remote and not is_loopback(parsed[0]):
+            raise ValueError(f"Refusing to listen on the non-loopback host {parsed[0]!r}: jobs can read and write "
+                             "files on this machine (pass allow_remote to listen anyway)")
+        workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 4 * workers
+        self._pending = threading.BoundedSemaphore(self.max_pending)
+        # jobs are submitted from the threads of the connections, where forking is unsafe
+        self._pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                                         initializer=_warm_up)
+        # start the workers now rather than at the first job
+        self._pool.submit(_warm_up)
+        if isinstance(parsed, tuple):
+            self._server = _TCPServer(parsed, _Handler)
+        else:
+            _remove_stale_socket(parsed)
+            self._server = _UnixServer(parsed, _Handler)
+        self._server.conversion_server = self
+
+    @property
+    def address(self) -> str:
+        """The address the server listens on, e.g. with the actual port if started on port 0."""
+        address = self._server.server_address
+        return address if isinstance(address, str) else f"{address[0]}:{address[1]}"
+
+    def submit(self, job: dict) -> dict:
+        """Run a job in the pool, waiting for its response, unless too many jobs are pending."""
+        if not self._pending.acquire(blocking=False):
+            return {"ok": False, "busy": True, "error": f"Server busy: {self.max_pending} jobs pending"}
+        try:
+            return self._pool.submit(run_job, job).result()
+        finally:
+            self._pending.release()
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def shutdown(self) -> None:
+        """Stop serving, from another thread than the one serving."""
+        self._server.shutdown()
+
+    def close(self) -> None:
+        self._server.server_close()
+        self._pool.shutdown()
+        if isinstance(self._server.server_address, str) and os.path.exists(self._server.server_address):
+            os.remove(self._server.server_address)
+
+    def __enter__(self) -> 'ConversionServer':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _remove_stale_socket(path: str) -> None:
+    """Remove the socket file left by a server that did not shut down cleanly, refusing to steal a live one."""
+    if not os.path.exists(path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        try:
+            s.connect(path)
+        except OSError:
+            os.remove(path)
+            return
+    raise ValueError(f"A server is already listening on {path}")
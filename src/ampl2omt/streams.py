@@ -0,0 +1,136 @@
+import gzip
+import io
+import lzma
+import os
+import sys
+from contextlib import contextmanager
+from typing import Iterator, TextIO
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+GZIP = "gzip"
+XZ = "xz"
+ZSTD = "zstd"
+COMPRESSIONS = (GZIP, XZ, ZSTD)
+# The extensions of compressed files, e.g. out.smt2.gz.
+EXTENSIONS = {".gz": GZIP, ".xz": XZ, ".zst": ZSTD}
+# The magic numbers at the start of compressed files, to detect the compression of inputs.
+MAGIC = {b"\x1f\x8b": GZIP, b"\xfd7zXZ\x00": XZ, b"\x28\xb5\x2f\xfd": ZSTD}
+# The path of the standard input or output.
+STDIO = "-"
+
+
+def require_zstandard():
+    if zstandard is None:
+        raise ImportError("zstandard is required for zstd compression: pip install ampl2omt[zstd]")
+    return zstandard
+
+
+def compression_of(path: str) -> str | None:
+    """The compression of a path, given by its extension, None if not compressed."""
+    return EXTENSIONS.get(os.path.splitext(path)[1])
+
+
+def split_extension(path: str) -> tuple[str, str]:
+    """Split a path into its root and its extension, including the compression, e.g. out and .smt2.gz."""
+    root, compression_ext = os.path.splitext(path)
+    if compression_ext not in EXTENSIONS:
+        return root, compression_ext
+    root, ext = os.path.splitext(root)
+    return root, ext + compression_ext
+
+
+def strip_compression(path: str) -> str:
+    """The path without the extension of its compression, e.g. out.smt2 for out.smt2.gz."""
+    root, ext = os.path.splitext(path)
+    return root if ext in EXTENSIONS else path
+
+
+def detect_compression(stream: io.BufferedReader) -> str | None:
+    """Detect the compression of a binary stream from its magic number, without consuming it."""
+    head = stream.peek(max(map(len, MAGIC)))
+    return next((compression for magic, compression in MAGIC.items() if head.startswith(magic)), None)
+
+
+@contextmanager
+def open_input(path: str, compression: str | None = None) -> Iterator[TextIO]:
+    """
+    Open a text input, decompressing it on the fly.
+
+    :param path: The path, or - for the standard input.
+    :param compression: The compression of the input, detected from its content if None.
+    :return: A context manager of the text stream; the standard input is not closed.
+    """
+    raw = sys.stdin.buffer if path == STDIO else open(path, "rb")
+    try:
+        if not hasattr(raw, "peek"):
+            raw = io.BufferedReader(raw)
+        compression = compression or detect_compression(raw)
+        binary = raw if compression is None else _decompress(raw, compression)
+        text = io.TextIOWrapper(binary, encoding="utf-8")
+        try:
+            yield text
+        finally:
+            # detach, so that closing the text stream does not close the standard input
+            text.detach()
+            if binary is not raw:
+                binary.close()
+    finally:
+        if path != STDIO:
+            raw.close()
+
+
+@contextmanager
+def open_output(path: str, compression: str | None = None) -> Iterator[TextIO]:
+    """
+    Open a text output, compressing it on the fly.
+
+    :param path: The path, or - for the standard output.
+    :param compression: The compression of the output, given by the extension of the path if None.
+    :return: A context manager of the text stream; the standard output is flushed, but not closed.
+    """
+    if compression is None and path != STDIO:
+        compression = compression_of(path)
+    if path == STDIO:
+        sys.stdout.flush()
+    raw = sys.stdout.buffer if path == STDIO else open(path, "wb")
+    try:
+        binary = raw if compression is None else _compress(raw, compression)
+        text = io.TextIOWrapper(binary, encoding="utf-8")
+        try:
+            yield text
+        finally:
+            text.flush()
+            text.detach()
+            if binary is not raw:
+                # ends the compressed stream, without closing the raw one
+                binary.close()
+    finally:
+        if path == STDIO:
+            raw.flush()
+        else:
+            raw.close()
+
+
+def _decompress(raw: io.BufferedReader, compression: str):
+    if compression == GZIP:
+        return gzip.GzipFile(fileobj=raw, mode="rb")
+    if compression == XZ:
+        return lzma.LZMAFile(raw, mode="rb")
+    if compression == ZSTD:
+        # frames may be concatenated, e.g. by appending objectives to a preamble
+        return require_zstandard().ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=False)
+    raise ValueError(f"Unknown compression {compression}, expected one of {', '.join(COMPRESSIONS)}")
+
+
+def _compress(raw, compression: str):
+    if compression == GZIP:
+        return gzip.GzipFile(filename="", fileobj=raw, mode="wb")
+    if compression == XZ:
+        return lzma.LZMAFile(raw, mode="wb")
+    if compression == ZSTD:
+        return require_zstandard().ZstdCompressor().stream_writer(raw, closefd=False)
+    raise ValueError(f"Unknown compression {compression}, expected one of {', '.join(COMPRESSIONS)}")
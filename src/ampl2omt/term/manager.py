@@ -1,11 +1,24 @@
+import itertools
+import operator
+import threading
 from typing import Iterable, Any
 
-from ampl2omt.term.term import Term, TermType
+from ampl2omt.term.term import Term, TermType, topo_sort_all
 from ampl2omt.term.types import FLOOR, CEIL, ABS, NEG, TANH, TAN, SQRT, SINH, SIN, LOG10, LOG, EXP, COSH, COS, \
     ATANH, ATAN, ASINH, ASIN, ACOSH, ACOS, PLUS, MINUS, MULT, DIV, REM, POW, ATAN2, INTDIV, PRECISION, ROUND, TRUNC, \
     NOT, OR, AND, IF, IFS, IMPLIES, IFF, ANDN, ORN, LT, LE, EQ, GE, GT, NE, MIN, MAX, SUM, COUNT, NUMBEROF, NUMBEROFS, \
     ALLDIFF, REAL, INT, BOOL, VAR_REAL, VAR_INT, VAR_BOOL, LESS
 
+# The number of locks guarding the insertions in the cache, chosen by the hash of the term: threads creating
+# different terms rarely contend for the same lock.
+N_LOCK_STRIPES = 64
+# The commutative operators, whose children are sorted in canonical mode.
+COMMUTATIVE = frozenset({PLUS, MULT, SUM, MIN, MAX, AND, OR, ANDN, ORN, EQ, NE})
+# The n-ary associative operators, whose children of the same operator are flattened in canonical mode.
+ASSOCIATIVE = frozenset({SUM, MIN, MAX, ANDN, ORN})
+
+_serial = operator.attrgetter("_serial")
+
 
 class TermManager:
     """
@@ -13,10 +26,24 @@ class TermManager:
 
     This class is used to create terms for the expression tree.
     Nodes are cached to avoid creating duplicate terms.
+
+    A manager can be shared by several threads, also on free-threaded Python builds: looking up a cached term takes no
+    lock, and the insertions of new terms are serialized per lock stripe, so that each term is created exactly once.
+
+    In canonical mode, terms equal up to associativity and commutativity are created as the same term: the children of
+    the COMMUTATIVE operators are sorted by the creation order of the terms, and the children of the ASSOCIATIVE ones
+    that have the same operator are flattened, e.g. x + y and y + x, or Sum([a, Sum([b, c])]) and Sum([c, b, a]), are
+    the same term. Sorting by creation order rather than by address keeps the output of a conversion reproducible.
+
+    :param canonical: Whether to create terms in canonical mode.
     """
 
-    def __init__(self):
+    def __init__(self, canonical=False):
+        self.canonical = canonical
         self._cache = {}
+        self._locks = [threading.Lock() for _ in range(N_LOCK_STRIPES)]
+        # the creation order of the terms, the sort key of the children in canonical mode
+        self._serials = itertools.count()
         term_types: list[TermType] = [
             # --- Arithmetic operators
             # ------ Unary operators
@@ -59,7 +86,7 @@ class TermManager:
             # ------ Binary operators
             TermType(OR, "or", 2),
             TermType(AND, "and", 2),
-            TermType(IF, "if", 3),
+            TermType(IF, "ite", 3),
             TermType(IFS, "ifs", 3),
             TermType(IMPLIES, "implies", 2),
             TermType(IFF, "iff", 2),
@@ -94,6 +121,10 @@ class TermManager:
         ]
         self._term_types = {term_type.id: term_type for term_type in term_types}
 
+    def __len__(self) -> int:
+        """The number of terms interned."""
+        return len(self._cache)
+
     def term_type(self, id: int) -> TermType:
         if id not in self._term_types:
             raise ValueError(f"Term type with id {id} not known.")
@@ -108,10 +139,63 @@ class TermManager:
         :param payload: The payload of the term.
         :return: The created term.
         """
+        if self.canonical and term_type.id in COMMUTATIVE:
+            children = self._canonical_children(term_type, children)
         key = (term_type, children, payload)
-        if key not in self._cache:
-            self._cache[key] = Term(term_type, children, payload)
-        return self._cache[key]
+        # single dictionary operations are atomic, so the lookup needs no lock
+        term = self._cache.get(key)
+        if term is None:
+            with self._locks[hash(key) % N_LOCK_STRIPES]:
+                # another thread may have created the term while this one was waiting for the lock
+                term = self._cache.get(key)
+                if term is None:
+                    term = Term(term_type, children, payload)
+                    if self.canonical:
+                        object.__setattr__(term, "_serial", next(self._serials))
+                    self._cache[key] = term
+        return term
+
+    @staticmethod
+    def _canonical_children(term_type: TermType, children: tuple[Term, ...]) -> tuple[Term, ...]:
+        if term_type.id in ASSOCIATIVE and any(c.term_type.id == term_type.id for c in children):
+            # the children were created in canonical mode, and are flat already
+            children = tuple(itertools.chain.from_iterable(
+                c.children if c.term_type.id == term_type.id else (c,) for c in children))
+        return tuple(sorted(children, key=_serial))
+
+    def import_terms(self, other: 'TermManager', roots: Iterable[Term]) -> dict[Term, Term]:
+        """
+        Import terms created by another manager, with all their subterms.
+
+        The DAG of the terms is traversed once, iteratively, so that shared subterms are created once and arbitrarily
+        deep terms are supported.
+
+        :param other: The manager of the terms.
+        :param roots: The terms to import.
+        :return: The remap table, giving the term of this manager for each imported term and subterm.
+        """
+        if other is self:
+            return {t: t for t in topo_sort_all(roots)}
+        remap: dict[Term, Term] = {}
+        term_types: dict[int, TermType] = {}
+        # depth-first traversal, using the remap table as the set of visited nodes
+        for root in roots:
+            stack = [root]
+            while stack:
+                node = stack[-1]
+                if node in remap:
+                    stack.pop()
+                    continue
+                pending = [c for c in node.children if c not in remap]
+                if pending:
+                    stack.extend(pending)
+                    continue
+                stack.pop()
+                term_type = term_types.get(node.term_type.id)
+                if term_type is None:
+                    term_type = term_types[node.term_type.id] = self.term_type(node.term_type.id)
+                remap[node] = self.create(term_type, tuple([remap[c] for c in node.children]), node.payload)
+        return remap
 
     def create_constant(self, term_type: TermType, value: Any) -> Term:
         return self.create(term_type, tuple(), value)
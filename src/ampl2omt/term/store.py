@@ -0,0 +1,400 @@
+import array
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import weakref
+import zlib
+from typing import Any, Iterable, Iterator
+
+from ampl2omt.term.manager import TermManager, COMMUTATIVE
+from ampl2omt.term.term import TermType
+from ampl2omt.term.types import REAL, INT, BOOL, VAR_REAL, VAR_INT, VAR_BOOL
+
+# The initial number of items of the node arrays, grown by doubling; the hash index starts with twice as many slots.
+INITIAL_CAPACITY = 1 << 16
+
+_VARIABLES = frozenset({VAR_REAL, VAR_INT, VAR_BOOL})
+# The payload word of the terms without payload: operations, and variables without name.
+_NO_PAYLOAD = -1
+_DOUBLE = struct.Struct("d")
+_WORD = struct.Struct("q")
+
+
+class MappedArray:
+    """
+    A growable array of fixed-size items (see the array module for the typecodes) kept in a memory-mapped file.
+
+    The items are accessed through view, a memoryview of the file, which is replaced when the array grows: it must
+    be fetched again after an append, and slices of it must not outlive the access.
+
+    :param path: The path of the file, created or truncated; an anonymous temporary file in the directory if the path
+        is a directory.
+    :param typecode: The typecode of the items.
+    :param capacity: The initial number of items, zero-filled.
+    """
+
+    def __init__(self, path: str, typecode: str, capacity: int = INITIAL_CAPACITY):
+        self.typecode = typecode
+        self.itemsize = struct.calcsize(typecode)
+        self._file = tempfile.TemporaryFile(dir=path) if os.path.isdir(path) else open(path, "w+b")
+        self.length = 0
+        self._map(capacity)
+
+    def _map(self, capacity: int) -> None:
+        # empty files cannot be mapped
+        size = max(capacity, 1) * self.itemsize
+        self._file.truncate(size)
+        self._mmap = mmap.mmap(self._file.fileno(), size)
+        self.view = memoryview(self._mmap).cast(self.typecode)
+
+    def _unmap(self) -> None:
+        self.view.release()
+        self._mmap.close()
+
+    def __len__(self) -> int:
+        return self.length
+
+    @property
+    def capacity(self) -> int:
+        return len(self.view)
+
+    def reserve(self, n: int) -> None:
+        """Grow the array, if needed, so that n more items fit."""
+        if self.length + n > self.capacity:
+            capacity = max(2 * self.capacity, self.length + n)
+            self._unmap()
+            self._map(capacity)
+
+    def append(self, value) -> None:
+        self.reserve(1)
+        self.view[self.length] = value
+        self.length += 1
+
+    def extend(self, values: Iterable) -> None:
+        values = values if isinstance(values, bytes) else array.array(self.typecode, values)
+        self.reserve(len(values))
+        self.view[self.length:self.length + len(values)] = values
+        self.length += len(values)
+
+    def reset(self, capacity: int) -> None:
+        """Empty the array, and zero-fill its first capacity items."""
+        self._unmap()
+        self._file.truncate(0)
+        self._map(capacity)
+        self.length = 0
+
+    def close(self) -> None:
+        if not self._mmap.closed:
+            self._unmap()
+        self._file.close()
+
+    def __enter__(self) -> 'MappedArray':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class TermStore:
+    """
+    Out-of-core storage of interned terms, for problems whose DAG does not fit in memory.
+
+    The nodes are numbered in creation order, and kept in memory-mapped files, one per array: the term type id and the
+    payload word of each node, and its children as an offset in a shared array of node numbers. Nodes are interned
+    through an open-addressing hash index, also memory-mapped. The pages of the files are cached by the operating
+    system, and written back and evicted under memory pressure, so that the resident set of the process is made of
+    the pages in use rather than of the whole DAG.
+
+    The payload word of a real constant is its bit pattern, that of an integer or Boolean constant its value, that of
+    a named variable the index of its name in a string table (also memory-mapped).
+
+    The store is not thread-safe: MappedTermManager serializes the creations.
+
+    :param term_types: The term types, by id.
+    :param directory: The directory of the files, which are created in a temporary subdirectory of it, removed on
+        close; the default temporary directory if None.
+    :param capacity: The initial number of nodes.
+    """
+
+    def __init__(self, term_types: dict[int, TermType], directory: str | None = None,
+                 capacity: int = INITIAL_CAPACITY):
+        if capacity <= 0 or capacity & (capacity - 1):
+            raise ValueError(f"The capacity must be a power of two, got {capacity}")
+        self.term_types = term_types
+        self.directory = tempfile.mkdtemp(prefix="ampl2omt-", dir=directory)
+        path = self.directory
+        self._ops = MappedArray(os.path.join(path, "ops.bin"), "i", capacity)
+        self._payloads = MappedArray(os.path.join(path, "payloads.bin"), "q", capacity)
+        self._hashes = MappedArray(os.path.join(path, "hashes.bin"), "q", capacity)
+        # the children of node i are _children[_starts[i]:_starts[i + 1]]
+        self._starts = MappedArray(os.path.join(path, "starts.bin"), "q", capacity + 1)
+        self._starts.append(0)
+        self._children = MappedArray(os.path.join(path, "children.bin"), "q", 2 * capacity)
+        # the name of string k is _strings[_string_starts[k]:_string_starts[k + 1]]
+        self._strings = MappedArray(os.path.join(path, "strings.bin"), "B", 8 * capacity)
+        self._string_starts = MappedArray(os.path.join(path, "string_starts.bin"), "q", capacity + 1)
+        self._string_starts.append(0)
+        # the slots hold node numbers plus one, zero for the empty slots; the load factor is kept at most 1/2
+        self._index = MappedArray(os.path.join(path, "index.bin"), "q", 2 * capacity)
+        self._mask = self._index.capacity - 1
+        # the live handles, so that the handle of a node is unique while in use, as interned terms are
+        self._handles: weakref.WeakValueDictionary[int, MappedTerm] = weakref.WeakValueDictionary()
+        self._handles_lock = threading.Lock()
+        arrays = [self._ops, self._payloads, self._hashes, self._starts, self._children, self._strings,
+                  self._string_starts, self._index]
+        self._finalizer = weakref.finalize(self, _remove, arrays, self.directory)
+
+    def __len__(self) -> int:
+        """The number of nodes."""
+        return len(self._ops)
+
+    def close(self) -> None:
+        """Close and remove the files; the handles of the nodes must not be used afterwards."""
+        self._finalizer()
+
+    @property
+    def closed(self) -> bool:
+        return not self._finalizer.alive
+
+    def __enter__(self) -> 'TermStore':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def intern(self, type_id: int, children: tuple[int, ...], payload: Any | None = None) -> int:
+        """
+        The number of the node with the given term type, children and payload, created if needed.
+
+        :param type_id: The id of the term type.
+        :param children: The numbers of the children.
+        :param payload: The payload: a number for the constants, the name or None for the variables, None otherwise.
+        :return: The number of the node.
+        """
+        name = None
+        if type_id in _VARIABLES:
+            if payload is None:
+                word = key = _NO_PAYLOAD
+            else:
+                name = str(payload).encode()
+                word, key = None, zlib.crc32(name)
+        else:
+            word = key = self._payload_word(type_id, payload)
+        h = hash((type_id, key, children))
+        table, hashes, ops = self._index.view, self._hashes.view, self._ops.view
+        slot = h & self._mask
+        while entry := table[slot]:
+            i = entry - 1
+            if hashes[i] == h and ops[i] == type_id and self._children_of(i) == children and (
+                    self._payloads.view[i] == word if name is None else self._name(i) == name):
+                return i
+            slot = (slot + 1) & self._mask
+        if name is not None:
+            word = len(self._string_starts) - 1
+            self._strings.extend(name)
+            self._string_starts.append(len(self._strings))
+        i = len(self)
+        self._ops.append(type_id)
+        self._payloads.append(word)
+        self._hashes.append(h)
+        self._children.extend(children)
+        self._starts.append(len(self._children))
+        self._index.view[slot] = i + 1
+        if 2 * len(self) > self._index.capacity:
+            self._rehash(2 * self._index.capacity)
+        return i
+
+    @staticmethod
+    def _payload_word(type_id: int, payload: Any | None) -> int:
+        if type_id == REAL:
+            return _WORD.unpack(_DOUBLE.pack(float(payload)))[0]
+        if type_id in (INT, BOOL):
+            value = int(payload)
+            if not -(1 << 63) <= value < 1 << 63:
+                raise ValueError(f"Integer constant {value} does not fit in 64 bits")
+            return value
+        if payload is not None:
+            raise ValueError(f"Operations have no payload, got {payload!r}")
+        return _NO_PAYLOAD
+
+    def _rehash(self, size: int) -> None:
+        self._index.reset(size)
+        self._mask = size - 1
+        table, hashes = self._index.view, self._hashes.view
+        for i in range(len(self)):
+            slot = hashes[i] & self._mask
+            while table[slot]:
+                slot = (slot + 1) & self._mask
+            table[slot] = i + 1
+
+    def _children_of(self, i: int) -> tuple[int, ...]:
+        starts = self._starts.view
+        return tuple(self._children.view[starts[i]:starts[i + 1]])
+
+    def _name(self, i: int) -> bytes | None:
+        k = self._payloads.view[i]
+        if k == _NO_PAYLOAD:
+            return None
+        starts = self._string_starts.view
+        return self._strings.view[starts[k]:starts[k + 1]].tobytes()
+
+    def type_id(self, i: int) -> int:
+        return self._ops.view[i]
+
+    def children(self, i: int) -> tuple[int, ...]:
+        """The numbers of the children of node i."""
+        return self._children_of(i)
+
+    def payload(self, i: int) -> Any | None:
+        type_id = self._ops.view[i]
+        if type_id in _VARIABLES:
+            name = self._name(i)
+            return None if name is None else name.decode()
+        word = self._payloads.view[i]
+        if type_id == REAL:
+            return _DOUBLE.unpack(_WORD.pack(word))[0]
+        if type_id == INT:
+            return word
+        if type_id == BOOL:
+            return bool(word)
+        return None
+
+    def term(self, i: int) -> 'MappedTerm':
+        """The handle of node i."""
+        with self._handles_lock:
+            term = self._handles.get(i)
+            if term is None:
+                term = self._handles[i] = MappedTerm(self, i)
+        return term
+
+    def node_array(self, typecode: str = "q") -> MappedArray:
+        """
+        A zero-filled array of one item per node, in an anonymous file of the directory of the store, e.g. to keep the
+        state of a traversal out of core. The caller closes it.
+        """
+        nodes = MappedArray(self.directory, typecode, len(self))
+        nodes.length = len(self)
+        return nodes
+
+    def post_order(self, roots: Iterable[int], visited: MappedArray, epoch: int = 1) -> Iterator[int]:
+        """
+        Post-order traversal of the DAG rooted at several nodes: each node is yielded once, after all its children, in
+        the order of DagWalker and topo_sort_all.
+
+        The visited nodes are marked with the epoch in an array from node_array, rather than in memory, so that the
+        array can be reused by several traversals with increasing epochs, without clearing it.
+
+        :param roots: The numbers of the roots.
+        :param visited: The marks of the visited nodes.
+        :param epoch: The mark of the nodes visited by this traversal, positive.
+        """
+        marks = visited.view
+        for root in roots:
+            if marks[root] == epoch:
+                continue
+            # the expanded nodes are pushed complemented, to be yielded when popped
+            stack = [root]
+            while stack:
+                i = stack.pop()
+                if i < 0:
+                    yield ~i
+                    continue
+                if marks[i] == epoch:
+                    continue
+                marks[i] = epoch
+                stack.append(~i)
+                stack.extend(c for c in reversed(self._children_of(i)) if marks[c] != epoch)
+
+
+def _remove(arrays: list[MappedArray], directory: str) -> None:
+    for a in arrays:
+        a.close()
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+class MappedTerm:
+    """
+    The handle of a node of a TermStore, usable wherever a Term is: it has the term type, children and payload of the
+    node, read from the store when accessed.
+
+    The handle of a node is unique while in use, so that handles can be compared and memoized by identity as interned
+    terms. It keeps the handles of its children once accessed: the handles of a DAG stay in memory while the handle
+    of its root is in use, and the nodes are only in the store otherwise.
+    """
+    __slots__ = ("store", "index", "_children", "__weakref__")
+
+    def __init__(self, store: TermStore, index: int):
+        self.store = store
+        self.index = index
+        self._children: tuple['MappedTerm', ...] | None = None
+
+    @property
+    def term_type(self) -> TermType:
+        return self.store.term_types[self.store.type_id(self.index)]
+
+    @property
+    def children(self) -> tuple['MappedTerm', ...]:
+        if self._children is None:
+            self._children = tuple([self.store.term(c) for c in self.store.children(self.index)])
+        return self._children
+
+    @property
+    def payload(self) -> Any | None:
+        return self.store.payload(self.index)
+
+    @property
+    def _serial(self) -> int:
+        # the creation order of the node, the sort key of the children in canonical mode
+        return self.index
+
+    def __hash__(self):
+        return self.index
+
+    def __repr__(self):
+        return f"MappedTerm(index={self.index}, term_type={self.term_type.name!r}, payload={self.payload!r})"
+
+
+class MappedTermManager(TermManager):
+    """
+    A term manager keeping the terms in a TermStore, for problems whose DAG does not fit in memory: the terms created
+    are MappedTerm handles, and the parser, the transformations and the writers work on them as on terms.
+
+    The in-memory structures built over whole DAGs, e.g. the memo of a DagWalker, hold a handle per node; the
+    StreamingSmtlibWriter works on the store directly, with a resident set bounded by the depth of the terms.
+
+    The creations are serialized by a lock.
+
+    :param directory: The directory of the store (see TermStore).
+    :param canonical: Whether to create terms in canonical mode (see TermManager).
+    :param capacity: The initial number of nodes of the store.
+    """
+
+    def __init__(self, directory: str | None = None, canonical=False, capacity: int = INITIAL_CAPACITY):
+        super().__init__(canonical)
+        self.store = TermStore(self._term_types, directory, capacity)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def close(self) -> None:
+        """Close the store, removing its files; the terms must not be used afterwards."""
+        self.store.close()
+
+    def __enter__(self) -> 'MappedTermManager':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def create(self, term_type: TermType, children: tuple[MappedTerm, ...], payload: Any | None = None) -> MappedTerm:
+        if self.canonical and term_type.id in COMMUTATIVE:
+            children = self._canonical_children(term_type, children)
+        if any(not isinstance(c, MappedTerm) or c.store is not self.store for c in children):
+            raise ValueError("The children belong to another manager: import them with import_terms")
+        with self._lock:
+            i = self.store.intern(term_type.id, tuple([c.index for c in children]), payload)
+        return self.store.term(i)
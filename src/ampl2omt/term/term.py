@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Any, Iterable
+from typing import Any, Callable, Iterable
 
 from ampl2omt.term.types import VAR_REAL, VAR_INT, VAR_BOOL, REAL, INT, BOOL
 
@@ -19,18 +19,50 @@ class Term:
     children: tuple['Term']
     payload: Any
 
+    def __post_init__(self):
+        # Terms are interned and heavily shared: hashing the whole subtree on every lookup is quadratic on DAGs.
+        object.__setattr__(self, "_hash", hash((self.term_type, self.children, self.payload)))
+
+    def __hash__(self):
+        return self._hash
+
 
 def topo_sort(term: Term) -> Iterable[Term]:
-    stack = [term]
-    visited = set()
-    while stack:
-        node = stack[-1]
-        if node in visited:
-            stack.pop()
-            yield node
-        else:
-            visited.add(node)
-            stack.extend(reversed(node.children))
+    """Post-order traversal of the DAG rooted at a term: each node is yielded exactly once, after all its children."""
+    return topo_sort_all([term])
+
+
+def topo_sort_all(terms: Iterable[Term], skip: Callable[[Term], bool] | None = None) -> Iterable[Term]:
+    """
+    Post-order traversal of the DAG rooted at several terms.
+
+    Each node is yielded exactly once, after all its children.
+
+    :param terms: The roots.
+    :param skip: A predicate on the nodes to cut off, e.g. those already processed: a skipped node is neither
+        yielded nor descended into.
+    """
+    # whether each node reached so far has been yielded (it is expanded, with its children above it, otherwise)
+    yielded: dict[Term, bool] = {}
+    for term in terms:
+        if term in yielded or skip is not None and skip(term):
+            continue
+        stack = [term]
+        while stack:
+            node = stack[-1]
+            state = yielded.get(node)
+            if state is None:
+                yielded[node] = False
+                if skip is None:
+                    stack.extend(reversed(node.children))
+                else:
+                    stack.extend(c for c in reversed(node.children) if not skip(c))
+            else:
+                # a node shared by several parents may be on the stack several times
+                stack.pop()
+                if not state:
+                    yielded[node] = True
+                    yield node
 
 
 def is_var(term: Term) -> bool:
@@ -0,0 +1,73 @@
+from typing import Callable, Generic, Iterable, TypeVar
+
+from ampl2omt.progress import Monitor
+from ampl2omt.term.term import Term
+
+T = TypeVar("T")
+
+
+class DagWalker(Generic[T]):
+    """
+    Memoized post-order walker over the DAG of several terms, computing a value per node from those of its children.
+
+    The values are memoized by term id (terms are interned, so equal terms are the same object) and kept across
+    walks: a node shared by several roots, or walked again later, is handled once. The walk is iterative, so
+    arbitrarily deep terms are supported.
+
+    :param leave: The handler computing the value of a node from the values of its children, in order; children is
+        None if the walk was cut off at the node.
+    :param enter: The handler called on a node before its children, returning False to cut off the walk at the node:
+        its children are not walked, and its value is computed by leave(node, None). None to walk every node.
+    :param monitor: The monitor counting the nodes left, e.g. to report the progress of a writer.
+    """
+
+    def __init__(self, leave: Callable[[Term, list[T] | None], T], enter: Callable[[Term], bool] | None = None,
+                 monitor: Monitor | None = None):
+        self.leave = leave
+        self.enter = enter
+        self.monitor = monitor
+        self.memo: dict[int, T] = {}
+        # the walked roots are kept alive, so that the ids of their nodes are not reused
+        self._roots: list[Term] = []
+
+    def walk(self, roots: Iterable[Term]) -> list[T]:
+        """
+        Walk the DAG rooted at several terms, skipping the nodes already walked.
+
+        :param roots: The roots.
+        :return: The value of each root.
+        """
+        memo = self.memo
+        leave, enter, monitor = self.leave, self.enter, self.monitor
+        values = []
+        for root in roots:
+            if id(root) not in memo:
+                self._roots.append(root)
+                stack = [(root, False)]
+                while stack:
+                    node, expanded = stack.pop()
+                    key = id(node)
+                    if key in memo:
+                        continue
+                    if expanded:
+                        memo[key] = leave(node, [memo[id(c)] for c in node.children])
+                    elif enter is not None and not enter(node):
+                        memo[key] = leave(node, None)
+                    else:
+                        stack.append((node, True))
+                        stack.extend((c, False) for c in reversed(node.children) if id(c) not in memo)
+                        continue
+                    if monitor is not None:
+                        monitor.step(nodes=1)
+            values.append(memo[id(root)])
+        return values
+
+    def value(self, term: Term) -> T:
+        """The value of a term, walking it if needed."""
+        value = self.memo.get(id(term))
+        if value is None and id(term) not in self.memo:
+            return self.walk([term])[0]
+        return value
+
+    def __contains__(self, term: Term) -> bool:
+        return id(term) in self.memo
@@ -0,0 +1,145 @@
+import math
+import random
+from typing import Iterable
+
+from ampl2omt.analysis.convexity import Curvature, curvatures, constraint_curvature
+from ampl2omt.analysis.fbbt import FBBT
+from ampl2omt.analysis.interval import Interval
+from ampl2omt.evaluation.autodiff import ReverseAD
+from ampl2omt.options import GUESS_POINT, MIDPOINT_POINT, SAMPLE_POINT, ALL_POINTS
+from ampl2omt.problem.problem import NLPProblem
+from ampl2omt.term.manager import TermManager
+from ampl2omt.term.term import Term
+from ampl2omt.term.types import LT, LE, EQ, GE, GT
+
+
+class TangentCuts:
+    """
+    Generate linear outer-approximation cuts for convex constraints.
+
+    A constraint a <= b (or a < b) whose body f = a - b is detected as convex implies the tangent cut
+    f(p) + grad f(p) . (x - p) <= 0 at every point p where f is differentiable; symmetrically for a >= b with a concave
+    body, and for equalities with a convex or concave body. Affine constraints are already linear and get no cuts.
+
+    Cut points are chosen by the given strategies, in order, until n_cuts points are collected:
+      - guess: the primal initial guess of the problem, clamped to the bounds.
+      - midpoint: the midpoint of the variable bounds (the guess, where unbounded).
+      - sample: uniformly random points within the bounds (around the guess, where unbounded), repeated as needed.
+    Points where a constraint or its gradient is undefined are skipped for that constraint.
+
+    :param mgr: The term manager.
+    :param n_cuts: The maximum number of cuts per constraint.
+    :param points: The point strategies.
+    :param bounds: The variable bounds, e.g. from FBBT; by default, a single FBBT sweep collects the explicit bounds.
+    :param seed: The seed of the random sampling.
+    :param tol: The relative slack added to each cut, to absorb floating-point errors.
+    """
+
+    def __init__(self, mgr: TermManager, n_cuts: int = 2, points: Iterable[str] = (GUESS_POINT, MIDPOINT_POINT),
+                 bounds: dict[Term, Interval] | None = None, seed: int = 0, tol: float = 1e-9):
+        self.mgr = mgr
+        self.n_cuts = n_cuts
+        self.points = list(points)
+        unknown = set(self.points) - set(ALL_POINTS)
+        if unknown:
+            raise ValueError(f"Unknown cut point strategies: {', '.join(sorted(unknown))}")
+        self.bounds = bounds
+        self.seed = seed
+        self.tol = tol
+
+    def cuts(self, problem: NLPProblem) -> list[Term]:
+        """
+        Generate the cuts of the convex constraints of a problem.
+
+        :param problem: The problem.
+        :return: The cuts, as linear constraints over the problem variables.
+        """
+        bounds = self.bounds
+        if bounds is None:
+            result = FBBT(max_iter=1).run(problem)
+            bounds = {} if result.infeasible else result.bounds
+        curvature = curvatures(problem.constraints, bounds)
+        # the sign of each constraint whose body is s * f <= 0 for a convex f
+        selected: list[tuple[Term, float]] = []
+        for c in problem.constraints:
+            body = constraint_curvature(c, curvature)
+            if body == Curvature.AFFINE or body == Curvature.UNKNOWN:
+                continue
+            type_id = c.term_type.id
+            if body & Curvature.CONVEX and type_id in (LT, LE, EQ):
+                selected.append((c, 1.))
+            elif body & Curvature.CONCAVE and type_id in (GT, GE, EQ):
+                selected.append((c, -1.))
+        points = self.cut_points(problem, bounds)
+        if not selected or not points:
+            return []
+
+        gradients = ReverseAD(problem.variables, [c for c, _ in selected]).gradient_batch(points)
+        cuts = []
+        # the cuts found so far and the constraints of the problem, with cuts kept in order of discovery
+        seen = set(problem.constraints)
+        for k, (c, sign) in enumerate(selected):
+            columns, partials = gradients.row(k)
+            for p, value, gradient in zip(points, gradients.values[:, k], partials):
+                cut = self._cut(problem.variables, columns, p, sign * value, sign * gradient)
+                if cut is not None and cut not in seen:
+                    seen.add(cut)
+                    cuts.append(cut)
+        return cuts
+
+    def cut_points(self, problem: NLPProblem, bounds: dict[Term, Interval]) -> list[list[float]]:
+        """
+        Choose the cut points, by the configured strategies.
+
+        :param problem: The problem.
+        :param bounds: The variable bounds.
+        :return: At most n_cuts distinct points.
+        """
+        intervals = [bounds.get(v, Interval.entire()) for v in problem.variables]
+        # curvature is only detected within the bounds, so tangents must be taken there
+        guess = [_clamp(i, g) for i, g in zip(intervals, problem.initial_point())]
+        rng = random.Random(self.seed)
+        points: list[list[float]] = []
+        for strategy in self.points:
+            if strategy == GUESS_POINT:
+                candidates = [guess]
+            elif strategy == MIDPOINT_POINT:
+                candidates = [[_midpoint(i, g) for i, g in zip(intervals, guess)]]
+            else:
+                candidates = [[_sample(i, g, rng) for i, g in zip(intervals, guess)]
+                              for _ in range(self.n_cuts - len(points))]
+            for point in candidates:
+                if len(points) < self.n_cuts and point not in points:
+                    points.append(point)
+        return points
+
+    def _cut(self, variables: list[Term], columns, point: list[float], value: float, gradient) -> Term | None:
+        """
+        The cut value + gradient . (x - point) <= 0, or None if undefined or trivial; the gradient is sparse, over the
+        variables of the given columns.
+        """
+        if not math.isfinite(value) or not all(math.isfinite(g) for g in gradient):
+            return None
+        addends = [self.mgr.Mult(self.mgr.Real(float(g)), variables[j]) for g, j in zip(gradient, columns) if g != 0]
+        if not addends:
+            return None
+        rhs = float(sum(g * point[j] for g, j in zip(gradient, columns)) - value)
+        rhs += self.tol * max(1., abs(rhs))
+        lhs = addends[0] if len(addends) == 1 else self.mgr.Sum(addends)
+        return self.mgr.Le(lhs, self.mgr.Real(rhs))
+
+
+def _clamp(interval: Interval, value: float) -> float:
+    return min(max(value, interval.lo), interval.hi)
+
+
+def _midpoint(interval: Interval, guess: float) -> float:
+    if math.isfinite(interval.lo) and math.isfinite(interval.hi):
+        return (interval.lo + interval.hi) / 2
+    return guess
+
+
+def _sample(interval: Interval, guess: float, rng: random.Random) -> float:
+    lo = interval.lo if math.isfinite(interval.lo) else min(guess, interval.hi) - 1.
+    hi = interval.hi if math.isfinite(interval.hi) else max(guess, interval.lo) + 1.
+    return rng.uniform(lo, hi)
@@ -0,0 +1,152 @@
+import dataclasses
+import math
+from typing import Iterable
+
+from ampl2omt.options import POW_RULE, SQRT_RULE, LOG10_RULE, ABS_RULE, MINMAX_RULE, NEG_RULE, ALL_RULES
+from ampl2omt.problem.problem import NLPProblem
+from ampl2omt.term.manager import TermManager
+from ampl2omt.term.term import Term, topo_sort_all, is_const
+from ampl2omt.term.types import POW, SQRT, LOG10, ABS, MIN, MAX, NEG, MINUS, REAL, INT, IF, IFS, OR, ORN, IMPLIES
+
+# The operators whose children are only evaluated under a condition: all of them for the disjunctions and
+# implications, the branches for the ites (the condition is always evaluated).
+_CONDITIONAL = frozenset({OR, ORN, IMPLIES})
+_BRANCHING = frozenset({IF, IFS})
+
+
+class Normalizer:
+    """
+    Rewrite terms into forms that SMT solvers handle efficiently.
+
+    Available rules:
+      - pow: pow(x, k) with a small integer constant k becomes a chain of multiplications (1 / chain if k < 0).
+      - sqrt: sqrt(x) becomes a fresh variable y, constrained by y >= 0 and y * y = x (sqrt of constants is folded).
+        The constraints are global, so only the sqrt evaluated unconditionally are rewritten: those under an ite
+        branch or a disjunction, e.g. ite(x >= 0, sqrt(x), 0), would otherwise force x >= 0.
+      - log10: log10(x) becomes log(x) / ln(10).
+      - abs: abs(x) becomes ite(x >= 0, x, -x).
+      - minmax: min and max become nested ite, pairing the arguments as a balanced tree.
+      - neg: unary and binary minus of constants are folded into a constant.
+
+    Rewrites are memoized, so shared subterms are rewritten once and stay shared.
+
+    :param mgr: The term manager.
+    :param rules: The names of the rules to apply.
+    :param max_pow_exponent: The largest absolute exponent expanded by the pow rule.
+    """
+
+    def __init__(self, mgr: TermManager, rules: Iterable[str] = ALL_RULES, max_pow_exponent: int = 16):
+        self.mgr = mgr
+        self.rules = set(rules)
+        unknown = self.rules - set(ALL_RULES)
+        if unknown:
+            raise ValueError(f"Unknown normalization rules: {', '.join(sorted(unknown))}")
+        self.max_pow_exponent = max_pow_exponent
+        self.rewritten: dict[Term, Term] = {}
+        # fresh variables and their defining constraints, introduced by the sqrt rule
+        self.variables: list[Term] = []
+        self.constraints: list[Term] = []
+
+    def normalize(self, problem: NLPProblem) -> NLPProblem:
+        """
+        Normalize all the constraints and objectives of a problem.
+
+        :param problem: The problem to normalize.
+        :return: A new problem, including the fresh variables and constraints introduced by the rewrites.
+        """
+        n_vars, n_cons = len(self.variables), len(self.constraints)
+        self.rewrite_all(problem.constraints + [o.term for o in problem.objectives])
+        return NLPProblem(
+            variables=problem.variables + self.variables[n_vars:],
+            objectives=[dataclasses.replace(o, term=self.rewritten[o.term]) for o in problem.objectives],
+            constraints=[self.rewritten[c] for c in problem.constraints] + self.constraints[n_cons:],
+            primal_initial_guess=dict(problem.primal_initial_guess),
+            dual_initial_guess=dict(problem.dual_initial_guess),
+        )
+
+    def rewrite(self, term: Term) -> Term:
+        self.rewrite_all([term])
+        return self.rewritten[term]
+
+    def rewrite_all(self, terms: list[Term]) -> None:
+        rewritten = self.rewritten
+        unconditional = _unconditional(terms) if SQRT_RULE in self.rules else set()
+        for node in topo_sort_all(terms):
+            if node in rewritten:
+                continue
+            children = tuple(rewritten[c] for c in node.children)
+            rebuilt = node if children == node.children else self.mgr.create(node.term_type, children, node.payload)
+            rewritten[node] = self._apply_rules(rebuilt, node in unconditional)
+
+    def _apply_rules(self, node: Term, unconditional=True) -> Term:
+        type_id = node.term_type.id
+        mgr = self.mgr
+        if type_id == POW and POW_RULE in self.rules:
+            base, exponent = node.children
+            if _is_number(exponent) and float(exponent.payload).is_integer() \
+                    and abs(exponent.payload) <= self.max_pow_exponent:
+                k = int(exponent.payload)
+                if k < 0:
+                    return mgr.Div(mgr.Real(1), self._power(base, -k))
+                return self._power(base, k)
+        elif type_id == SQRT and SQRT_RULE in self.rules:
+            arg, = node.children
+            if _is_number(arg):
+                return mgr.Real(math.sqrt(arg.payload)) if arg.payload >= 0 else node
+            if not unconditional:
+                return node
+            y = mgr.VarReal(f"aux_sqrt_{len(self.variables)}")
+            self.variables.append(y)
+            self.constraints.append(mgr.Ge(y, mgr.Real(0)))
+            self.constraints.append(mgr.Eq(mgr.Mult(y, y), arg))
+            return y
+        elif type_id == LOG10 and LOG10_RULE in self.rules:
+            return mgr.Div(mgr.Log(node.children[0]), mgr.Real(math.log(10)))
+        elif type_id == ABS and ABS_RULE in self.rules:
+            arg, = node.children
+            return mgr.If(mgr.Ge(arg, mgr.Real(0)), arg, mgr.Neg(arg))
+        elif type_id in (MIN, MAX) and MINMAX_RULE in self.rules:
+            better = mgr.Le if type_id == MIN else mgr.Ge
+            # each ite repeats its operands, so fold as a balanced tree: a chain would double the size of the
+            # expanded term at each argument
+            level = list(node.children)
+            while len(level) > 1:
+                paired = [mgr.If(better(a, b), a, b) for a, b in zip(level[::2], level[1::2])]
+                level = paired + level[-1:] if len(level) % 2 else paired
+            return level[0]
+        elif type_id == NEG and NEG_RULE in self.rules and _is_number(node.children[0]):
+            return mgr.Real(-node.children[0].payload)
+        elif type_id == MINUS and NEG_RULE in self.rules and all(_is_number(c) for c in node.children):
+            return mgr.Real(node.children[0].payload - node.children[1].payload)
+        return node
+
+    def _power(self, base: Term, k: int) -> Term:
+        """base^k as a multiplication chain, by repeated squaring so that partial powers are shared."""
+        if k == 0:
+            return self.mgr.Real(1)
+        if k == 1:
+            return base
+        half = self._power(base, k // 2)
+        square = self.mgr.Mult(half, half)
+        return self.mgr.Mult(square, base) if k % 2 else square
+
+
+def _unconditional(roots: list[Term]) -> set[Term]:
+    """The nodes evaluated whenever the roots are: those reachable without entering a conditional child."""
+    reached = set()
+    stack = list(roots)
+    while stack:
+        node = stack.pop()
+        if node in reached:
+            continue
+        reached.add(node)
+        type_id = node.term_type.id
+        if type_id in _BRANCHING:
+            stack.append(node.children[0])
+        elif type_id not in _CONDITIONAL:
+            stack.extend(node.children)
+    return reached
+
+
+def _is_number(term: Term) -> bool:
+    return is_const(term) and term.term_type.id in (REAL, INT)
@@ -0,0 +1,196 @@
+import dataclasses
+import heapq
+import math
+from typing import Callable
+
+from ampl2omt.analysis.fbbt import FBBT
+from ampl2omt.analysis.interval import Interval, IntervalEvaluator
+from ampl2omt.problem.problem import NLPProblem
+from ampl2omt.term.manager import TermManager
+from ampl2omt.term.term import Term, topo_sort_all, is_var, is_const
+from ampl2omt.term.types import EXP, LOG, LOG10, SQRT, SIN, COS, TAN, TANH, SINH, COSH, ATAN, ASINH, ACOSH, ATANH, \
+    ASIN, ACOS, POW, REAL, INT
+
+# Transcendental functions of one argument, keyed by term type id.
+_FUNCTIONS: dict[int, Callable[[float], float]] = {
+    EXP: math.exp,
+    LOG: math.log,
+    LOG10: math.log10,
+    SQRT: math.sqrt,
+    SIN: math.sin,
+    COS: math.cos,
+    TAN: math.tan,
+    TANH: math.tanh,
+    SINH: math.sinh,
+    COSH: math.cosh,
+    ATAN: math.atan,
+    ASINH: math.asinh,
+    ACOSH: math.acosh,
+    ATANH: math.atanh,
+    ASIN: math.asin,
+    ACOS: math.acos,
+}
+
+# Points at which the approximation error of a segment is sampled.
+N_ERROR_SAMPLES = 32
+
+
+def breakpoints(fn: Callable[[float], float], lo: float, hi: float, error: float, max_segments: int) -> list[float]:
+    """
+    Choose breakpoints for the piecewise-linear interpolation of fn on [lo, hi].
+
+    The segment with the largest error is bisected, until the (sampled) error of every segment is at most error, or
+    max_segments segments are reached.
+
+    :param fn: The function to approximate.
+    :param lo: The lower end of the interval.
+    :param hi: The upper end of the interval.
+    :param error: The maximum absolute error of the interpolation.
+    :param max_segments: The maximum number of segments.
+    :return: The sorted breakpoints, including lo and hi.
+    """
+    if hi <= lo:
+        return [lo]
+    heap = [(-_segment_error(fn, lo, hi), lo, hi)]
+    done = []
+    while heap and len(heap) + len(done) < max_segments:
+        e, a, b = heapq.heappop(heap)
+        if -e <= error:
+            done.append((a, b))
+            continue
+        m = (a + b) / 2
+        heapq.heappush(heap, (-_segment_error(fn, a, m), a, m))
+        heapq.heappush(heap, (-_segment_error(fn, m, b), m, b))
+    segments = sorted(done + [(a, b) for _, a, b in heap])
+    return [a for a, _ in segments] + [hi]
+
+
+def _segment_error(fn: Callable[[float], float], a: float, b: float) -> float:
+    fa, fb = fn(a), fn(b)
+    slope = (fb - fa) / (b - a) if b > a else 0.
+    return max(abs(fn(t) - (fa + slope * (t - a)))
+               for t in (a + (b - a) * i / (N_ERROR_SAMPLES + 1) for i in range(1, N_ERROR_SAMPLES + 1)))
+
+
+class PiecewiseLinearizer:
+    """
+    Replace transcendental functions with piecewise-linear approximations, to obtain a linear (QF_LRA) model.
+
+    Every node f(t) of a transcendental function of one argument (exp, log, sin, ..., and powers with a fractional
+    constant exponent) is replaced by a fresh variable y, provided that the bounds of t are finite and f is defined
+    on them. The interpolation of f on the breakpoints b_0 < ... < b_n is encoded by the constraints
+    b_0 <= t <= b_n and OR_i (b_i <= t <= b_i+1 AND y = f(b_i) + s_i (t - b_i)), where s_i is the slope of segment i.
+    If t is not a variable, it is bound to a fresh variable first, so that it is not repeated in every segment.
+    Functions of constants are folded.
+
+    The result is an approximation, not a relaxation: solutions may violate the original constraints by about the
+    error bound. Rewrites are memoized, so shared nodes are encoded once.
+
+    :param mgr: The term manager.
+    :param error: The maximum absolute error of each approximation (sampled, not guaranteed).
+    :param max_segments: The maximum number of segments of each approximation.
+    :param bounds: The variable bounds; by default, they are tightened with FBBT.
+    """
+
+    def __init__(self, mgr: TermManager, error: float = 1e-3, max_segments: int = 64,
+                 bounds: dict[Term, Interval] | None = None):
+        assert error > 0, "error must be positive"
+        assert max_segments > 0, "max_segments must be positive"
+        self.mgr = mgr
+        self.error = error
+        self.max_segments = max_segments
+        self.bounds = bounds
+        self.rewritten: dict[Term, Term] = {}
+        # fresh variables and their defining constraints
+        self.variables: list[Term] = []
+        self.constraints: list[Term] = []
+
+    def linearize(self, problem: NLPProblem) -> NLPProblem:
+        """
+        Approximate all the constraints and objectives of a problem.
+
+        :param problem: The problem to approximate.
+        :return: A new problem, including the fresh variables and constraints of the encodings.
+        """
+        bounds = self.bounds
+        if bounds is None:
+            result = FBBT().run(problem)
+            bounds = {} if result.infeasible else result.bounds
+        n_vars, n_cons = len(self.variables), len(self.constraints)
+        self.rewrite_all(problem.constraints + [o.term for o in problem.objectives], bounds)
+        constraints = [self.rewritten[c] for c in problem.constraints]
+        # argument bounds are often explicit constraints already
+        existing = set(constraints)
+        return dataclasses.replace(
+            problem,
+            variables=problem.variables + self.variables[n_vars:],
+            objectives=[dataclasses.replace(o, term=self.rewritten[o.term]) for o in problem.objectives],
+            constraints=constraints + [c for c in self.constraints[n_cons:] if c not in existing],
+        )
+
+    def rewrite_all(self, terms: list[Term], bounds: dict[Term, Interval]) -> None:
+        rewritten = self.rewritten
+        evaluator = IntervalEvaluator(bounds)
+        for node in topo_sort_all(terms):
+            evaluator.values[node] = evaluator.evaluate_node(node)
+            if node in rewritten:
+                continue
+            children = tuple(rewritten[c] for c in node.children)
+            rebuilt = node if children == node.children else self.mgr.create(node.term_type, children, node.payload)
+            fn = self._function(node)
+            interval = evaluator.values[node.children[0]] if fn is not None else None
+            if fn is None or not _defined(node.term_type.id, fn, interval):
+                rewritten[node] = rebuilt
+            elif is_const(rebuilt.children[0]):
+                rewritten[node] = self.mgr.Real(fn(float(rebuilt.children[0].payload)))
+            else:
+                rewritten[node] = self._encode(fn, rebuilt.children[0], interval)
+
+    @staticmethod
+    def _function(node: Term) -> Callable[[float], float] | None:
+        type_id = node.term_type.id
+        if type_id in _FUNCTIONS:
+            return _FUNCTIONS[type_id]
+        if type_id == POW:
+            exponent = node.children[1]
+            if exponent.term_type.id in (REAL, INT) and not float(exponent.payload).is_integer():
+                p = float(exponent.payload)
+                return lambda t: math.pow(t, p)
+        return None
+
+    def _encode(self, fn: Callable[[float], float], arg: Term, interval: Interval) -> Term:
+        mgr = self.mgr
+        if not is_var(arg):
+            t = mgr.VarReal(f"aux_pwl_{len(self.variables)}")
+            self.variables.append(t)
+            self.constraints.append(mgr.Eq(t, arg))
+            arg = t
+        y = mgr.VarReal(f"aux_pwl_{len(self.variables)}")
+        self.variables.append(y)
+
+        points = breakpoints(fn, interval.lo, interval.hi, self.error, self.max_segments)
+        self.constraints.append(mgr.Ge(arg, mgr.Real(points[0])))
+        self.constraints.append(mgr.Le(arg, mgr.Real(points[-1])))
+        if len(points) == 1:
+            self.constraints.append(mgr.Eq(y, mgr.Real(fn(points[0]))))
+            return y
+        segments = []
+        for a, b in zip(points, points[1:]):
+            slope = (fn(b) - fn(a)) / (b - a)
+            line = mgr.Plus(mgr.Mult(mgr.Real(slope), arg), mgr.Real(fn(a) - slope * a))
+            segments.append(mgr.AndN([mgr.Ge(arg, mgr.Real(a)), mgr.Le(arg, mgr.Real(b)), mgr.Eq(y, line)]))
+        self.constraints.append(segments[0] if len(segments) == 1 else mgr.OrN(segments))
+        return y
+
+
+def _defined(type_id: int, fn: Callable[[float], float], interval: Interval) -> bool:
+    """Whether fn is defined and finite on the (finite) interval, and continuous for tan."""
+    if interval.is_empty() or not math.isfinite(interval.lo) or not math.isfinite(interval.hi):
+        return False
+    if type_id == TAN and math.floor(interval.lo / math.pi + 0.5) != math.floor(interval.hi / math.pi + 0.5):
+        # crosses an asymptote at pi/2 + k pi
+        return False
+    try:
+        return math.isfinite(fn(interval.lo)) and math.isfinite(fn(interval.hi))
+    except (ValueError, OverflowError, ZeroDivisionError):
+        return False
@@ -0,0 +1,123 @@
+from collections.abc import Mapping, Sequence
+
+from ampl2omt.analysis.degree import Degree, LOGICS, degrees, degree_class
+from ampl2omt.problem.problem import NLPProblem, range_constraints
+from ampl2omt.term.manager import TermManager
+from ampl2omt.term.term import Term
+from ampl2omt.writing.smtlibwriter import SmtlibWriter
+
+Ranges = Mapping[int, tuple[float | None, float | None]] | Sequence[tuple[float | None, float | None]]
+
+
+class DeltaConverter:
+    """
+    Convert variants of a parsed problem that differ only in the variable bounds (b) and constraint ranges (r).
+
+    The declarations, the objectives and the body of every constraint are rendered once; each variant only renders
+    its bound asserts around the cached bodies. The output of convert is byte-identical to converting the variant
+    from scratch with SmtlibWriter.to_smtlib (with the default logic and the same daggify).
+
+    :param mgr: The term manager of the problem.
+    :param problem: A problem as built by the parser (constraints built from its ranges, not transformed since).
+    :param writer: The writer rendering the problem.
+    :param daggify: Whether to use daggified terms, as in SmtlibWriter.to_smtlib.
+    """
+
+    def __init__(self, mgr: TermManager, problem: NLPProblem, writer: SmtlibWriter | None = None, daggify=False):
+        if problem.constraints != self._constraints(mgr, problem, problem.var_ranges, problem.cons_ranges):
+            raise ValueError("The constraints of the problem are not the ones built from its ranges: "
+                             "delta conversion only supports problems as built by the parser")
+        self.mgr = mgr
+        self.problem = problem
+        self.daggify = daggify
+        self.writer = writer if writer is not None else SmtlibWriter()
+        self.declarations = self.writer.declare_vars(problem)
+        self.objectives = self.writer.declare_objectives(problem, daggify)
+        self.bodies = {i: self.writer.term_to_bindings(body, daggify) for i, body in problem.cons_bodies.items()}
+
+        objectives = [o.term for o in problem.objectives]
+        degree = degrees(list(problem.cons_bodies.values()) + objectives)
+        self.body_degrees = {i: degree_class(degree[body]) for i, body in problem.cons_bodies.items()}
+        self.objectives_degree = max((degree_class(degree[o]) for o in objectives), default=Degree.CONSTANT)
+
+    def convert(self, var_ranges: Ranges | None = None, cons_ranges: Ranges | None = None) -> str:
+        """
+        Convert a variant of the problem.
+
+        :param var_ranges: The new (lower, upper) bounds of the variables, by index: a mapping (possibly partial) or
+            a sequence with an entry for each variable. Missing entries keep the bounds of the problem.
+        :param cons_ranges: The new (lower, upper) ranges of the constraints, by index, as for var_ranges.
+        :return: The SMT-LIBv2 script of the variant.
+        """
+        var_ranges = self._merge(self.problem.var_ranges, var_ranges)
+        cons_ranges = self._merge(self.problem.cons_ranges, cons_ranges)
+        writer = self.writer
+        lines = []
+        degree = self.objectives_degree
+        for i, (lower, upper) in var_ranges.items():
+            v = self.problem.variables[i]
+            for c in range_constraints(self.mgr, v, lower, upper):
+                scope = []
+                lines.append(writer.declare_constraint(scope, self._relation(c, v, v.payload, scope)))
+                degree = max(degree, Degree.LINEAR)
+        for i, (lower, upper) in cons_ranges.items():
+            bindings, body = self.bodies[i]
+            for c in range_constraints(self.mgr, self.problem.cons_bodies[i], lower, upper):
+                scope = list(bindings)
+                relation = self._relation(c, self.problem.cons_bodies[i], body, scope)
+                lines.append(writer.declare_constraint(scope, relation))
+                degree = max(degree, self.body_degrees[i])
+        return writer.assemble(LOGICS[degree], self.declarations, "\n".join(lines), self.objectives)
+
+    def variant(self, var_ranges: Ranges | None = None, cons_ranges: Ranges | None = None) -> NLPProblem:
+        """The variant of the problem with the given ranges (see convert), as a problem."""
+        var_ranges = self._merge(self.problem.var_ranges, var_ranges)
+        cons_ranges = self._merge(self.problem.cons_ranges, cons_ranges)
+        return NLPProblem(
+            variables=self.problem.variables,
+            objectives=self.problem.objectives,
+            constraints=self._constraints(self.mgr, self.problem, var_ranges, cons_ranges),
+            primal_initial_guess=self.problem.primal_initial_guess,
+            dual_initial_guess=self.problem.dual_initial_guess,
+            var_ranges=var_ranges,
+            cons_bodies=self.problem.cons_bodies,
+            cons_ranges=cons_ranges,
+        )
+
+    def _relation(self, constraint: Term, term: Term, definition: str, bindings: list[str]) -> str:
+        """
+        Render a bound constraint, given the bounded term (the variable or body) and its rendering.
+
+        The sides are rendered in the order of the constraint, as equalities built by a canonical manager may have
+        the bound on the left.
+        """
+        left, right = constraint.children
+        if left is term:
+            children = [definition, self.writer.constant_to_string(right.payload)]
+        else:
+            children = [self.writer.constant_to_string(left.payload), definition]
+        expression = self.writer.operation_to_string(constraint.term_type.name, children)
+        return self.writer.define(expression, bindings, self.daggify)
+
+    @staticmethod
+    def _merge(ranges: dict[int, tuple], updates: Ranges | None) -> dict[int, tuple]:
+        if updates is None:
+            return ranges
+        if not isinstance(updates, Mapping):
+            updates = dict(enumerate(updates))
+        merged = dict(ranges)
+        for i, (lower, upper) in updates.items():
+            if i not in merged:
+                raise ValueError(f"No range {i} in the problem")
+            merged[i] = (None if lower is None else float(lower), None if upper is None else float(upper))
+        return merged
+
+    @staticmethod
+    def _constraints(mgr: TermManager, problem: NLPProblem, var_ranges: dict[int, tuple],
+                     cons_ranges: dict[int, tuple]) -> list[Term]:
+        constraints = []
+        for i, (lower, upper) in var_ranges.items():
+            constraints.extend(range_constraints(mgr, problem.variables[i], lower, upper))
+        for i, (lower, upper) in cons_ranges.items():
+            constraints.extend(range_constraints(mgr, problem.cons_bodies[i], lower, upper))
+        return constraints
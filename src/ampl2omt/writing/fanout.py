@@ -0,0 +1,62 @@
+from ampl2omt.options import CONCAT_MODE, SPLIT_MODE, MODES
+from ampl2omt.problem.problem import NLPProblem
+from ampl2omt.streams import open_output, split_extension
+from ampl2omt.writing.smtlibwriter import SmtlibWriter
+
+
+def objective_path(path: str, k: int) -> str:
+    """The path of the file of objective k, e.g. out.obj0.smt2 for out.smt2 (out.obj0.smt2.gz for out.smt2.gz)."""
+    root, ext = split_extension(path)
+    return f"{root}.obj{k}{ext}"
+
+
+def preamble_path(path: str) -> str:
+    """The path of the shared preamble in split mode, e.g. out.preamble.smt2 for out.smt2."""
+    root, ext = split_extension(path)
+    return f"{root}.preamble{ext}"
+
+
+def write_per_objective(writer: SmtlibWriter, problem: NLPProblem, path: str, mode: str = CONCAT_MODE,
+                        compression: str | None = None, **options) -> list[str]:
+    """
+    Write one script per objective, so that the objectives can be optimized independently (e.g. on separate cores).
+
+    The declarations and constraints are rendered once, and shared by all the objectives: in concat mode, each
+    objective file is a complete script; in split mode, the preamble is written to its own file, and the script of
+    objective k is the concatenation of the preamble and of the objective file (e.g. cat out.preamble.smt2
+    out.obj0.smt2 | solver).
+
+    :param writer: The writer.
+    :param problem: The problem to write.
+    :param path: The output path, from which the paths of the files are derived.
+    :param mode: The mode, concat or split.
+    :param compression: The compression of the files, given by the extension of the path if None (see
+        ampl2omt.streams); compressed files can be concatenated as well, e.g. with zcat.
+    :param options: Further options of SmtlibWriter.to_smtlib_per_objective.
+    :return: The paths of the written files, preamble first in split mode.
+    """
+    paths = []
+    for file_path, parts in render_per_objective(writer, problem, path, mode, **options):
+        paths.append(file_path)
+        with open_output(file_path, compression) as f:
+            f.writelines(parts)
+    return paths
+
+
+def render_per_objective(writer: SmtlibWriter, problem: NLPProblem, path: str, mode: str = CONCAT_MODE,
+                         **options) -> list[tuple[str, list[str]]]:
+    """
+    Render the files written by write_per_objective, without writing them.
+
+    :return: The path of each file, preamble first in split mode, and the parts of its content, to be written one
+        after the other (the preamble is shared by the objective files in concat mode, rather than copied).
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode {mode}, expected one of {', '.join(MODES)}")
+    preamble, chunks = writer.to_smtlib_per_objective(problem, **options)
+    files = []
+    if mode == SPLIT_MODE:
+        files.append((preamble_path(path), [preamble]))
+    for k, chunk in enumerate(chunks):
+        files.append((objective_path(path, k), [preamble, chunk] if mode == CONCAT_MODE else [chunk]))
+    return files
@@ -0,0 +1,166 @@
+from ampl2omt.analysis.linear import LinearModel, linear_model
+from ampl2omt.problem.problem import NLPProblem
+from ampl2omt.term.types import VAR_INT, VAR_BOOL
+from ampl2omt.writing.nlwriter import format_number
+
+# The name of the objective row.
+OBJECTIVE_ROW = "obj"
+# The maximum length of the lines of LP expressions (the LP format limits lines to 510 characters).
+LP_LINE_LENGTH = 255
+
+
+class LpWriter:
+    """
+    Writer of linear problems to the MPS (free format) and CPLEX LP formats, for LP/MILP solvers.
+
+    Constraints on a single variable become bounds, and constraint ranges become ranged rows. Integer variables
+    are marked as such; Boolean ones are written as integers in [0, 1].
+    """
+
+    def to_mps(self, problem: NLPProblem, relax_nonlinear=False, objective: int = 0, name: str = "ampl2omt") -> str:
+        """
+        Convert a linear problem to free MPS.
+
+        :param problem: The problem to convert.
+        :param relax_nonlinear: Whether to drop the nonlinear constraints (see linear_model).
+        :param objective: The index of the objective to write.
+        :param name: The name of the problem.
+        :return: The MPS file.
+        """
+        model = linear_model(problem, relax_nonlinear, objective)
+        names = [v.payload for v in model.variables]
+        rows = [f"c{i}" for i in range(len(model.matrix))]
+        lines = [f"NAME {name}"]
+        if not model.minimize:
+            lines.extend(("OBJSENSE", "    MAX"))
+        lines.extend(("ROWS", f" N  {OBJECTIVE_ROW}"))
+        for i, (lower, upper) in enumerate(zip(model.row_lower, model.row_upper)):
+            sense = "E" if lower is not None and lower == upper else "G" if lower is not None else "L"
+            lines.append(f" {sense}  {rows[i]}")
+
+        columns: list[list[tuple[str, float]]] = [[] for _ in names]
+        for j, k in model.objective.items():
+            columns[j].append((OBJECTIVE_ROW, k))
+        for i, row in enumerate(model.matrix):
+            for j, k in row.items():
+                columns[j].append((rows[i], k))
+        lines.append("COLUMNS")
+        integer = False
+        for j, entries in enumerate(columns):
+            if self._is_integer(model, j) != integer:
+                integer = not integer
+                lines.append(f"    MARKER 'MARKER' 'INT{'ORG' if integer else 'END'}'")
+            # every column is declared, even if it has no coefficient
+            for row, k in entries or [(OBJECTIVE_ROW, 0.)]:
+                lines.append(f"    {names[j]} {row} {format_number(k)}")
+        if integer:
+            lines.append("    MARKER 'MARKER' 'INTEND'")
+
+        lines.append("RHS")
+        if model.objective_constant != 0:
+            # the constant of the objective is minus its right-hand side
+            lines.append(f"    RHS {OBJECTIVE_ROW} {format_number(-model.objective_constant)}")
+        ranges = []
+        for i, (lower, upper) in enumerate(zip(model.row_lower, model.row_upper)):
+            rhs = lower if lower is not None else upper
+            if rhs is not None and rhs != 0:
+                lines.append(f"    RHS {rows[i]} {format_number(rhs)}")
+            if lower is not None and upper is not None and lower != upper:
+                ranges.append(f"    RNG {rows[i]} {format_number(upper - lower)}")
+        if ranges:
+            lines.append("RANGES")
+            lines.extend(ranges)
+
+        lines.append("BOUNDS")
+        for j, name in enumerate(names):
+            lower, upper = self._bounds(model, j)
+            # the default bounds are [0, inf), so all the bounds are explicit
+            if lower is not None and lower == upper:
+                lines.append(f" FX BND {name} {format_number(lower)}")
+                continue
+            if lower is None:
+                lines.append(f" {'FR' if upper is None else 'MI'} BND {name}")
+            else:
+                lines.append(f" LO BND {name} {format_number(lower)}")
+            if upper is not None:
+                lines.append(f" UP BND {name} {format_number(upper)}")
+        lines.append("ENDATA")
+        return "\n".join(lines) + "\n"
+
+    def to_lp(self, problem: NLPProblem, relax_nonlinear=False, objective: int = 0, name: str = "ampl2omt") -> str:
+        """
+        Convert a linear problem to the CPLEX LP format.
+
+        :param problem: The problem to convert.
+        :param relax_nonlinear: Whether to drop the nonlinear constraints (see linear_model).
+        :param objective: The index of the objective to write.
+        :param name: The name of the problem.
+        :return: The LP file.
+        """
+        model = linear_model(problem, relax_nonlinear, objective)
+        names = [v.payload for v in model.variables]
+        lines = [f"\\ Problem: {name}", "Minimize" if model.minimize else "Maximize"]
+        objective_expression = self._expression(model.objective, names)
+        if model.objective_constant != 0:
+            objective_expression += f" {_signed(model.objective_constant)}"
+        lines.append(f" {OBJECTIVE_ROW}: {objective_expression}")
+
+        lines.append("Subject To")
+        for i, (row, lower, upper) in enumerate(zip(model.matrix, model.row_lower, model.row_upper)):
+            expression = self._expression(row, names)
+            if lower is not None and lower == upper:
+                lines.append(f" c{i}: {expression} = {format_number(lower)}")
+            elif lower is not None and upper is not None:
+                # ranges are written as two rows, as not all readers support them
+                lines.append(f" c{i}_lo: {expression} >= {format_number(lower)}")
+                lines.append(f" c{i}_up: {expression} <= {format_number(upper)}")
+            elif lower is not None:
+                lines.append(f" c{i}: {expression} >= {format_number(lower)}")
+            elif upper is not None:
+                lines.append(f" c{i}: {expression} <= {format_number(upper)}")
+
+        lines.append("Bounds")
+        for j, name in enumerate(names):
+            lower, upper = self._bounds(model, j)
+            if lower is not None and lower == upper:
+                lines.append(f" {name} = {format_number(lower)}")
+            elif lower is None and upper is None:
+                lines.append(f" {name} free")
+            else:
+                lines.append(f" {'-inf' if lower is None else format_number(lower)} <= {name} <= "
+                             f"{'+inf' if upper is None else format_number(upper)}")
+        integers = [name for j, name in enumerate(names) if self._is_integer(model, j)]
+        if integers:
+            lines.append("General")
+            lines.extend(f" {name}" for name in integers)
+        lines.append("End")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _is_integer(model: LinearModel, j: int) -> bool:
+        return model.variables[j].term_type.id in (VAR_INT, VAR_BOOL)
+
+    @staticmethod
+    def _bounds(model: LinearModel, j: int) -> tuple[float | None, float | None]:
+        lower, upper = model.lower[j], model.upper[j]
+        if model.variables[j].term_type.id == VAR_BOOL:
+            lower = 0. if lower is None else max(lower, 0.)
+            upper = 1. if upper is None else min(upper, 1.)
+        return lower, upper
+
+    @staticmethod
+    def _expression(coefficients: dict[int, float], names: list[str]) -> str:
+        if not coefficients:
+            # LP expressions cannot be empty
+            return f"0 {names[0]}" if names else "0"
+        lines = [""]
+        for j, k in sorted(coefficients.items()):
+            term = f"{_signed(k)} {names[j]}"
+            if lines[-1] and len(lines[-1]) + len(term) >= LP_LINE_LENGTH:
+                lines.append("")
+            lines[-1] += f" {term}" if lines[-1] else term
+        return "\n   ".join(lines).removeprefix("+ ")
+
+
+def _signed(value: float) -> str:
+    return f"- {format_number(-value)}" if value < 0 else f"+ {format_number(value)}"
@@ -0,0 +1,254 @@
+from collections import Counter
+
+from ampl2omt.analysis.linear import LinearPart, linear_part, split_constraints
+from ampl2omt.problem.objective import Objective
+from ampl2omt.problem.problem import NLPProblem
+from ampl2omt.term.term import Term, TermType, topo_sort_all, is_var, is_const
+
+# Categories of common expressions, in the order of their indices: used in constraints and objectives, in several
+# constraints, in several objectives, in a single constraint, in a single objective.
+COMB, COMC, COMO, COMC1, COMO1 = range(5)
+
+
+class NlWriter:
+    """
+    Writer of problems to the text format of AMPL nl files (g format).
+
+    Every comparison constraint is written as lower <= body <= upper, with its linear part in the J segment and its
+    nonlinear addends in the C segment; constraints with the same body are merged into a single range, and
+    constraints on a single variable become variable bounds. Objectives are split likewise between the G and O
+    segments. Nonlinear subterms shared by several expressions are written once, as common expressions (V segments).
+
+    Variables and constraints are renumbered in the order required by ASL: nonlinear constraints first, variables
+    nonlinear in both constraints and objectives first, then those nonlinear only in constraints, only in
+    objectives, and linear ones. Strict inequalities are written as non-strict ones, and dual initial guesses are
+    dropped, as constraints are renumbered.
+    """
+
+    def to_nl(self, problem: NLPProblem, name: str = "ampl2omt") -> str:
+        """
+        Convert a problem to the text nl format.
+
+        :param problem: The problem to convert.
+        :param name: The name of the problem, written in the header comment.
+        :return: The content of the nl file.
+        """
+        var_bounds, rows = split_constraints(problem.constraints)
+        objectives = [linear_part(o.term) for o in problem.objectives]
+        parts = [r.part for r in rows] + objectives
+        n_cons = len(rows)
+        cons_mask = (1 << n_cons) - 1
+
+        # the constraints and objectives using each node, as a bitmask (objectives after constraints)
+        roots = [t for p in parts for t in p.nonlinear]
+        order = list(topo_sort_all(roots))
+        users: dict[Term, int] = Counter()
+        refs = Counter()
+        for k, p in enumerate(parts):
+            for t in p.nonlinear:
+                users[t] |= 1 << k
+                refs[t] += 1
+        # parents come before their children in the reversed post-order
+        for node in reversed(order):
+            for c in node.children:
+                users[c] |= users[node]
+                refs[c] += 1
+
+        variables = problem.variables
+        var_index = self.order_variables(variables, users, n_cons)
+        unknown = [v for v in users if is_var(v) and v not in var_index] + [
+            v for p in parts for v in p.coefficients if v not in var_index] + [
+            v for v in var_bounds if v not in var_index]
+        if unknown:
+            raise ValueError(f"Variable {unknown[0].payload} is not a variable of the problem")
+        ordered = sorted(var_index, key=var_index.get)
+        # the variables occurring in the nonlinear addends of each constraint and objective
+        occurrences: list[list[Term]] = [[] for _ in parts]
+        for v in ordered:
+            mask = users[v]
+            while mask:
+                occurrences[mask.bit_length() - 1].append(v)
+                mask &= ~(1 << (mask.bit_length() - 1))
+
+        cons_order = sorted(range(n_cons), key=lambda r: not rows[r].part.nonlinear)
+        position = {r: i for i, r in enumerate(cons_order)}
+        jacobian = [self._sparsity(rows[r].part, occurrences[r], var_index) for r in cons_order]
+        gradients = [self._sparsity(o, occurrences[n_cons + k], var_index) for k, o in enumerate(objectives)]
+
+        # common expressions, indexed after the variables by category, then by topological order
+        common: dict[Term, tuple[int, int, int]] = {}
+        for i, node in enumerate(order):
+            if node.children and refs[node] > 1:
+                category, user = self._category(users[node], n_cons)
+                key = position[user] if category == COMC1 else user - n_cons if category == COMO1 else 0
+                common[node] = (category, key, i)
+        common_order = sorted(common, key=common.get)
+        v_index = {node: len(variables) + i for i, node in enumerate(common_order)}
+        n_common = Counter(common[node][0] for node in common_order)
+
+        nlvb = sum(1 for v in variables if users[v] & cons_mask and users[v] >> n_cons)
+        nlvc = sum(1 for v in variables if users[v] & cons_mask)
+        nlvo = sum(1 for v in variables if users[v] >> n_cons)
+        n_eqs = sum(1 for r in rows if r.lower is not None and r.lower == r.upper)
+        n_ranges = sum(1 for r in rows if r.lower is not None and r.upper is not None and r.lower != r.upper)
+        lines = [
+            f"g3 1 1 0\t# problem {name}",
+            f" {len(variables)} {n_cons} {len(objectives)} {n_ranges} {n_eqs}"
+            f"\t# vars, constraints, objectives, ranges, eqns",
+            f" {sum(1 for r in rows if r.part.nonlinear)} {sum(1 for o in objectives if o.nonlinear)}"
+            f"\t# nonlinear constraints, objectives",
+            " 0 0\t# network constraints: nonlinear, linear",
+            # ASL counts the variables nonlinear only in objectives after all those nonlinear in constraints
+            f" {nlvc} {nlvc + nlvo - nlvb if nlvo > nlvb else nlvb} {nlvb}"
+            f"\t# nonlinear vars in constraints, objectives, both",
+            " 0 0 0 1\t# linear network variables; functions; arith, flags",
+            " 0 0 0 0 0\t# discrete variables: binary, integer, nonlinear (b,c,o)",
+            f" {sum(map(len, jacobian))} {sum(map(len, gradients))}\t# nonzeros in Jacobian, gradients",
+            " 0 0\t# max name lengths: constraints, variables",
+            f" {' '.join(str(n_common[c]) for c in range(5))}\t# common exprs: b,c,o,c1,o1",
+        ]
+
+        # segments in the order written by AMPL
+        lines.append("b")
+        lines.extend(_range(*var_bounds.get(v, (None, None))) for v in ordered)
+        guesses = sorted((var_index[variables[i]], value) for i, value in problem.primal_initial_guess.items())
+        if guesses:
+            lines.append(f"x{len(guesses)}")
+            lines.extend(f"{i} {format_number(value)}" for i, value in guesses)
+        if rows:
+            lines.append("r")
+            lines.extend(_range(rows[r].lower, rows[r].upper) for r in cons_order)
+
+        # the expressions used by a single constraint or objective are defined right before it
+        definitions: dict[tuple[int, int], list[Term]] = {}
+        for node in common_order:
+            definitions.setdefault(common[node][:2], []).append(node)
+        for node in common_order:
+            if common[node][0] in (COMB, COMC, COMO):
+                self._definition(node, 0, var_index, v_index, lines)
+        for i, r in enumerate(cons_order):
+            for node in definitions.get((COMC1, i), []):
+                self._definition(node, i + 1, var_index, v_index, lines)
+            lines.append(f"C{i}")
+            self._addends(rows[r].part.nonlinear, 0., var_index, v_index, lines)
+        for k, (o, part) in enumerate(zip(problem.objectives, objectives)):
+            for node in definitions.get((COMO1, k), []):
+                self._definition(node, n_cons + k + 1, var_index, v_index, lines)
+            lines.append(f"O{k} {0 if o.kind == Objective.MINIMIZE else 1}")
+            self._addends(part.nonlinear, part.constant, var_index, v_index, lines)
+
+        column_counts = Counter(j for sparsity in jacobian for j in sparsity)
+        lines.append(f"k{len(ordered) - 1}")
+        total = 0
+        for j in range(len(ordered) - 1):
+            total += column_counts[j]
+            lines.append(str(total))
+        for i, sparsity in enumerate(jacobian):
+            if sparsity:
+                lines.append(f"J{i} {len(sparsity)}")
+                lines.extend(f"{j} {format_number(c)}" for j, c in sparsity.items())
+        for k, sparsity in enumerate(gradients):
+            if sparsity:
+                lines.append(f"G{k} {len(sparsity)}")
+                lines.extend(f"{j} {format_number(c)}" for j, c in sparsity.items())
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _category(users: int, n_cons: int) -> tuple[int, int]:
+        """The category of a common expression and, if used by a single constraint or objective, its index."""
+        cons, objs = users & ((1 << n_cons) - 1), users >> n_cons
+        if cons and objs:
+            return COMB, 0
+        if cons:
+            return (COMC, 0) if cons & (cons - 1) else (COMC1, cons.bit_length() - 1)
+        return (COMO, 0) if objs & (objs - 1) else (COMO1, n_cons + objs.bit_length() - 1)
+
+    @staticmethod
+    def order_variables(variables: list[Term], users: dict[Term, int], n_cons: int) -> dict[Term, int]:
+        """
+        Number the variables as required by ASL: nonlinear in both constraints and objectives, only in constraints,
+        only in objectives, then linear, each group in the order of the problem.
+
+        :param variables: The variables of the problem.
+        :param users: The constraints and objectives (numbered after the constraints) where each variable occurs
+            nonlinearly, as a bitmask.
+        :param n_cons: The number of constraints.
+        :return: The nl index of each variable.
+        """
+        cons_mask = (1 << n_cons) - 1
+
+        def group(v: Term) -> int:
+            in_cons, in_objs = users.get(v, 0) & cons_mask, users.get(v, 0) >> n_cons
+            return 0 if in_cons and in_objs else 1 if in_cons else 2 if in_objs else 3
+
+        return {v: i for i, v in enumerate(sorted(variables, key=group))}
+
+    @staticmethod
+    def _sparsity(part: LinearPart, occurrences: list[Term], var_index: dict[Term, int]) -> dict[int, float]:
+        """The linear coefficient of every variable of a constraint or objective, 0 if it only occurs nonlinearly."""
+        sparsity = {var_index[v]: 0. for v in occurrences}
+        sparsity.update((var_index[v], c) for v, c in part.coefficients.items())
+        return dict(sorted(sparsity.items()))
+
+    def _definition(self, node: Term, k: int, var_index: dict[Term, int], v_index: dict[Term, int],
+                    lines: list[str]) -> None:
+        """Write the V segment of a common expression, used by the k-th constraint/objective only if k > 0."""
+        lines.append(f"V{v_index[node]} 0 {k}")
+        self._expression(node, var_index, v_index, lines, expand=True)
+
+    def _addends(self, nonlinear: dict[Term, float], constant: float, var_index: dict[Term, int],
+                 v_index: dict[Term, int], lines: list[str]) -> None:
+        """Write the sum of the scaled nonlinear addends and of the constant."""
+        n = len(nonlinear) + (constant != 0)
+        if n == 0:
+            lines.append("n0")
+            return
+        if n == 2:
+            lines.append("o0")
+        elif n > 2:
+            lines.extend(("o54", str(n)))
+        for t, s in nonlinear.items():
+            if s == -1:
+                lines.append("o16")
+            elif s != 1:
+                lines.extend(("o2", f"n{format_number(s)}"))
+            self._expression(t, var_index, v_index, lines)
+        if constant != 0:
+            lines.append(f"n{format_number(constant)}")
+
+    def _expression(self, term: Term, var_index: dict[Term, int], v_index: dict[Term, int], lines: list[str],
+                    expand=False) -> None:
+        """Write a term in prefix notation, referring to the common expressions (except term itself if expand)."""
+        stack = [(term, expand)]
+        while stack:
+            node, expand = stack.pop()
+            if not expand and node in v_index:
+                lines.append(f"v{v_index[node]}")
+            elif is_var(node):
+                lines.append(f"v{var_index[node]}")
+            elif is_const(node):
+                lines.append(f"n{format_number(node.payload)}")
+            else:
+                lines.append(f"o{node.term_type.id}")
+                if node.term_type.arity == TermType.NARY:
+                    lines.append(str(len(node.children)))
+                stack.extend((c, False) for c in reversed(node.children))
+
+
+def format_number(value) -> str:
+    """The shortest decimal representation of a number, without a trailing .0, as in nl, MPS and LP files."""
+    s = repr(float(value) + 0.)  # no negative zero
+    return s[:-2] if s.endswith(".0") else s
+
+
+def _range(lower: float | None, upper: float | None) -> str:
+    if lower is None and upper is None:
+        return "3"
+    if lower is not None and lower == upper:
+        return f"4 {format_number(lower)}"
+    if lower is None:
+        return f"1 {format_number(upper)}"
+    if upper is None:
+        return f"2 {format_number(lower)}"
+    return f"0 {format_number(lower)} {format_number(upper)}"
+
@@ -1,60 +1,228 @@
+import math
+from decimal import Decimal
+
+from ampl2omt.analysis.degree import classify
 from ampl2omt.problem.objective import Objective
 from ampl2omt.problem.problem import NLPProblem
-from ampl2omt.term.term import Term, topo_sort, is_var, is_const
+from ampl2omt.progress import CancelToken, Monitor, ProgressCallback, WRITE
+from ampl2omt.term.term import Term, is_var, is_const
+from ampl2omt.term.walker import DagWalker
+
+
+# Relative slack added to the objective bound derived from the initial guess, to absorb floating-point errors.
+WARM_START_SLACK = 1e-9
 
 
 class SmtlibWriter:
-    def to_smtlib(self, problem: NLPProblem, daggify=False) -> str:
-        return ("(set-logic QF_NRAT)\n"
+    def to_smtlib(self, problem: NLPProblem, daggify=False, logic: str | None = None, warm_start=False,
+                  progress: ProgressCallback | None = None, token: CancelToken | None = None) -> str:
+        """
+        Convert a problem to SMT-LIBv2 with optimization extensions.
+
+        :param problem: The problem to convert.
+        :param daggify: Whether to use daggified terms.
+        :param logic: The logic to declare, or None to use the tightest logic for the degree of the problem.
+        :param warm_start: Whether to bound the objective by its value at the primal initial guess (see
+            declare_warm_start).
+        :param progress: The progress callback, given the bytes, constraints and objectives written and the nodes
+            rendered every CHECK_INTERVAL nodes and at the end (see ampl2omt.progress).
+        :param token: The cancel token, checked after each constraint and objective and every CHECK_INTERVAL nodes:
+            the conversion raises concurrent.futures.CancelledError if it was cancelled, TimeoutError if its deadline
+            passed.
+        :return: The SMT-LIBv2 script.
+        """
+        if logic is None:
+            logic = classify(problem).logic
+        monitor = self._monitor(problem, progress, token)
+        # the renderings of the subterms shared by constraints and objectives are computed once
+        walker = self.string_walker(monitor)
+        warm_start_bound = self.declare_warm_start(problem, daggify, walker) if warm_start else ""
+        script = self.assemble(logic, self.declare_vars(problem),
+                               self.declare_constraints(problem, daggify, walker, monitor),
+                               self.declare_objectives(problem, daggify, walker, monitor), warm_start_bound)
+        if monitor is not None:
+            monitor.report()
+        return script
+
+    def to_smtlib_per_objective(self, problem: NLPProblem, daggify=False, logic: str | None = None,
+                                warm_start=False, progress: ProgressCallback | None = None,
+                                token: CancelToken | None = None) -> tuple[str, list[str]]:
+        """
+        Convert a problem to one SMT-LIBv2 script per objective, sharing the declarations and the constraints.
+
+        The preamble is rendered once. The script of objective i is the preamble followed by the i-th objective chunk,
+        and is the script of the problem restricted to objective i (with the logic of the whole problem).
+
+        :param problem: The problem to convert.
+        :param daggify: Whether to use daggified terms.
+        :param logic: The logic to declare, or None to use the tightest logic for the degree of the problem.
+        :param warm_start: Whether to bound each objective by its value at the primal initial guess.
+        :param progress: The progress callback (see to_smtlib).
+        :param token: The cancel token (see to_smtlib).
+        :return: The preamble and the chunk of each objective.
+        """
+        if logic is None:
+            logic = classify(problem).logic
+        monitor = self._monitor(problem, progress, token)
+        walker = self.string_walker(monitor)
+        preamble = self.preamble(logic, self.declare_vars(problem),
+                                 self.declare_constraints(problem, daggify, walker, monitor))
+        chunks = []
+        for k, o in enumerate(problem.objectives):
+            warm_start_bound = self.declare_objective_bound(problem, k, daggify, walker) if warm_start else ""
+            objective = self.declare_objective(o, daggify, walker, monitor)
+            if monitor is not None:
+                monitor.segment(len(objective))
+            chunks.append(self.objective_chunk(objective, warm_start_bound))
+        if monitor is not None:
+            monitor.report()
+        return preamble, chunks
+
+    @staticmethod
+    def _monitor(problem: NLPProblem, progress: ProgressCallback | None,
+                 token: CancelToken | None) -> Monitor | None:
+        if progress is None and token is None:
+            return None
+        return Monitor(WRITE, progress, token, total_segments=len(problem.constraints) + len(problem.objectives))
+
+    def assemble(self, logic: str, declarations: str, constraints: str, objectives: str,
+                 warm_start_bound: str = "") -> str:
+        """Assemble an SMT-LIBv2 script from its rendered sections."""
+        return self.preamble(logic, declarations, constraints) + self.objective_chunk(objectives, warm_start_bound)
+
+    def preamble(self, logic: str, declarations: str, constraints: str) -> str:
+        return (f"(set-logic {logic})\n"
                 "(set-option :produce-models true)\n\n"
-                f"{self.declare_vars(problem)}\n\n"
-                f"{self.declare_constraints(problem, False)}\n\n"
-                f"{self.declare_objectives(problem, False)}\n\n"
+                f"{declarations}\n\n"
+                f"{constraints}\n\n")
+
+    def objective_chunk(self, objectives: str, warm_start_bound: str = "") -> str:
+        return ((f"{warm_start_bound}\n\n" if warm_start_bound else "") +
+                f"{objectives}\n\n"
                 f"(check-sat)\n"
                 f"(get-objectives)")
 
     def declare_vars(self, problem: NLPProblem) -> str:
         return "\n".join(f"(declare-fun {v.payload} () Real)" for v in problem.variables)
 
-    def declare_constraints(self, problem: NLPProblem, daggify) -> str:
-        return "\n".join(
-            f"(assert {self.term_to_string(c, daggify)})"
-            for c in problem.constraints
-        )
+    def declare_constraints(self, problem: NLPProblem, daggify, walker: DagWalker[str] | None = None,
+                            monitor: Monitor | None = None) -> str:
+        walker = walker or self.string_walker(monitor)
+        lines = []
+        for c in problem.constraints:
+            lines.append(f"(assert {self.term_to_string(c, daggify, walker, monitor)})")
+            if monitor is not None:
+                monitor.segment(len(lines[-1]))
+        return "\n".join(lines)
+
+    def declare_constraint(self, bindings: list[str], definition: str) -> str:
+        return f"(assert {self.bindings_to_string(bindings, definition)})"
+
+    def declare_objectives(self, problem: NLPProblem, daggify, walker: DagWalker[str] | None = None,
+                           monitor: Monitor | None = None) -> str:
+        walker = walker or self.string_walker(monitor)
+        lines = []
+        for o in problem.objectives:
+            lines.append(self.declare_objective(o, daggify, walker, monitor))
+            if monitor is not None:
+                monitor.segment(len(lines[-1]))
+        return "\n".join(lines)
+
+    def declare_objective(self, objective: Objective, daggify, walker: DagWalker[str] | None = None,
+                          monitor: Monitor | None = None) -> str:
+        if objective.kind == Objective.MINIMIZE:
+            return f"(minimize {self.term_to_string(objective.term, daggify, walker, monitor)})"
+        return f"(maximize {self.term_to_string(objective.term, daggify, walker, monitor)})"
 
-    def declare_objectives(self, problem: NLPProblem, daggify) -> str:
-        return "\n".join(
-            f"(minimize {self.term_to_string(o.term, daggify)})" if o.kind == Objective.MINIMIZE else
-            f"(maximize {self.term_to_string(o.term, daggify)})"
-            for o in problem.objectives
-        )
+    def declare_warm_start(self, problem: NLPProblem, daggify, walker: DagWalker[str] | None = None) -> str:
+        """
+        Bound the objective by its value at the primal initial guess, so the solver can prune worse solutions early.
 
-    def term_to_string(self, term: Term, daggify) -> str:
+        The bound is only emitted if the problem has a single objective and the guess satisfies all the constraints,
+        so that it can never cut off the optimum.
+
+        :return: The assertion bounding the objective, or an empty string if no bound can be derived.
+        """
+        if len(problem.objectives) != 1:
+            return ""
+        return self.declare_objective_bound(problem, 0, daggify, walker)
+
+    def declare_objective_bound(self, problem: NLPProblem, k: int, daggify,
+                                walker: DagWalker[str] | None = None) -> str:
+        """
+        Bound objective k by its value at the primal initial guess, if the guess satisfies all the constraints.
+
+        The bound is only safe in a script whose only objective is k.
+
+        :return: The assertion bounding the objective, or an empty string if no bound can be derived.
+        """
+        point = problem.initial_point()
+        if any(v != 0. for v in problem.compile_constraints()(point)):
+            return ""
+        value = problem.compile_objectives()(point)[k]
+        if not math.isfinite(value):
+            return ""
+        objective = problem.objectives[k]
+        slack = WARM_START_SLACK * max(1., abs(value))
+        term = self.term_to_string(objective.term, daggify, walker)
+        if objective.kind == Objective.MINIMIZE:
+            return f"(assert (<= {term} {self.constant_to_string(value + slack)}))"
+        return f"(assert (>= {term} {self.constant_to_string(value - slack)}))"
+
+    def constant_to_string(self, value) -> str:
+        if isinstance(value, float) and value < 0:
+            return f"(- {self.constant_to_string(-value)})"
+        if isinstance(value, float) and "e" in repr(value):
+            # SMT-LIB decimals have no exponent
+            return format(Decimal(repr(value)), "f")
+        return str(value)
+
+    def term_to_string(self, term: Term, daggify, walker: DagWalker[str] | None = None,
+                       monitor: Monitor | None = None) -> str:
+        """
+        Render a term.
+
+        :param term: The term.
+        :param daggify: Whether to bind every operation to a name with let, so that shared subterms are written once.
+        :param walker: A walker from string_walker, memoizing the renderings of non-daggified terms across calls;
+            daggified terms are rendered independently, as their let bindings are local.
+        :param monitor: The monitor counting the nodes rendered for daggified terms (the walker counts the others).
+        """
+        if daggify or walker is None:
+            return self.bindings_to_string(*self.term_to_bindings(term, daggify, monitor))
+        return walker.value(term)
+
+    def string_walker(self, monitor: Monitor | None = None) -> DagWalker[str]:
+        """A walker rendering non-daggified terms, to share the renderings of common subterms between terms."""
+        return DagWalker(lambda node, children: self.node_to_string(node, children, [], False), monitor=monitor)
+
+    def term_to_bindings(self, term: Term, daggify, monitor: Monitor | None = None) -> tuple[list[str], str]:
+        """
+        Render a term as a list of let bindings (empty unless daggify) and the definition of the term in their scope.
+        """
         bindings = []
-        definitions: dict[Term, str] = {}
-        n_defs = 0
-        for node in topo_sort(term):
-            if is_var(node):
-                definition = node.payload
-            elif is_const(node):
-                value = node.payload
-                if isinstance(value, float) and value < 0:
-                    definition = f"(- {abs(value)})"
-                else:
-                    definition = str(value)
-            else:
-                if daggify:
-                    definition = f".def_{n_defs}"
-                    n_defs += 1
-                    bindings.append(f"(let (({definition} {self.term_to_string_def(node, definitions)}))")
-                else:
-                    definition = self.term_to_string_def(node, definitions)
-            definitions[node] = definition
-
-        bindings.append(f"{definitions[term]}")
-        term_str = ' '.join(bindings) + ')' * (len(bindings) - 1)
-        return term_str
-
-    def term_to_string_def(self, term: Term, definitions: dict[Term, str]) -> str:
-        assert len(term.children) > 0, str(term)
-        return f"({term.term_type.name} {' '.join(definitions[c] for c in term.children)})"
+        walker = DagWalker(lambda node, children: self.node_to_string(node, children, bindings, daggify),
+                           monitor=monitor)
+        return bindings, walker.value(term)
+
+    def node_to_string(self, node: Term, children: list[str], bindings: list[str], daggify) -> str:
+        """The definition of a node, given those of its children (see define)."""
+        if is_var(node):
+            return node.payload
+        if is_const(node):
+            return self.constant_to_string(node.payload)
+        return self.define(self.operation_to_string(node.term_type.name, children), bindings, daggify)
+
+    def define(self, expression: str, bindings: list[str], daggify) -> str:
+        """The definition of an expression: the expression itself, or the name of a new let binding if daggify."""
+        if not daggify:
+            return expression
+        definition = f".def_{len(bindings)}"
+        bindings.append(f"(let (({definition} {expression}))")
+        return definition
+
+    def bindings_to_string(self, bindings: list[str], definition: str) -> str:
+        return ' '.join(bindings + [definition]) + ')' * len(bindings)
+
+    def operation_to_string(self, name: str, children: list[str]) -> str:
+        return f"({name} {' '.join(children)})"
@@ -0,0 +1,194 @@
+from typing import TextIO
+
+from ampl2omt.analysis.degree import DegreeReport, degree_class, node_degree
+from ampl2omt.problem.objective import Objective
+from ampl2omt.problem.problem import NLPProblem
+from ampl2omt.progress import CancelToken, Monitor, ProgressCallback
+from ampl2omt.term.store import MappedArray, MappedTerm, TermStore
+from ampl2omt.term.types import REAL, INT, BOOL, VAR_REAL, VAR_INT, VAR_BOOL
+from ampl2omt.writing.smtlibwriter import SmtlibWriter
+
+# The number of characters buffered between two writes to the stream.
+BUFFER_SIZE = 1 << 16
+
+_LEAVES = frozenset({REAL, INT, BOOL, VAR_REAL, VAR_INT, VAR_BOOL})
+
+
+class _Output:
+    """A buffer over a text stream, counting the characters written."""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self.parts: list[str] = []
+        self.buffered = 0
+        self.flushed = 0
+
+    def write(self, text: str) -> None:
+        self.parts.append(text)
+        self.buffered += len(text)
+        if self.buffered >= BUFFER_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        self.stream.write("".join(self.parts))
+        self.parts.clear()
+        self.flushed += self.buffered
+        self.buffered = 0
+
+    @property
+    def written(self) -> int:
+        return self.flushed + self.buffered
+
+
+class StreamingSmtlibWriter(SmtlibWriter):
+    """
+    SMT-LIB writer for the problems whose terms are in a TermStore (see MappedTermManager), writing the script to a
+    stream as it is rendered, with the same output as to_smtlib.
+
+    The terms are rendered from the store, one assertion at a time: the state of the traversals (the nodes visited
+    and their let bindings) is kept in arrays mapped from the directory of the store, and the resident set of the
+    writer is bounded by the depth of the terms and the size of the buffer, rather than by the size of the DAG.
+    Non-daggified terms are expanded into trees as they are written, without memoizing the renderings of the subterms.
+    """
+
+    def write(self, problem: NLPProblem, stream: TextIO, daggify=False, logic: str | None = None,
+              progress: ProgressCallback | None = None, token: CancelToken | None = None) -> None:
+        """
+        Write a problem as an SMT-LIBv2 script with optimization extensions.
+
+        :param problem: The problem, whose terms are in a TermStore.
+        :param stream: The text stream to write to.
+        :param daggify: Whether to use daggified terms.
+        :param logic: The logic to declare, or None to use the tightest logic for the degree of the problem (see
+            classify).
+        :param progress: The progress callback (see SmtlibWriter.to_smtlib).
+        :param token: The cancel token (see SmtlibWriter.to_smtlib).
+        """
+        store = self._store(problem)
+        if logic is None:
+            logic = self.classify(problem).logic
+        monitor = self._monitor(problem, progress, token)
+        out = _Output(stream)
+        out.write(f"(set-logic {logic})\n"
+                  "(set-option :produce-models true)\n\n")
+        for k, v in enumerate(problem.variables):
+            out.write(f"{'\n' if k else ''}(declare-fun {v.payload} () Real)")
+        out.write("\n\n")
+        with store.node_array() as visited, store.node_array() as definitions:
+            # the traversal of the k-th term marks its nodes with epoch k + 1
+            epoch = 0
+            for k, c in enumerate(problem.constraints):
+                epoch += 1
+                start = out.written
+                out.write(f"{'\n' if k else ''}(assert ")
+                self._write_term(store, c.index, daggify, out, visited, definitions, epoch, monitor)
+                out.write(")")
+                if monitor is not None:
+                    monitor.segment(out.written - start)
+            out.write("\n\n")
+            for k, o in enumerate(problem.objectives):
+                epoch += 1
+                start = out.written
+                kind = "minimize" if o.kind == Objective.MINIMIZE else "maximize"
+                out.write(f"{'\n' if k else ''}({kind} ")
+                self._write_term(store, o.term.index, daggify, out, visited, definitions, epoch, monitor)
+                out.write(")")
+                if monitor is not None:
+                    monitor.segment(out.written - start)
+        out.write("\n\n"
+                  "(check-sat)\n"
+                  "(get-objectives)")
+        out.flush()
+        if monitor is not None:
+            monitor.report()
+
+    def classify(self, problem: NLPProblem) -> DegreeReport:
+        """
+        Classify the constraints and objectives of a problem by degree, as ampl2omt.analysis.degree.classify, keeping
+        the degrees of the nodes in an array mapped from the directory of the store.
+
+        The report is cached on the problem, and shared with classify.
+        """
+        return problem.cached("degrees", lambda: self._classify(problem))
+
+    def _classify(self, problem: NLPProblem) -> DegreeReport:
+        store = self._store(problem)
+        roots = [c.index for c in problem.constraints] + [o.term.index for o in problem.objectives]
+        # internal degrees go up to NON_ALGEBRAIC = 2^63, and need unsigned items
+        with store.node_array("Q") as degrees, store.node_array("b") as visited:
+            degree = degrees.view
+            for i in store.post_order(roots, visited):
+                degree[i] = node_degree(store.term(i), [degree[c] for c in store.children(i)])
+            return DegreeReport(
+                constraints=[degree_class(degree[c.index]) for c in problem.constraints],
+                objectives=[degree_class(degree[o.term.index]) for o in problem.objectives],
+            )
+
+    @staticmethod
+    def _store(problem: NLPProblem) -> TermStore:
+        terms = problem.constraints + [o.term for o in problem.objectives] + problem.variables
+        if any(not isinstance(t, MappedTerm) for t in terms):
+            raise ValueError("The terms of the problem are not in a TermStore: write it with SmtlibWriter")
+        stores = {t.store for t in terms}
+        if len(stores) != 1:
+            raise ValueError("The terms of the problem must be in a single, non-empty TermStore")
+        return stores.pop()
+
+    def _leaf_to_string(self, store: TermStore, i: int) -> str:
+        if store.type_id(i) in (VAR_REAL, VAR_INT, VAR_BOOL):
+            return store.payload(i)
+        return self.constant_to_string(store.payload(i))
+
+    def _write_term(self, store: TermStore, root: int, daggify, out: _Output, visited: MappedArray,
+                    definitions: MappedArray, epoch: int, monitor: Monitor | None) -> None:
+        if daggify:
+            self._write_bindings(store, root, out, visited, definitions, epoch, monitor)
+        else:
+            self._write_tree(store, root, out, monitor)
+
+    def _write_tree(self, store: TermStore, root: int, out: _Output, monitor: Monitor | None) -> None:
+        # the stack holds the nodes to expand and the text written between them
+        stack: list[int | str] = [root]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                out.write(item)
+                continue
+            if monitor is not None:
+                monitor.step(nodes=1)
+            if store.type_id(item) in _LEAVES:
+                out.write(self._leaf_to_string(store, item))
+                continue
+            name = store.term_types[store.type_id(item)].name
+            children = store.children(item)
+            if not children:
+                out.write(self.operation_to_string(name, []))
+                continue
+            out.write(f"({name}")
+            stack.append(")")
+            for c in reversed(children):
+                stack.append(c)
+                stack.append(" ")
+
+    def _write_bindings(self, store: TermStore, root: int, out: _Output, visited: MappedArray,
+                        definitions: MappedArray, epoch: int, monitor: Monitor | None) -> None:
+        definition = definitions.view
+
+        def reference(i: int) -> str:
+            if store.type_id(i) in _LEAVES:
+                return self._leaf_to_string(store, i)
+            return f".def_{definition[i]}"
+
+        # the bindings are written in the order of term_to_bindings, each followed by a space
+        n_bindings = 0
+        for i in store.post_order([root], visited, epoch):
+            if monitor is not None:
+                monitor.step(nodes=1)
+            if store.type_id(i) in _LEAVES:
+                continue
+            expression = self.operation_to_string(store.term_types[store.type_id(i)].name,
+                                                  [reference(c) for c in store.children(i)])
+            definition[i] = n_bindings
+            out.write(f"(let ((.def_{n_bindings} {expression})) ")
+            n_bindings += 1
+        out.write(reference(root) + ")" * n_bindings)
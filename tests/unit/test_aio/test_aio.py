@@ -0,0 +1,112 @@
+import asyncio
+import gzip
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+import pytest
+
+from ampl2omt.aio import read_text, write_text, run_cancellable
+from ampl2omt.conversion import ConversionOptions, convert, convert_async
+from ampl2omt.parsing.nlparser import NLParser
+from ampl2omt.progress import CancelToken
+from ampl2omt.streams import GZIP
+from ampl2omt.term.manager import TermManager
+
+HS073 = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_parser", "hs073.nl")
+
+
+async def _ticking(coroutine):
+    """Run a coroutine, counting the turns of the event loop it lets other tasks run."""
+    ticks = 0
+    done = False
+
+    async def tick():
+        nonlocal ticks
+        while not done:
+            ticks += 1
+            await asyncio.sleep(0)
+
+    ticker = asyncio.create_task(tick())
+    try:
+        result = await coroutine
+    finally:
+        done = True
+        await ticker
+    return result, ticks
+
+
+def test_read_write_text(tmp_path):
+    path = str(tmp_path / "out.txt.gz")
+    text = "".join(f"line {i}\n" for i in range(1000))
+    _, ticks = asyncio.run(_ticking(write_text(path, [text[:100], text[100:]], chunk_size=512)))
+    assert ticks > 10
+    with gzip.open(path, "rt") as f:
+        assert f.read() == text
+    read, ticks = asyncio.run(_ticking(read_text(path, chunk_size=512)))
+    assert read == text
+    assert ticks > 10
+    asyncio.run(write_text(path, [text], compression=GZIP))
+    assert asyncio.run(read_text(path)) == text
+
+
+def test_parse_file_async():
+    expected = NLParser(TermManager()).parse_file(HS073)
+    with ThreadPoolExecutor(1) as executor:
+        problem = asyncio.run(NLParser(TermManager()).parse_file_async(HS073, executor, chunk_size=64))
+    assert len(problem.constraints) == len(expected.constraints)
+    assert [str(c) for c in problem.constraints] == [str(c) for c in expected.constraints]
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(NLParser(TermManager()).parse_file_async("missing.nl"))
+
+
+def test_parse_cancelled():
+    with open(HS073) as f:
+        text = f.read()
+    token = CancelToken()
+    token.cancel()
+    with pytest.raises(CancelledError):
+        NLParser(TermManager()).parse_string(text, token=token)
+
+
+@pytest.mark.parametrize("options", [
+    ConversionOptions(),
+    ConversionOptions(daggify=True, split_objectives="split"),
+    ConversionOptions(decompose=True),
+    ConversionOptions(daggify=True, out_of_core=tempfile.gettempdir()),
+])
+def test_convert_async(tmp_path, options):
+    expected = convert(HS073, str(tmp_path / "expected.smt2"), options)
+    result = asyncio.run(convert_async(HS073, str(tmp_path / "out.smt2"), options))
+    assert [os.path.basename(p) for p in result.paths] == [
+        os.path.basename(p).replace("expected", "out") for p in expected.paths]
+    for path, expected_path in zip(result.paths, expected.paths):
+        with open(path) as f, open(expected_path) as g:
+            assert f.read() == g.read()
+
+
+def test_run_cancellable():
+    started = threading.Event()
+    stopped = threading.Event()
+
+    def work(token):
+        started.set()
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if token.cancelled:
+                stopped.set()
+                raise CancelledError()
+            time.sleep(0.001)
+
+    async def cancel():
+        task = asyncio.create_task(run_cancellable(None, work))
+        assert await asyncio.to_thread(started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel())
+    # the worker was told, and released its thread
+    assert stopped.wait(1)
@@ -0,0 +1,6 @@
+import pytest
+
+
+@pytest.fixture
+def x(mgr):
+    return [mgr.VarReal(f"x{i}") for i in range(9)]
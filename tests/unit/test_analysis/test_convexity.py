@@ -0,0 +1,64 @@
+import pytest
+
+from ampl2omt.analysis.convexity import Curvature, curvatures, constraint_curvature
+from ampl2omt.analysis.interval import Interval
+
+CONVEX, CONCAVE, AFFINE, UNKNOWN = Curvature.CONVEX, Curvature.CONCAVE, Curvature.AFFINE, Curvature.UNKNOWN
+
+
+def curvature_of(term, bounds=None):
+    return curvatures([term], bounds)[term]
+
+
+@pytest.mark.parametrize("build, expected", [
+    (lambda m, a, b: m.Plus(a, m.Mult(m.Real(3), b)), AFFINE),
+    (lambda m, a, b: m.Pow(a, m.Real(2)), CONVEX),
+    (lambda m, a, b: m.Neg(m.Pow(a, m.Real(2))), CONCAVE),
+    (lambda m, a, b: m.Plus(m.Exp(a), m.Pow(m.Minus(a, b), m.Real(4))), CONVEX),
+    (lambda m, a, b: m.Minus(m.Exp(a), m.Exp(b)), UNKNOWN),
+    (lambda m, a, b: m.Mult(m.Real(-2), m.Exp(a)), CONCAVE),
+    (lambda m, a, b: m.Div(m.Exp(a), m.Real(2)), CONVEX),
+    (lambda m, a, b: m.Exp(m.Pow(a, m.Real(2))), CONVEX),
+    (lambda m, a, b: m.Log(m.Plus(a, b)), CONCAVE),
+    (lambda m, a, b: m.Log(m.Exp(a)), UNKNOWN),
+    (lambda m, a, b: m.Sqrt(a), CONCAVE),
+    (lambda m, a, b: m.Abs(m.Minus(a, b)), CONVEX),
+    (lambda m, a, b: m.Max([a, m.Exp(b)]), CONVEX),
+    (lambda m, a, b: m.Min([a, m.Log(b)]), CONCAVE),
+    (lambda m, a, b: m.Pow(m.Real(2), a), CONVEX),
+    (lambda m, a, b: m.Mult(a, b), UNKNOWN),
+    (lambda m, a, b: m.Sin(a), UNKNOWN),
+    (lambda m, a, b: m.Sin(m.Real(1)), AFFINE),
+])
+def test_curvature(mgr, x, build, expected):
+    assert curvature_of(build(mgr, x[0], x[1])) == expected
+
+
+def test_curvature_depends_on_bounds(mgr, x):
+    cube = mgr.Pow(x[0], mgr.Real(3))
+    assert curvature_of(cube) == UNKNOWN
+    assert curvature_of(cube, {x[0]: Interval(0., 5.)}) == CONVEX
+    assert curvature_of(cube, {x[0]: Interval(-5., -1.)}) == CONCAVE
+
+    # |x|^2 composed with a convex argument is convex only where the square is increasing
+    square = mgr.Pow(mgr.Exp(x[0]), mgr.Real(2))
+    assert curvature_of(square) == CONVEX
+    square_of_log = mgr.Pow(mgr.Log(x[0]), mgr.Real(2))
+    assert curvature_of(square_of_log) == UNKNOWN
+
+    reciprocal = mgr.Div(mgr.Real(1), x[0])
+    assert curvature_of(reciprocal) == UNKNOWN
+    assert curvature_of(reciprocal, {x[0]: Interval(1., 2.)}) == CONVEX
+    assert curvature_of(reciprocal, {x[0]: Interval(-2., -1.)}) == CONCAVE
+
+    scaled = mgr.Mult(x[1], mgr.Exp(x[0]))
+    assert curvature_of(scaled) == UNKNOWN
+
+
+def test_constraint_curvature(mgr, x):
+    f = mgr.Pow(x[0], mgr.Real(2))
+    le, ge = mgr.Le(f, x[1]), mgr.Ge(x[1], f)
+    cs = curvatures([le, ge])
+    assert constraint_curvature(le, cs) == CONVEX
+    assert constraint_curvature(ge, cs) == CONCAVE
+    assert constraint_curvature(mgr.Or(le, ge), curvatures([mgr.Or(le, ge)])) == UNKNOWN
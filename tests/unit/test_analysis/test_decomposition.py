@@ -0,0 +1,83 @@
+from ampl2omt.analysis.decomposition import decompose, separable_parts, UnionFind
+from ampl2omt.problem.objective import Objective
+from ampl2omt.problem.problem import NLPProblem
+
+
+def test_union_find():
+    uf = UnionFind(range(5))
+    uf.union(0, 1)
+    uf.union(3, 4)
+    uf.union(1, 4)
+    assert len({uf.find(i) for i in range(5)}) == 2
+    assert uf.find(0) == uf.find(3)
+    assert uf.find(2) == 2
+
+
+def test_separable_parts(mgr, x):
+    term = mgr.Minus(mgr.Sum([x[0], mgr.Mult(x[1], x[2])]), mgr.Neg(mgr.Plus(x[3], x[4])))
+    assert separable_parts(mgr, term) == [x[0], mgr.Mult(x[1], x[2]), x[3], x[4]]
+    term = mgr.Minus(x[0], mgr.Plus(x[1], x[2]))
+    assert separable_parts(mgr, term) == [x[0], mgr.Neg(x[1]), mgr.Neg(x[2])]
+
+
+def test_decompose_blocks(mgr, x):
+    problem = NLPProblem(
+        variables=x[:5],
+        objectives=[Objective(Objective.MINIMIZE,
+                              mgr.Sum([mgr.Pow(x[0], mgr.Real(2)), mgr.Sin(x[2]), x[1], mgr.Real(3)]))],
+        constraints=[
+            mgr.Le(mgr.Plus(x[0], x[1]), mgr.Real(1)),
+            mgr.Ge(mgr.Mult(x[2], x[3]), mgr.Real(2)),
+            mgr.Ge(x[0], mgr.Real(0)),
+        ])
+    components = decompose(mgr, problem).components
+    assert len(components) == 2
+    first, second = components
+    # x4 is unused and ends up in the first component
+    assert first.variables == [x[0], x[1], x[4]]
+    assert first.constraints == [problem.constraints[0], problem.constraints[2]]
+    assert first.objectives == [Objective(Objective.MINIMIZE,
+                                          mgr.Sum([mgr.Pow(x[0], mgr.Real(2)), x[1], mgr.Real(3)]))]
+    assert second.variables == [x[2], x[3]]
+    assert second.constraints == [problem.constraints[1]]
+    assert second.objectives == [Objective(Objective.MINIMIZE, mgr.Sin(x[2]))]
+
+
+def test_decompose_initial_guess(mgr, x):
+    problem = NLPProblem(
+        variables=x[:3],
+        objectives=[],
+        constraints=[mgr.Le(x[0], x[2]), mgr.Ge(x[1], mgr.Real(0))],
+        primal_initial_guess={1: 5., 2: 3.})
+    first, second = decompose(mgr, problem).components
+    assert first.variables == [x[0], x[2]]
+    assert first.primal_initial_guess == {1: 3.}
+    assert second.primal_initial_guess == {0: 5.}
+
+
+def test_objective_links_components(mgr, x):
+    problem = NLPProblem(
+        variables=x[:2],
+        objectives=[Objective(Objective.MAXIMIZE, mgr.Mult(x[0], x[1]))],
+        constraints=[mgr.Ge(x[0], mgr.Real(0)), mgr.Ge(x[1], mgr.Real(0))])
+    components = decompose(mgr, problem).components
+    assert len(components) == 1
+    assert components[0].variables == x[:2]
+
+
+def test_shared_subterm_links_components(mgr, x):
+    shared = mgr.Exp(mgr.Plus(x[0], x[1]))
+    problem = NLPProblem(
+        variables=x[:3],
+        objectives=[],
+        constraints=[mgr.Ge(mgr.Mult(shared, x[2]), mgr.Real(0)), mgr.Le(shared, mgr.Real(5))])
+    assert len(decompose(mgr, problem).components) == 1
+
+
+def test_missing_objective_part_is_zero(mgr, x):
+    problem = NLPProblem(
+        variables=x[:2],
+        objectives=[Objective(Objective.MINIMIZE, x[0])],
+        constraints=[mgr.Ge(x[0], mgr.Real(0)), mgr.Ge(x[1], mgr.Real(0))])
+    components = decompose(mgr, problem).components
+    assert components[1].objectives == [Objective(Objective.MINIMIZE, mgr.Real(0))]
@@ -0,0 +1,56 @@
+import pytest
+
+from ampl2omt.analysis.degree import Degree, classify
+from ampl2omt.problem.objective import Objective
+from ampl2omt.problem.problem import NLPProblem
+
+
+def problem_of(*constraints):
+    return NLPProblem(variables=[], objectives=[], constraints=list(constraints))
+
+
+@pytest.mark.parametrize("build, expected", [
+    (lambda m, x: m.Le(m.Real(1), m.Real(2)), Degree.CONSTANT),
+    (lambda m, x: m.Le(m.Sum([x[0], m.Mult(m.Real(2), x[1])]), m.Real(1)), Degree.LINEAR),
+    (lambda m, x: m.Le(m.Div(x[0], m.Real(2)), m.Real(1)), Degree.LINEAR),
+    (lambda m, x: m.Eq(m.Mult(x[0], x[1]), m.Real(1)), Degree.QUADRATIC),
+    (lambda m, x: m.Eq(m.Pow(x[0], m.Real(2)), m.Real(1)), Degree.QUADRATIC),
+    (lambda m, x: m.Eq(m.Pow(m.Mult(x[0], x[1]), m.Real(2)), m.Real(1)), Degree.POLYNOMIAL),
+    (lambda m, x: m.Eq(m.Div(m.Real(1), x[0]), m.Real(1)), Degree.POLYNOMIAL),
+    (lambda m, x: m.Eq(m.Pow(x[0], m.Real(-1)), m.Real(1)), Degree.POLYNOMIAL),
+    (lambda m, x: m.Eq(m.Pow(x[0], m.Real(0.5)), m.Real(1)), Degree.TRANSCENDENTAL),
+    (lambda m, x: m.Eq(m.Pow(m.Real(2), x[0]), m.Real(1)), Degree.TRANSCENDENTAL),
+    (lambda m, x: m.Le(m.Sin(x[0]), m.Real(1)), Degree.TRANSCENDENTAL),
+    (lambda m, x: m.Le(m.Exp(m.Real(1)), x[0]), Degree.TRANSCENDENTAL),
+    (lambda m, x: m.Le(m.Abs(x[0]), m.Max([x[1], m.Real(1)])), Degree.LINEAR),
+])
+def test_constraint_degree(mgr, x, build, expected):
+    assert classify(problem_of(build(mgr, x))).constraints == [expected]
+
+
+@pytest.mark.parametrize("constraint, logic", [
+    (lambda m, x: m.Le(x[0], m.Real(1)), "QF_LRA"),
+    (lambda m, x: m.Le(m.Mult(x[0], x[1]), m.Real(1)), "QF_NRA"),
+    (lambda m, x: m.Le(m.Cos(x[0]), m.Real(1)), "QF_NRAT"),
+])
+def test_logic(mgr, x, constraint, logic):
+    assert classify(problem_of(constraint(mgr, x))).logic == logic
+
+
+def test_report(mgr, x):
+    problem = NLPProblem(
+        variables=x[:2],
+        objectives=[Objective(Objective.MINIMIZE, mgr.Mult(x[0], x[1]))],
+        constraints=[mgr.Le(x[0], mgr.Real(1)), mgr.Ge(x[1], mgr.Real(0))])
+    report = classify(problem)
+    assert report.objectives == [Degree.QUADRATIC]
+    assert report.degree == Degree.QUADRATIC
+    assert str(report).splitlines()[0] == "logic: QF_NRA"
+    assert "linear                     2           0" in str(report)
+
+
+def test_report_follows_mutation(mgr, x):
+    problem = problem_of(mgr.Le(x[0], mgr.Real(1)))
+    assert classify(problem).logic == "QF_LRA"
+    problem.add_constraints([mgr.Le(mgr.Exp(x[0]), mgr.Real(1))])
+    assert classify(problem).logic == "QF_NRAT"
@@ -0,0 +1,133 @@
+import math
+
+import pytest
+
+from ampl2omt.analysis.fbbt import FBBT, bound_constraints
+from ampl2omt.problem.objective import Objective
+from ampl2omt.problem.problem import NLPProblem
+
+
+def test_linear_propagation(mgr, x):
+    # x0 + x1 <= 4, x0 >= 1, x1 >= 2  ==>  x0 <= 2, x1 <= 3
+    problem = NLPProblem(
+        variables=x[:2],
+        objectives=[],
+        constraints=[
+            mgr.Le(mgr.Plus(x[0], x[1]), mgr.Real(4)),
+            mgr.Ge(x[0], mgr.Real(1)),
+            mgr.Ge(x[1], mgr.Real(2)),
+        ])
+    result = FBBT().run(problem)
+    assert result.converged and not result.infeasible
+    assert result.bounds[x[0]].hi == pytest.approx(2)
+    assert result.bounds[x[1]].hi == pytest.approx(3)
+    assert result.bounds[x[0]].hi >= 2 and result.bounds[x[1]].hi >= 3
+
+
+def test_nonlinear_propagation(mgr, x):
+    # exp(x0) <= 1, x0^2 + x1 <= 1, x1 >= 0  ==>  x0 in [-1, 0], x1 in [0, 1]
+    problem = NLPProblem(
+        variables=x[:2],
+        objectives=[],
+        constraints=[
+            mgr.Le(mgr.Exp(x[0]), mgr.Real(1)),
+            mgr.Le(mgr.Sum([mgr.Pow(x[0], mgr.Real(2)), x[1]]), mgr.Real(1)),
+            mgr.Ge(x[1], mgr.Real(0)),
+        ])
+    result = FBBT().run(problem)
+    assert result.bounds[x[0]].lo == pytest.approx(-1)
+    assert result.bounds[x[0]].hi == pytest.approx(0, abs=1e-12)
+    assert result.bounds[x[1]].hi == pytest.approx(1)
+
+
+def test_objective_bounds(mgr, x):
+    problem = NLPProblem(
+        variables=x[:1],
+        objectives=[Objective(Objective.MINIMIZE, mgr.Sqrt(x[0]))],
+        constraints=[mgr.Le(x[0], mgr.Real(4)), mgr.Ge(x[0], mgr.Real(1))])
+    result = FBBT().run(problem)
+    assert result.objective_bounds[0].lo == pytest.approx(1)
+    assert result.objective_bounds[0].hi == pytest.approx(2)
+
+
+def test_infeasible(mgr, x):
+    problem = NLPProblem(
+        variables=x[:1],
+        objectives=[],
+        constraints=[mgr.Le(mgr.Sqrt(x[0]), mgr.Real(1)), mgr.Ge(x[0], mgr.Real(2))])
+    assert FBBT().run(problem).infeasible
+
+
+def test_conditional_domains(mgr, x):
+    # the domains of sqrt and log only hold where they are evaluated: x0 = -3 and x1 = -3 are feasible
+    problem = NLPProblem(
+        variables=x[:2],
+        objectives=[],
+        constraints=[
+            mgr.Ge(mgr.If(mgr.Ge(x[0], mgr.Real(0)), mgr.Sqrt(x[0]), mgr.Real(0)), mgr.Real(0)),
+            mgr.Or(mgr.Le(x[1], mgr.Real(-1)), mgr.Ge(mgr.Log(x[1]), mgr.Real(0))),
+            mgr.Ge(x[0], mgr.Real(-5)), mgr.Le(x[0], mgr.Real(5)),
+            mgr.Ge(x[1], mgr.Real(-5)), mgr.Le(x[1], mgr.Real(5)),
+        ])
+    result = FBBT().run(problem)
+    assert not result.infeasible
+    assert result.bounds[x[0]].lo == pytest.approx(-5) and result.bounds[x[1]].lo == pytest.approx(-5)
+
+
+def test_decided_branches(mgr, x):
+    # the condition holds, so the sqrt is evaluated; not(not(x1 >= -1) or not(x1 <= 4)) needs both comparisons
+    problem = NLPProblem(
+        variables=x[:2],
+        objectives=[],
+        constraints=[
+            mgr.Le(mgr.If(mgr.Ge(x[0], mgr.Real(-10)), mgr.Sqrt(x[0]), mgr.Real(5)), mgr.Real(2)),
+            mgr.Not(mgr.Or(mgr.Not(mgr.Ge(x[1], mgr.Real(-1))), mgr.Not(mgr.Le(x[1], mgr.Real(4))))),
+            mgr.Ge(x[0], mgr.Real(-5)),
+        ])
+    result = FBBT().run(problem)
+    assert result.bounds[x[0]].lo == 0 and result.bounds[x[0]].hi == pytest.approx(4)
+    assert result.bounds[x[1]].lo == pytest.approx(-1) and result.bounds[x[1]].hi == pytest.approx(4)
+
+
+def test_iteration_budget(mgr, x):
+    # x0 <= x1 / 2, x1 <= x0 / 2 converges to 0 only in the limit
+    problem = NLPProblem(
+        variables=x[:2],
+        objectives=[],
+        constraints=[
+            mgr.Le(x[0], mgr.Div(x[1], mgr.Real(2))),
+            mgr.Le(x[1], mgr.Div(x[0], mgr.Real(2))),
+            mgr.Le(x[0], mgr.Real(1)),
+            mgr.Ge(x[0], mgr.Real(-1)),
+            mgr.Ge(x[1], mgr.Real(-1)),
+        ])
+    result = FBBT(max_iter=3).run(problem)
+    assert result.iterations == 3
+    assert not result.converged
+
+
+def test_bound_constraints(mgr, x):
+    problem = NLPProblem(
+        variables=x[:2],
+        objectives=[Objective(Objective.MINIMIZE, mgr.Plus(x[0], x[1]))],
+        constraints=[
+            mgr.Ge(x[0], mgr.Real(0)),
+            mgr.Ge(x[1], mgr.Real(0)),
+            mgr.Le(mgr.Plus(x[0], x[1]), mgr.Real(1)),
+        ])
+    result = FBBT().run(problem)
+    constraints = bound_constraints(mgr, problem, result)
+    assert mgr.Ge(x[0], mgr.Real(0)) not in constraints
+    assert mgr.Le(x[0], mgr.Real(result.bounds[x[0]].hi)) in constraints
+    assert mgr.Le(problem.objectives[0].term, mgr.Real(result.objective_bounds[0].hi)) in constraints
+    assert all(math.isfinite(c.children[1].payload) for c in constraints)
+
+
+def test_no_bound_constraints_when_infeasible(mgr, x):
+    problem = NLPProblem(
+        variables=x[:1],
+        objectives=[],
+        constraints=[mgr.Le(x[0], mgr.Real(0)), mgr.Ge(x[0], mgr.Real(1))])
+    result = FBBT().run(problem)
+    assert result.infeasible
+    assert bound_constraints(mgr, problem, result) == []
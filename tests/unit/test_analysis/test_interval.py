@@ -0,0 +1,97 @@
+import math
+
+import pytest
+
+from ampl2omt.analysis.interval import Interval, IntervalEvaluator, EXTENSIONS, TRUE, FALSE, BOOLEAN
+from ampl2omt.term import types
+
+
+def approx(interval: Interval, lo: float, hi: float) -> bool:
+    return interval.lo <= lo and hi <= interval.hi and \
+        interval.lo == pytest.approx(lo) and interval.hi == pytest.approx(hi)
+
+
+def test_arithmetic():
+    a, b = Interval(1, 2), Interval(-3, 4)
+    assert approx(a + b, -2, 6)
+    assert approx(a - b, -3, 5)
+    assert approx(a * b, -6, 8)
+    assert approx(b / a, -3, 4)
+    assert (a / b) == Interval.entire()
+
+
+def test_mult_zero_times_infinity():
+    assert approx(Interval(0, 0) * Interval.entire(), 0, 0)
+
+
+def test_reciprocal_half_open():
+    assert Interval(0, 2).reciprocal().hi == math.inf
+    assert approx(Interval(0, 2).reciprocal(), 0.5, math.inf)
+
+
+@pytest.mark.parametrize("type_id, arg, expected", [
+    (types.SQRT, Interval(-1, 4), (0, 2)),
+    (types.EXP, Interval(0, 1), (1, math.e)),
+    (types.LOG, Interval(1, math.e), (0, 1)),
+    (types.LOG10, Interval(1, 100), (0, 2)),
+    (types.ABS, Interval(-3, 2), (0, 3)),
+    (types.COSH, Interval(-1, 2), (1, math.cosh(2))),
+    (types.SIN, Interval(0, math.pi), (0, 1)),
+    (types.COS, Interval(0, math.pi), (-1, 1)),
+    (types.TANH, Interval(0, 1), (0, math.tanh(1))),
+    (types.ACOS, Interval(0, 1), (0, math.pi / 2)),
+    (types.ACOSH, Interval(0, 1), (0, 0)),
+    (types.FLOOR, Interval(0.5, 2.5), (0, 2)),
+])
+def test_unary(type_id, arg, expected):
+    assert approx(EXTENSIONS[type_id](arg), *expected)
+
+
+def test_tan_across_asymptote():
+    assert EXTENSIONS[types.TAN](Interval(0, 2)) == Interval.entire()
+    assert approx(EXTENSIONS[types.TAN](Interval(0, 1)), 0, math.tan(1))
+
+
+@pytest.mark.parametrize("base, exponent, expected", [
+    (Interval(-2, 3), 2, (0, 9)),
+    (Interval(-2, 3), 3, (-8, 27)),
+    (Interval(1, 4), 0.5, (1, 2)),
+    (Interval(1, 2), -1, (0.5, 1)),
+    (Interval(0, 4), -0.5, (0.5, math.inf)),
+])
+def test_pow(base, exponent, expected):
+    assert approx(EXTENSIONS[types.POW](base, Interval.point(exponent)), *expected)
+
+
+def test_less():
+    assert approx(EXTENSIONS[types.LESS](Interval(-1, 3), Interval(1, 2)), 0, 2)
+    assert approx(EXTENSIONS[types.LESS](Interval(-1, 0), Interval(1, 2)), 0, 0)
+
+
+def test_overflow_is_unbounded():
+    assert EXTENSIONS[types.EXP](Interval(0, 1e6)).hi == math.inf
+
+
+def test_rounding_stays_in_image():
+    assert EXTENSIONS[types.EXP](Interval.entire()).lo == 0.
+    assert EXTENSIONS[types.ABS](Interval(-1, 1)).lo == 0.
+    assert EXTENSIONS[types.COSH](Interval(-1, 1)).lo == 1.
+
+
+def test_comparisons():
+    assert EXTENSIONS[types.LE](Interval(0, 1), Interval(2, 3)) == TRUE
+    assert EXTENSIONS[types.LE](Interval(4, 5), Interval(2, 3)) == FALSE
+    assert EXTENSIONS[types.LE](Interval(0, 3), Interval(2, 3)) == BOOLEAN
+
+
+def test_evaluator(mgr):
+    x, y = mgr.VarReal("x"), mgr.VarReal("y")
+    term = mgr.Plus(mgr.Mult(x, y), mgr.Sin(x))
+    evaluator = IntervalEvaluator({x: Interval(0, 1), y: Interval(2, 3)})
+    assert approx(evaluator.evaluate(term), 0, 3 + math.sin(1))
+
+
+def test_evaluator_unbounded_variable(mgr):
+    x = mgr.VarReal("x")
+    assert IntervalEvaluator().evaluate(mgr.Exp(x)).lo <= 0
+    assert IntervalEvaluator().evaluate(mgr.Exp(x)).hi == math.inf
@@ -0,0 +1,75 @@
+import pytest
+
+from ampl2omt.analysis.linear import linear_part, split_constraints, linear_model
+from ampl2omt.problem.objective import Objective
+from ampl2omt.problem.problem import NLPProblem
+
+
+def test_linear(mgr, x):
+    # 2 * (x0 - 3 * x1) - x0 / 4 + 5
+    term = mgr.Plus(mgr.Minus(mgr.Mult(mgr.Real(2), mgr.Minus(x[0], mgr.Mult(x[1], mgr.Real(3)))),
+                              mgr.Div(x[0], mgr.Real(4))), mgr.Real(5))
+    part = linear_part(term)
+    assert part.coefficients == {x[0]: 1.75, x[1]: -6.}
+    assert part.constant == 5.
+    assert part.is_linear()
+
+
+def test_nonlinear_addends(mgr, x):
+    square = mgr.Pow(x[0], mgr.Real(2))
+    sine = mgr.Sin(x[1])
+    # x0^2 - 2 * (sin(x1) - x0^2) + x2 - x2
+    term = mgr.Sum([square, mgr.Neg(mgr.Mult(mgr.Real(2), mgr.Minus(sine, square))), x[2], mgr.Neg(x[2])])
+    part = linear_part(term)
+    assert part.coefficients == {}
+    assert part.nonlinear == {square: 3., sine: -2.}
+    assert not part.is_linear()
+
+
+def test_minus(mgr, x):
+    square = mgr.Pow(x[0], mgr.Real(2))
+    part = linear_part(mgr.Plus(square, x[0])).minus(linear_part(mgr.Plus(square, mgr.Real(1))))
+    assert part.coefficients == {x[0]: 1.}
+    assert part.constant == -1.
+    assert part.nonlinear == {}
+
+
+def test_split_constraints(mgr, x):
+    body = mgr.Plus(x[0], mgr.Sin(x[1]))
+    var_bounds, rows = split_constraints([
+        mgr.Ge(body, mgr.Real(-1)),
+        mgr.Le(mgr.Minus(body, mgr.Real(1)), mgr.Real(0)),
+        mgr.Le(mgr.Mult(mgr.Real(-2), x[2]), mgr.Real(4)),
+        mgr.Lt(x[2], mgr.Real(3)),
+    ])
+    assert var_bounds == {x[2]: (-2., 3.)}
+    assert len(rows) == 1
+    assert rows[0].part.coefficients == {x[0]: 1.}
+    assert rows[0].part.nonlinear == {mgr.Sin(x[1]): 1.}
+    assert (rows[0].lower, rows[0].upper) == (-1., 1.)
+
+
+def test_linear_model(mgr, x):
+    problem = NLPProblem(
+        variables=x[:3],
+        constraints=[mgr.Le(mgr.Plus(x[0], x[1]), mgr.Real(4)), mgr.Ge(x[2], mgr.Real(1)),
+                     mgr.Eq(mgr.Pow(x[0], mgr.Real(2)), x[1]), mgr.Or(mgr.Le(x[0], x[1]), mgr.Ge(x[0], x[2]))],
+        objectives=[Objective(Objective.MAXIMIZE, mgr.Plus(mgr.Mult(mgr.Real(3), x[2]), mgr.Real(1)))],
+    )
+    with pytest.raises(ValueError):
+        linear_model(problem)
+    model = linear_model(problem, relax_nonlinear=True)
+    assert model.matrix == [{0: 1., 1: 1.}]
+    assert (model.row_lower, model.row_upper) == ([None], [4.])
+    assert (model.lower, model.upper) == ([None, None, 1.], [None, None, None])
+    assert model.objective == {2: 3.}
+    assert model.objective_constant == 1.
+    assert not model.minimize
+    assert model.relaxed == 2
+
+
+def test_linear_model_nonlinear_objective(mgr, x):
+    problem = NLPProblem(variables=x[:1], constraints=[],
+                         objectives=[Objective(Objective.MINIMIZE, mgr.Exp(x[0]))])
+    with pytest.raises(ValueError):
+        linear_model(problem, relax_nonlinear=True)
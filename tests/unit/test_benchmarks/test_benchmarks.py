@@ -0,0 +1,70 @@
+import copy
+
+import pytest
+
+from ampl2omt.parsing.nlparser import NLParser
+from ampl2omt.term.manager import TermManager
+from ampl2omt.writing.smtlibwriter import SmtlibWriter
+from benchmarks.generators import GENERATORS, QUICK_SIZES
+from benchmarks.suite import check_regressions, run
+
+
+@pytest.mark.parametrize("name", GENERATORS)
+def test_generated_instances_convert(name):
+    problem = NLParser(TermManager()).parse_string(GENERATORS[name](5))
+    assert problem.constraints or problem.objectives
+    assert "(check-sat)" in SmtlibWriter().to_smtlib(problem, daggify=True)
+
+
+def test_wide_linear_size():
+    problem = NLParser(TermManager()).parse_string(GENERATORS["wide_linear"](7))
+    assert len(problem.variables) == 7
+    # the bounds of the variables, then the rows, each with a linear term per variable
+    assert len(problem.constraints) == 2 * 7 + 10
+    assert len(problem.constraints[-1].children[0].children) == 7
+
+
+def test_run_report():
+    report = run(quick=True, repeat=1, only=["deep_nested"])
+    assert report["sizes"] == QUICK_SIZES
+    assert set(report["results"]) == {"deep_nested.parse", "deep_nested.write"}
+    assert all(m["seconds"] > 0 and m["peak_bytes"] > 0 for m in report["results"].values())
+
+
+@pytest.fixture
+def baseline():
+    return {
+        "calibration": 0.01,
+        "sizes": {"a": 1},
+        "results": {
+            "fast": {"seconds": 1e-5, "peak_bytes": 100},
+            "slow": {"seconds": 0.1, "peak_bytes": 1 << 20},
+        },
+    }
+
+
+def test_no_regressions(baseline):
+    assert check_regressions(copy.deepcopy(baseline), baseline) == []
+
+
+def test_regressions(baseline):
+    report = copy.deepcopy(baseline)
+    report["results"]["slow"] = {"seconds": 0.2, "peak_bytes": 2 << 20}
+    report["results"]["fast"] = {"seconds": 5e-5, "peak_bytes": 500}
+    assert check_regressions(report, baseline) == ["slow: time 2.00x the baseline",
+                                                   "slow: peak memory 2.00x the baseline"]
+
+
+def test_regressions_normalized(baseline):
+    # a machine twice as slow is not a regression
+    report = copy.deepcopy(baseline)
+    report["calibration"] = 0.02
+    report["results"]["slow"]["seconds"] = 0.2
+    assert check_regressions(report, baseline) == []
+
+
+def test_regressions_different_sizes(baseline):
+    report = copy.deepcopy(baseline)
+    report["sizes"] = {"a": 2}
+    with pytest.raises(ValueError):
+        check_regressions(report, baseline)
@@ -0,0 +1,25 @@
+import pytest
+
+from ampl2omt.problem.objective import Objective
+from ampl2omt.problem.problem import NLPProblem
+
+
+@pytest.fixture
+def x(mgr):
+    return [mgr.VarReal(f"x{i}") for i in range(3)]
+
+
+@pytest.fixture
+def problem(mgr, x):
+    shared = mgr.Exp(mgr.Mult(x[0], x[1]))
+    return NLPProblem(
+        variables=x,
+        objectives=[
+            Objective(Objective.MINIMIZE, mgr.Plus(shared, mgr.Pow(x[2], mgr.Real(2)))),
+            Objective(Objective.MAXIMIZE, mgr.Sin(x[0])),
+        ],
+        constraints=[
+            mgr.Le(shared, mgr.Real(2)),
+            mgr.Ge(mgr.Sum([x[0], x[1], x[2]]), mgr.Real(1)),
+            mgr.Eq(mgr.Sqrt(x[2]), mgr.Real(1)),
+        ])
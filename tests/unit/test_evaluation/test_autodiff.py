@@ -0,0 +1,117 @@
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from ampl2omt.evaluation.autodiff import ReverseAD
+from ampl2omt.evaluation.batch import BatchEvaluator
+
+
+def dense_gradient(ad, point):
+    result = ad.gradient_batch(np.asarray(point, dtype=float).reshape(1, -1))
+    return result.values[0], result.dense()[0]
+
+
+def finite_differences(ad, point, h=1e-6):
+    point = np.asarray(point, dtype=float)
+    columns = []
+    for i in range(len(point)):
+        step = np.zeros_like(point)
+        step[i] = h
+        columns.append((ad.gradient(point + step)[0] - ad.gradient(point - step)[0]) / (2 * h))
+    return np.stack(columns, axis=1)
+
+
+def test_constraints(problem):
+    values, jacobian = dense_gradient(ReverseAD.for_constraints(problem), [1., 2., 4.])
+    e2 = math.exp(2)
+    np.testing.assert_allclose(values, [e2 - 2, 6., 1.])
+    np.testing.assert_allclose(jacobian, [[2 * e2, e2, 0.], [1., 1., 1.], [0., 0., 0.25]])
+
+
+def test_objectives(problem):
+    values, jacobian = dense_gradient(ReverseAD.for_objectives(problem), [1., 2., 3.])
+    e2 = math.exp(2)
+    np.testing.assert_allclose(values, [e2 + 9, math.sin(1)])
+    np.testing.assert_allclose(jacobian, [[2 * e2, e2, 6.], [math.cos(1), 0., 0.]])
+
+
+def test_batch_matches_pointwise(problem):
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0.1, 2, size=(20, 3))
+    # chunks smaller than the number of constraints, to exercise several sweeps
+    ad = ReverseAD.for_constraints(problem, max_outputs_per_sweep=2)
+    result = ad.gradient_batch(points)
+    assert result.values.shape == (20, 3)
+    assert result.dense().shape == (20, 3, 3)
+    for p, values, jacobian in zip(points, result.values, result.dense()):
+        expected_values, expected_jacobian = dense_gradient(ReverseAD.for_constraints(problem), p)
+        np.testing.assert_allclose(values, expected_values)
+        np.testing.assert_allclose(jacobian, expected_jacobian)
+
+
+@pytest.mark.parametrize("build", [
+    lambda m, a, b: m.Mult(m.Sin(a), m.Cos(b)),
+    lambda m, a, b: m.Div(m.Tan(a), m.Plus(m.Exp(b), m.Real(1))),
+    lambda m, a, b: m.Minus(m.Log(a), m.Log10(b)),
+    lambda m, a, b: m.Pow(a, b),
+    lambda m, a, b: m.Pow(a, m.Real(3)),
+    lambda m, a, b: m.Sqrt(m.Mult(a, b)),
+    lambda m, a, b: m.Plus(m.Sinh(a), m.Cosh(b)),
+    lambda m, a, b: m.Mult(m.Tanh(a), m.Atan(b)),
+    lambda m, a, b: m.Plus(m.Asin(m.Div(a, m.Real(4))), m.Acos(m.Div(b, m.Real(4)))),
+    lambda m, a, b: m.Plus(m.Asinh(a), m.Acosh(m.Plus(b, m.Real(1)))),
+    lambda m, a, b: m.Atanh(m.Div(a, b)),
+    lambda m, a, b: m.Atan2(a, b),
+    lambda m, a, b: m.Rem(m.Mult(a, m.Real(5)), b),
+    lambda m, a, b: m.Neg(m.Abs(m.Minus(a, b))),
+    lambda m, a, b: m.Sum([a, b, m.Mult(a, b)]),
+    lambda m, a, b: m.Max([a, b, m.Real(0)]),
+    lambda m, a, b: m.Min([a, m.Mult(a, b)]),
+    lambda m, a, b: m.If(m.Lt(a, b), m.Mult(a, a), m.Exp(b)),
+    lambda m, a, b: m.Plus(m.Floor(a), m.Round(b, m.Real(1))),
+])
+def test_finite_differences(mgr, x, build):
+    ad = ReverseAD(x[:2], [build(mgr, x[0], x[1])])
+    point = [1.3, 1.7]
+    np.testing.assert_allclose(dense_gradient(ad, point)[1], finite_differences(ad, point), rtol=1e-5, atol=1e-8)
+
+
+def test_undefined(mgr, x):
+    ad = ReverseAD(x[:1], [mgr.Sqrt(x[0])])
+    values, jacobian = dense_gradient(ad, [0.])
+    assert values[0] == 0.
+    assert math.isinf(jacobian[0, 0]) or math.isnan(jacobian[0, 0])
+
+
+def test_boolean_structure(mgr, x):
+    # no derivative flows through logical operators
+    ad = ReverseAD(x[:2], [mgr.Or(mgr.Le(x[0], mgr.Real(0)), mgr.Ge(x[1], mgr.Real(0)))])
+    values, jacobian = dense_gradient(ad, [1., 1.])
+    assert values[0] == 1.
+    np.testing.assert_allclose(jacobian, [[0., 0.]])
+
+
+def test_values_match_batch_evaluator(problem):
+    points = np.array([[0.5, 0.5, 1.5]])
+    violations = BatchEvaluator(problem).evaluate(points).violations
+    values = ReverseAD.for_constraints(problem).gradient_batch(points).values
+    # Le and Ge are satisfied, Eq is violated by |sqrt(1.5) - 1|
+    np.testing.assert_allclose(violations[0], [0., 0., abs(values[0, 2])])
+
+
+def test_unknown_variable(mgr, x):
+    with pytest.raises(ValueError):
+        ReverseAD(x[:1], [mgr.Plus(x[0], x[1])])
+
+
+def test_sparse_jacobian(problem):
+    ad = ReverseAD.for_constraints(problem, max_outputs_per_sweep=1)
+    pattern = problem.occurrences().constraint_vars
+    assert (list(ad.pattern.indptr), list(ad.pattern.indices)) == (list(pattern.indptr), list(pattern.indices))
+    result = ad.gradient_batch([[1., 2., 4.]])
+    assert result.data.shape == (1, pattern.nnz)
+    for k in range(len(problem.constraints)):
+        columns, partials = result.row(k)
+        np.testing.assert_allclose(partials[0], result.dense()[0, k, list(columns)])
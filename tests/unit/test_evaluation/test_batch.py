@@ -0,0 +1,71 @@
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from ampl2omt.evaluation.batch import BatchEvaluator
+from ampl2omt.problem.objective import Objective
+from ampl2omt.problem.problem import NLPProblem
+from ampl2omt.term import types
+
+
+def test_evaluate(problem):
+    points = np.array([[0., 0., 1.], [1., 1., 4.], [0., 0., -1.]])
+    result = BatchEvaluator(problem).evaluate(points)
+    assert result.violations.shape == (3, 3)
+    assert result.objectives.shape == (3, 2)
+    np.testing.assert_allclose(result.violations[0], [0., 0., 0.])
+    np.testing.assert_allclose(result.violations[1], [math.e - 2, 0., 1.])
+    # sqrt(-1) is undefined
+    assert result.violations[2, 2] == np.inf
+    np.testing.assert_allclose(result.objectives[:, 0], [2., math.e + 16, 2.])
+    np.testing.assert_allclose(result.objectives[:, 1], [0., math.sin(1), 0.])
+    assert list(result.feasible()) == [True, False, False]
+
+
+def test_evaluate_matches_pointwise(problem):
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-2, 2, size=(100, 3))
+    result = BatchEvaluator(problem).evaluate(points)
+    for p, objective in zip(points, result.objectives[:, 1]):
+        assert objective == pytest.approx(math.sin(p[0]))
+
+
+def test_boolean_constraint(mgr, x):
+    problem = NLPProblem(
+        variables=x[:2],
+        objectives=[],
+        constraints=[mgr.Or(mgr.Le(x[0], mgr.Real(0)), mgr.Ge(x[1], mgr.Real(0)))])
+    result = BatchEvaluator(problem).evaluate([[1., -1.], [1., 1.]])
+    assert list(result.violations[:, 0]) == [1., 0.]
+
+
+@pytest.mark.parametrize("build, expected", [
+    (lambda m, a: m.If(m.Gt(a, m.Real(0)), a, m.Neg(a)), 2.5),
+    (lambda m, a: m.Round(a, m.Real(0)), -2.),
+    (lambda m, a: m.Trunc(a, m.Real(0)), -2.),
+    (lambda m, a: m.IntDiv(m.Real(7), a), -2.),
+    (lambda m, a: m.Rem(m.Real(7), a), 2.),
+    (lambda m, a: m.Precision(m.Real(123.456), m.Real(2)), 120.),
+    (lambda m, a: m.Min([a, m.Real(0), m.Real(1)]), -2.5),
+    (lambda m, a: m.Max([a, m.Real(0), m.Real(1)]), 1.),
+    (lambda m, a: m.Count([m.Lt(a, m.Real(0)), m.Gt(a, m.Real(0))]), 1.),
+    (lambda m, a: m.NumberOf([m.Real(1), m.Real(1), a, m.Real(1)]), 2.),
+])
+def test_operators(mgr, x, build, expected):
+    problem = NLPProblem(variables=x[:1], objectives=[Objective(Objective.MINIMIZE, build(mgr, x[0]))],
+                         constraints=[])
+    assert BatchEvaluator(problem).evaluate([[-2.5]]).objectives[0, 0] == pytest.approx(expected)
+
+
+def test_wrong_shape(problem):
+    with pytest.raises(ValueError):
+        BatchEvaluator(problem).evaluate(np.zeros((2, 4)))
+
+
+def test_unsupported_operator(mgr, x):
+    term = mgr.create(mgr.term_type(types.NUMBEROFS), (x[0],))
+    problem = NLPProblem(variables=x[:1], objectives=[Objective(Objective.MINIMIZE, term)], constraints=[])
+    with pytest.raises(ValueError):
+        BatchEvaluator(problem)
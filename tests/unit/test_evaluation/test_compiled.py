@@ -0,0 +1,65 @@
+import math
+
+import pytest
+
+from ampl2omt.evaluation.compiled import compile_terms, MAX_INLINE_DEPTH
+from ampl2omt.problem.objective import Objective
+from ampl2omt.problem.problem import NLPProblem
+
+
+def test_compile_objectives(problem):
+    f = problem.compile_objectives()
+    assert f([0., 0., 1.]) == pytest.approx((2., 0.))
+    assert f([1., 1., 4.]) == pytest.approx((math.e + 16, math.sin(1)))
+
+
+def test_compile_constraints(problem):
+    g = problem.compile_constraints()
+    assert g([0., 0., 1.]) == pytest.approx((0., 0., 0.))
+    assert g([1., 1., 4.]) == pytest.approx((math.e - 2, 0., 1.))
+    # sqrt(-1) is undefined
+    assert g([0., 0., -1.])[2] == math.inf
+
+
+def test_shared_subterms_are_locals(problem):
+    source = problem.compile_objectives().source
+    assert source.count("_f44(") == 1
+
+
+def test_cached_per_problem(mgr, problem, x):
+    f = problem.compile_objectives()
+    assert problem.compile_objectives() is f
+    problem.add_objectives([Objective(Objective.MINIMIZE, x[1])])
+    assert problem.compile_objectives() is not f
+    assert len(problem.compile_objectives()([1., 2., 3.])) == 3
+
+
+def test_batch_matches_single_point(problem):
+    np = pytest.importorskip("numpy")
+    from ampl2omt.evaluation.batch import BatchEvaluator
+    points = np.random.default_rng(0).uniform(-2, 2, size=(50, 3))
+    expected = BatchEvaluator(problem).evaluate(points)
+    np.testing.assert_allclose(problem.compile_objectives(batch=True)(points), expected.objectives)
+    np.testing.assert_allclose(problem.compile_constraints(batch=True)(points), expected.violations)
+    single = problem.compile_constraints()
+    np.testing.assert_allclose([single(p) for p in points], expected.violations)
+
+
+def test_short_circuit_if(mgr, x):
+    term = mgr.If(mgr.Gt(x[0], mgr.Real(0)), mgr.Log(x[0]), mgr.Real(0))
+    f = compile_terms(x[:1], [term])
+    assert f([-1.]) == (0.,)
+    assert f([math.e]) == pytest.approx((1.,))
+
+
+def test_deep_expressions(mgr, x):
+    term = x[0]
+    for _ in range(10 * MAX_INLINE_DEPTH):
+        term = mgr.Plus(term, mgr.Real(1))
+    assert compile_terms(x[:1], [term])([0.]) == (10. * MAX_INLINE_DEPTH,)
+
+
+def test_unknown_variable(mgr, x):
+    problem = NLPProblem(variables=x[:1], objectives=[Objective(Objective.MINIMIZE, x[1])], constraints=[])
+    with pytest.raises(ValueError):
+        problem.compile_objectives()
@@ -1,6 +1,10 @@
+import sys
+import threading
+
 import pytest
 
 from ampl2omt.term import types
+from ampl2omt.term.manager import TermManager
 
 
 @pytest.fixture
@@ -111,3 +115,85 @@ def test_cached_nary_operators(mgr, one, two):
     node1 = mgr.Min([one, two])
     node2 = mgr.Min([one, two])
     assert node1 is node2
+
+
+def test_cached_across_threads():
+    # switch threads as often as possible, to interleave the lookups and insertions of the cache
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    mgr = TermManager()
+    n_threads = 8
+    barrier = threading.Barrier(n_threads)
+    results = [[] for _ in range(n_threads)]
+
+    def create(t):
+        barrier.wait()
+        for i in range(500):
+            x = mgr.VarReal(f"x{i % 50}")
+            results[t].append(mgr.Plus(x, mgr.Real(i)))
+
+    threads = [threading.Thread(target=create, args=(t,)) for t in range(n_threads)]
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert all(all(a is b for a, b in zip(results[0], r)) for r in results[1:])
+
+
+def test_import_terms(mgr, one, two):
+    other = TermManager()
+    x = other.VarReal("x")
+    shared = other.Exp(x)
+    root = other.Plus(other.Mult(shared, other.Real(2)), shared)
+    remap = mgr.import_terms(other, [root, x])
+    assert remap[root] is mgr.Plus(mgr.Mult(mgr.Exp(mgr.VarReal("x")), two), mgr.Exp(mgr.VarReal("x")))
+    assert remap[root].children[0].children[0] is remap[root].children[1] is remap[shared]
+    assert remap[root].term_type is mgr.term_type(types.PLUS)
+    assert len(remap) == 5
+    assert mgr.import_terms(mgr, [one]) == {one: one}
+
+
+def test_import_deep_terms():
+    other = TermManager()
+    term = other.VarReal("x")
+    for i in range(20000):
+        term = other.Plus(term, other.Real(i % 10))
+    mgr = TermManager()
+    imported = mgr.import_terms(other, [term])[term]
+    for _ in range(20000):
+        assert imported.term_type.name == "+" and imported.children[1].term_type is mgr.term_type(types.REAL)
+        imported = imported.children[0]
+    assert imported is mgr.VarReal("x")
+
+
+def test_canonical_commutative():
+    mgr = TermManager(canonical=True)
+    x, y, z = mgr.VarReal("x"), mgr.VarReal("y"), mgr.VarReal("z")
+    assert mgr.Plus(x, y) is mgr.Plus(y, x)
+    assert mgr.Mult(z, x) is mgr.Mult(x, z)
+    assert mgr.Eq(mgr.Real(1), x) is mgr.Eq(x, mgr.Real(1))
+    assert mgr.Max([z, y, x]) is mgr.Max([x, y, z])
+    assert mgr.Minus(x, y) is not mgr.Minus(y, x)
+    assert mgr.Le(x, y) is not mgr.Le(y, x)
+    # children are sorted by creation order
+    assert mgr.Sum([z, x, y]).children == (x, y, z)
+
+
+def test_canonical_associative():
+    mgr = TermManager(canonical=True)
+    a, b, c = mgr.VarReal("a"), mgr.VarReal("b"), mgr.VarReal("c")
+    assert mgr.Sum([a, mgr.Sum([c, b])]) is mgr.Sum([c, a, b])
+    assert mgr.Sum([a, mgr.Sum([c, b])]).children == (a, b, c)
+    assert mgr.AndN([mgr.AndN([mgr.VarBool("p"), mgr.VarBool("q")]), mgr.VarBool("r")]).children == tuple(
+        mgr.VarBool(name) for name in "pqr")
+    # only the children with the same operator are flattened
+    assert mgr.Sum([a, mgr.Min([b, c])]).children == (a, mgr.Min([b, c]))
+
+
+def test_not_canonical_by_default(mgr):
+    x, y = mgr.VarReal("x"), mgr.VarReal("y")
+    assert mgr.Plus(x, y) is not mgr.Plus(y, x)
+    assert mgr.Sum([y, x]).children == (y, x)
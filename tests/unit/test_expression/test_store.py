@@ -0,0 +1,102 @@
+import gc
+import os
+
+import pytest
+
+from ampl2omt.term.store import MappedTermManager, MappedTerm
+from ampl2omt.term.term import topo_sort
+from ampl2omt.term.walker import DagWalker
+
+
+@pytest.fixture
+def store_mgr(tmp_path):
+    with MappedTermManager(str(tmp_path), capacity=4) as mgr:
+        yield mgr
+
+
+def test_interning(store_mgr):
+    x, y = store_mgr.VarReal("x"), store_mgr.VarReal("y")
+    term = store_mgr.Plus(x, store_mgr.Mult(x, store_mgr.Real(2.5)))
+    assert isinstance(term, MappedTerm)
+    assert store_mgr.Plus(x, store_mgr.Mult(x, store_mgr.Real(2.5))) is term
+    assert store_mgr.VarReal("x") is x and x is not y
+    assert store_mgr.Int(3) is not store_mgr.Real(3.) and store_mgr.Bool(True) is not store_mgr.Int(1)
+    assert len(store_mgr) == 9
+
+
+def test_node_fields(store_mgr):
+    x = store_mgr.VarReal("x")
+    term = store_mgr.Sum([x, store_mgr.Real(-1e-20), store_mgr.Int(-7), store_mgr.Bool(False)])
+    assert term.term_type == store_mgr.term_type(term.term_type.id)
+    assert [c.payload for c in term.children] == ["x", -1e-20, -7, False]
+    assert term.children[0] is x
+    assert term.payload is None and store_mgr.VarReal(None).payload is None
+    with pytest.raises(ValueError):
+        store_mgr.Int(2 ** 70)
+
+
+def test_growth_and_rehash(store_mgr):
+    # the initial capacity is 4 nodes: the arrays and the index grow many times
+    variables = [store_mgr.VarReal(f"x{i}") for i in range(500)]
+    terms = [store_mgr.Mult(v, store_mgr.Real(i)) for i, v in enumerate(variables)]
+    assert len(store_mgr) == 1500
+    assert [store_mgr.Mult(store_mgr.VarReal(f"x{i}"), store_mgr.Real(i)) for i in range(500)] == terms
+    assert len(store_mgr) == 1500
+    assert terms[123].children[0].payload == "x123"
+
+
+def test_handles_unique_while_in_use(store_mgr):
+    term = store_mgr.Exp(store_mgr.VarReal("x"))
+    index = term.index
+    child = term.children[0]
+    assert store_mgr.store.term(index) is term
+    del term
+    gc.collect()
+    # the handle was released, and is created again from the store
+    term = store_mgr.store.term(index)
+    assert term.children[0].payload == child.payload and hash(term) == index
+
+
+def test_rejects_foreign_children(store_mgr, mgr):
+    with pytest.raises(ValueError):
+        store_mgr.Neg(mgr.VarReal("x"))
+    imported = store_mgr.import_terms(mgr, [mgr.Neg(mgr.VarReal("x"))])
+    assert imported[mgr.Neg(mgr.VarReal("x"))] is store_mgr.Neg(store_mgr.VarReal("x"))
+
+
+def test_canonical(tmp_path):
+    with MappedTermManager(str(tmp_path), canonical=True) as mgr:
+        a, b, c = mgr.VarReal("a"), mgr.VarReal("b"), mgr.VarReal("c")
+        assert mgr.Plus(a, b) is mgr.Plus(b, a)
+        assert mgr.Sum([a, mgr.Sum([b, c])]) is mgr.Sum([c, b, a])
+
+
+def test_walkers(store_mgr):
+    x = store_mgr.VarReal("x")
+    shared = store_mgr.Exp(x)
+    term = store_mgr.Plus(shared, store_mgr.Mult(shared, x))
+    names = DagWalker(lambda node, children: node.term_type.name).walk([term])
+    assert names == ["+"]
+    assert [n.index for n in topo_sort(term)] == [x.index, shared.index, term.children[1].index, term.index]
+    with store_mgr.store.node_array() as visited:
+        assert list(store_mgr.store.post_order([term.index], visited)) == [n.index for n in topo_sort(term)]
+        # the nodes visited in an epoch are skipped
+        assert list(store_mgr.store.post_order([shared.index], visited)) == []
+        assert list(store_mgr.store.post_order([shared.index], visited, 2)) == [x.index, shared.index]
+
+
+def test_files_removed_on_close(tmp_path):
+    mgr = MappedTermManager(str(tmp_path))
+    mgr.VarReal("x")
+    directory = mgr.store.directory
+    assert os.path.dirname(directory) == str(tmp_path)
+    assert "ops.bin" in os.listdir(directory)
+    mgr.close()
+    assert mgr.store.closed and not os.path.exists(directory)
+
+
+def test_capacity_power_of_two(tmp_path):
+    with pytest.raises(ValueError):
+        MappedTermManager(str(tmp_path), capacity=3)
+    assert os.listdir(tmp_path) == []
+
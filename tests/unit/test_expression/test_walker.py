@@ -0,0 +1,66 @@
+from ampl2omt.term.term import is_var, topo_sort, topo_sort_all
+from ampl2omt.term.walker import DagWalker
+
+
+def test_post_order(mgr):
+    x, y = mgr.VarReal("x"), mgr.VarReal("y")
+    visited = []
+    walker = DagWalker(lambda node, children: visited.append(node) or len(visited))
+    term = mgr.Plus(x, mgr.Mult(x, y))
+    assert walker.walk([term]) == [4]
+    assert visited == [x, y, mgr.Mult(x, y), term]
+
+
+def test_shared_nodes_handled_once(mgr):
+    x = mgr.VarReal("x")
+    shared = mgr.Exp(x)
+    calls = []
+
+    def leave(node, children):
+        calls.append(node)
+        return 1 if children is None or not children else sum(children)
+
+    walker = DagWalker(leave)
+    first, second = mgr.Plus(shared, shared), mgr.Mult(shared, x)
+    # the values count the paths to the leaves, the calls the nodes
+    assert walker.walk([first, second]) == [2, 2]
+    assert len(calls) == 4
+    # a later walk reuses the memo
+    assert walker.value(mgr.Neg(first)) == 2
+    assert len(calls) == 5
+
+
+def test_cut_off(mgr):
+    x, y = mgr.VarReal("x"), mgr.VarReal("y")
+    inner = mgr.Mult(x, y)
+    walker = DagWalker(lambda node, children: "cut" if children is None else node.term_type.name,
+                       enter=lambda node: node is not inner)
+    term = mgr.Plus(inner, x)
+    assert walker.value(term) == "+"
+    assert walker.value(inner) == "cut"
+    # the children of the cut-off node are not walked
+    assert y not in walker and x in walker
+
+
+def test_deep_term(mgr):
+    term = mgr.VarReal("x")
+    for i in range(20000):
+        term = mgr.Plus(term, mgr.Real(1))
+    walker = DagWalker(lambda node, children: 1 + max(children, default=0))
+    assert walker.value(term) == 20001
+
+
+def test_leaves(mgr):
+    term = mgr.Plus(mgr.VarReal("x"), mgr.Mult(mgr.VarReal("y"), mgr.Real(2)))
+    walker = DagWalker(lambda node, children: [node.payload] if is_var(node) else sum(children, []))
+    assert walker.value(term) == ["x", "y"]
+
+
+def test_topo_sort_shared_nodes_once(mgr):
+    x, y = mgr.VarReal("x"), mgr.VarReal("y")
+    shared = mgr.Mult(x, y)
+    term = mgr.Le(mgr.Plus(shared, x), mgr.Neg(shared))
+    order = list(topo_sort(term))
+    assert order == [x, y, shared, mgr.Plus(shared, x), mgr.Neg(shared), term]
+    assert list(topo_sort_all([term, shared], skip=lambda node: node is shared)) == [
+        x, mgr.Plus(shared, x), mgr.Neg(shared), term]
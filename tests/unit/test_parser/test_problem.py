@@ -34,6 +34,8 @@ def test_parse_hs001(mgr, parser):
     assert problem.constraints == [
         mgr.Ge(x1, mgr.Real(-1.5))
     ]
+    assert problem.primal_initial_guess == {0: -2., 1: 1.}
+    assert problem.dual_initial_guess == {}
 
 
 def test_parse_hs073(mgr, parser):
@@ -60,6 +62,22 @@ def test_parse_hs073(mgr, parser):
         mgr.VarReal("x2"),
         mgr.VarReal("x3"),
     ]
+    x = problem.variables
+    assert problem.objectives == [
+        Objective(Objective.MINIMIZE, mgr.Sum([mgr.Mult(x[0], mgr.Real(24.55)), mgr.Mult(x[1], mgr.Real(26.75)),
+                                               mgr.Mult(x[2], mgr.Real(39)), mgr.Mult(x[3], mgr.Real(40.5))]))
+    ]
+    # the linear parts come from the J segments
+    assert problem.constraints[4:] == [
+        mgr.Ge(mgr.Sum([mgr.Mult(x[0], mgr.Real(12)), mgr.Mult(x[1], mgr.Real(11.9)),
+                        mgr.Mult(x[2], mgr.Real(41.8)), mgr.Mult(x[3], mgr.Real(52.1)),
+                        problem.cons_bodies[0].children[-1]]), mgr.Real(21)),
+        mgr.Ge(mgr.Sum([mgr.Mult(x[0], mgr.Real(2.3)), mgr.Mult(x[1], mgr.Real(5.6)),
+                        mgr.Mult(x[2], mgr.Real(11.1)), mgr.Mult(x[3], mgr.Real(1.3))]), mgr.Real(5)),
+        mgr.Eq(mgr.Sum([mgr.Mult(x[i], mgr.Real(1)) for i in range(4)]), mgr.Real(1)),
+    ]
+    assert problem.cons_bodies[0].children[-1].term_type.name == "*"
+    assert problem.initial_point() == [1., 1., 1., 1.]
 
 
 def test_parse_hs085(mgr, parser):
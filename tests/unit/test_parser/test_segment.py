@@ -126,6 +126,33 @@ def test_parse_var_bounds_segment(mocker, mgr, builder, parser, x):
     assert segment.peek() == ""
 
 
+def test_parse_primal_initial_guess_segment(builder, parser):
+    segment = LineStream(io.StringIO("""x2 # initial guess
+    0 1.5
+    3 -2"""))
+    builder.n_vars = 4
+    parser.parse_segment(segment, builder)
+    assert builder.primal_initial_guess == {0: 1.5, 3: -2.}
+    assert segment.peek() == ""
+
+
+def test_parse_dual_initial_guess_segment(builder, parser):
+    segment = LineStream(io.StringIO("""d1 # initial dual guess
+    1 0.25"""))
+    builder.n_cons = 2
+    parser.parse_segment(segment, builder)
+    assert builder.dual_initial_guess == {1: 0.25}
+    assert segment.peek() == ""
+
+
+def test_parse_invalid_initial_guess_segment(builder, parser):
+    segment = LineStream(io.StringIO("""x1
+    0"""))
+    builder.n_vars = 1
+    with pytest.raises(ValueError):
+        parser.parse_segment(segment, builder)
+
+
 def test_parse_jacobian_column_counts_segment(builder, parser):
     segment = LineStream(io.StringIO("""k8 #intermediate Jacobian column lengths
     2
@@ -147,7 +174,9 @@ def test_parse_jacobian_sparsity_segment(builder, parser):
     3 10
     4 11
     5 0"""))
+    builder.n_cons = 1
     parser.parse_segment(segment, builder)
+    assert builder.cons_linear == {0: [(0, 0.), (3, 10.), (4, 11.), (5, 0.)]}
     assert segment.peek() == ""
 
 
@@ -157,5 +186,15 @@ def test_parse_gradient_sparsity_segment(builder, parser):
     3 10
     4 11
     5 0"""))
+    builder.n_obj = 1
     parser.parse_segment(segment, builder)
+    assert builder.obj_linear == {0: [(0, 0.), (3, 10.), (4, 11.), (5, 0.)]}
     assert segment.peek() == ""
+
+
+def test_parse_invalid_sparsity_segment(builder, parser):
+    segment = LineStream(io.StringIO("""J0 1
+    3"""))
+    builder.n_cons = 1
+    with pytest.raises(ValueError):
+        parser.parse_segment(segment, builder)
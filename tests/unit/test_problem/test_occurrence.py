@@ -0,0 +1,92 @@
+import pytest
+
+from ampl2omt.problem.objective import Objective
+from ampl2omt.problem.occurrence import SparsityPattern
+from ampl2omt.problem.problem import NLPProblem
+
+
+@pytest.fixture
+def x(mgr):
+    return [mgr.VarReal(f"x{i}") for i in range(5)]
+
+
+@pytest.fixture
+def problem(mgr, x):
+    shared = mgr.Exp(mgr.Plus(x[0], x[1]))
+    return NLPProblem(
+        variables=x,
+        objectives=[Objective(Objective.MINIMIZE, mgr.Mult(shared, x[3]))],
+        constraints=[
+            mgr.Le(shared, mgr.Real(1)),
+            mgr.Ge(mgr.Sum([x[2], mgr.Sin(x[1]), mgr.Real(2)]), mgr.Real(0)),
+            mgr.Ge(x[0], mgr.Real(0)),
+        ])
+
+
+def test_sparsity_pattern_transpose():
+    pattern = SparsityPattern.from_rows(3, [[2, 0], [], [1, 2]])
+    assert list(pattern.row(0)) == [0, 2]
+    assert list(pattern.row(1)) == []
+    transposed = pattern.transpose()
+    assert [list(transposed.row(j)) for j in range(3)] == [[0], [2], [0, 2]]
+    assert transposed.transpose() == pattern
+
+
+def test_rows_and_columns(problem):
+    index = problem.occurrences()
+    assert [list(index.variables_of_constraint(j)) for j in range(3)] == [[0, 1], [1, 2], [0]]
+    assert [list(index.constraints_of_variable(i)) for i in range(5)] == [[0, 2], [0, 1], [1], [], []]
+    assert list(index.variables_of_objective(0)) == [0, 1, 3]
+    assert list(index.objectives_of_variable(3)) == [0]
+    assert index.unused_variables() == [4]
+
+
+def test_index_is_cached(problem):
+    assert problem.occurrences() is problem.occurrences()
+
+
+def test_index_invalidated_on_mutation(mgr, problem, x):
+    index = problem.occurrences()
+    problem.add_constraints([mgr.Le(x[4], mgr.Real(1))])
+    assert problem.occurrences() is not index
+    assert list(problem.occurrences().constraints_of_variable(4)) == [3]
+    problem.add_variables([mgr.VarReal("z")])
+    assert problem.occurrences().constraint_vars.n_cols == 6
+    problem.add_objectives([Objective(Objective.MINIMIZE, x[0])])
+    assert list(problem.occurrences().objectives_of_variable(0)) == [0, 1]
+
+
+def test_unknown_variable(mgr, x):
+    problem = NLPProblem(variables=x[:1], objectives=[], constraints=[mgr.Le(x[1], mgr.Real(0))])
+    with pytest.raises(ValueError):
+        problem.occurrences()
+
+
+def test_deep_chain(mgr, x):
+    # every node of the chain occurs under the root: the index must not keep a set per node
+    term = x[0]
+    for i in range(20000):
+        term = mgr.Plus(term, x[i % 5])
+    problem = NLPProblem(variables=x, objectives=[], constraints=[mgr.Le(term, mgr.Real(0)), term])
+    index = problem.occurrences()
+    assert [list(index.variables_of_constraint(j)) for j in range(2)] == [[0, 1, 2, 3, 4]] * 2
+
+
+def test_shared_subterms(mgr, x):
+    # inner is shared by all the constraints, outer by three of them, after being walked by the first one
+    inner = mgr.Plus(x[0], x[1])
+    outer = mgr.Mult(inner, x[2])
+    constraints = [mgr.Le(outer, mgr.Real(0)), mgr.Ge(inner, x[3]), mgr.Le(mgr.Plus(outer, inner), x[4]),
+                   mgr.Eq(outer, x[0])]
+    index = NLPProblem(variables=x, objectives=[], constraints=constraints).occurrences()
+    assert [list(index.variables_of_constraint(j)) for j in range(4)] == [[0, 1, 2], [0, 1, 3], [0, 1, 2, 4], [0, 1, 2]]
+
+
+def test_explicit_invalidation(mgr, problem, x):
+    index = problem.occurrences()
+    problem.objectives[0].term = x[4]
+    problem.invalidate()
+    assert list(problem.occurrences().variables_of_objective(0)) == [4]
+    problem.constraints = []
+    problem.invalidate()
+    assert problem.occurrences().constraint_vars.n_rows == 0
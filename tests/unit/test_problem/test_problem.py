@@ -0,0 +1,24 @@
+from ampl2omt.problem.objective import Objective
+from ampl2omt.problem.problem import NLPProblem, import_problem
+from ampl2omt.term.manager import TermManager
+
+
+def test_import_problem(mgr):
+    other = TermManager()
+    x = [other.VarReal(f"x{i}") for i in range(2)]
+    body = other.Plus(x[0], other.Sin(x[1]))
+    problem = NLPProblem(
+        variables=x,
+        objectives=[Objective(Objective.MAXIMIZE, other.Mult(x[0], x[1]))],
+        constraints=[other.Le(body, other.Real(1))],
+        primal_initial_guess={0: 1.},
+        cons_bodies={0: body},
+    )
+    imported = import_problem(mgr, other, problem)
+    y = [mgr.VarReal("x0"), mgr.VarReal("x1")]
+    assert imported.variables[0] is y[0] and imported.variables[1] is y[1]
+    assert imported.objectives == [Objective(Objective.MAXIMIZE, mgr.Mult(y[0], y[1]))]
+    assert imported.objectives[0].term is mgr.Mult(y[0], y[1])
+    assert imported.constraints[0] is mgr.Le(mgr.Plus(y[0], mgr.Sin(y[1])), mgr.Real(1))
+    assert imported.cons_bodies[0] is imported.constraints[0].children[0]
+    assert imported.primal_initial_guess == {0: 1.}
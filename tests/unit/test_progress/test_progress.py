@@ -0,0 +1,98 @@
+import os
+import time
+from concurrent.futures import CancelledError
+
+import pytest
+
+from ampl2omt.conversion import ConversionOptions, convert
+from ampl2omt.parsing.nlparser import NLParser
+from ampl2omt.progress import CancelToken, Progress, PARSE, WRITE
+from ampl2omt.term.manager import TermManager
+from ampl2omt.writing.smtlibwriter import SmtlibWriter
+from benchmarks.generators import huge_sum
+
+HS073 = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_parser", "hs073.nl")
+
+
+@pytest.fixture(scope="module")
+def text():
+    # more lines and nodes than CHECK_INTERVAL, so that progress is reported during the parse and the write
+    return huge_sum(4000)
+
+
+def test_parse_progress(text):
+    reports = []
+    mgr = TermManager()
+    problem = NLParser(mgr).parse_string(text, progress=reports.append)
+    assert len(reports) >= 3
+    assert all(r.phase == PARSE and r.total_bytes == len(text) for r in reports)
+    assert [r.bytes for r in reports] == sorted(r.bytes for r in reports)
+    assert 0 < reports[0].fraction < 1
+    last = reports[-1]
+    assert last.bytes == len(text) and last.fraction == 1.
+    assert last.nodes == len(mgr)
+    assert last.segments > 0
+    assert len(problem.objectives) == 1
+
+
+def test_parse_deadline(text):
+    with pytest.raises(TimeoutError):
+        NLParser(TermManager()).parse_string(text, token=CancelToken(time.monotonic() - 1.))
+
+
+def test_parse_cancelled_from_callback(text):
+    token = CancelToken()
+    reports = []
+
+    def progress(report: Progress):
+        reports.append(report)
+        token.cancel()
+
+    with pytest.raises(CancelledError):
+        NLParser(TermManager()).parse_string(text, progress=progress, token=token)
+    # stopped at the first check after the first report, before the end of the file
+    assert len(reports) == 1 and reports[0].bytes < len(text)
+
+
+def test_write_progress(text):
+    problem = NLParser(TermManager()).parse_string(text)
+    writer = SmtlibWriter()
+    reports = []
+    for daggify in (False, True):
+        reports.clear()
+        script = writer.to_smtlib(problem, daggify=daggify, progress=reports.append, token=CancelToken())
+        assert script == writer.to_smtlib(problem, daggify=daggify)
+        assert len(reports) >= 2
+        last = reports[-1]
+        assert last.phase == WRITE
+        assert last.segments == last.total_segments == len(problem.constraints) + len(problem.objectives)
+        assert last.fraction == 1.
+        assert last.nodes >= 4000 * 3
+
+
+def test_write_cancelled(text):
+    problem = NLParser(TermManager()).parse_string(text)
+    token = CancelToken()
+    token.cancel()
+    with pytest.raises(CancelledError):
+        SmtlibWriter().to_smtlib(problem, token=token)
+    with pytest.raises(CancelledError):
+        SmtlibWriter().to_smtlib_per_objective(problem, token=token)
+
+
+def test_convert_deadline(tmp_path):
+    token = CancelToken.after(60.)
+    reports = []
+    convert(HS073, str(tmp_path / "out.smt2"), ConversionOptions(), progress=reports.append, token=token)
+    assert [r.phase for r in reports] == [PARSE, WRITE]
+    assert reports[0].total_bytes == os.path.getsize(HS073)
+    with pytest.raises(TimeoutError):
+        convert(HS073, str(tmp_path / "out.smt2"), ConversionOptions(), token=CancelToken(time.monotonic() - 1.))
+
+
+def test_eta():
+    progress = Progress(PARSE, bytes=250, total_bytes=1000, segments=3, total_segments=None, nodes=10, elapsed=2.)
+    assert progress.fraction == 0.25
+    assert progress.eta == pytest.approx(6.)
+    unknown = Progress(PARSE, bytes=250, total_bytes=None, segments=3, total_segments=None, nodes=10, elapsed=2.)
+    assert unknown.fraction is None and unknown.eta is None
@@ -0,0 +1,16 @@
+import os
+
+import pytest
+
+BASE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_parser")
+
+
+@pytest.fixture
+def hs073_path():
+    return os.path.join(BASE_DIR, "hs073.nl")
+
+
+@pytest.fixture
+def hs073(hs073_path):
+    with open(hs073_path) as f:
+        return f.read()
@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+from ampl2omt.conversion import ConversionOptions, convert, convert_string, output_format, NL_FORMAT, \
+    SMTLIB_FORMAT, MPS_FORMAT
+
+
+def test_output_format():
+    assert output_format("out.nl") == NL_FORMAT
+    assert output_format("out.mps") == MPS_FORMAT
+    assert output_format("out.smt2") == SMTLIB_FORMAT
+    assert output_format("out.txt") == SMTLIB_FORMAT
+
+
+def test_options_from_dict():
+    assert ConversionOptions.from_dict({"daggify": True}) == ConversionOptions(daggify=True)
+    with pytest.raises(ValueError):
+        ConversionOptions.from_dict({"dagify": True})
+
+
+def test_convert_file(hs073_path, hs073, tmp_path):
+    output = str(tmp_path / "out.smt2")
+    result = convert(hs073_path, output, ConversionOptions(report=True))
+    assert result.paths == [output]
+    assert len(result.messages) == 1
+    with open(output) as f:
+        assert f.read() == convert_string(hs073, SMTLIB_FORMAT, ConversionOptions()).output
+
+
+def test_convert_split_objectives(hs073_path, tmp_path):
+    result = convert(hs073_path, str(tmp_path / "out.smt2"), ConversionOptions(split_objectives="split"))
+    assert result.paths == [str(tmp_path / "out.preamble.smt2"), str(tmp_path / "out.obj0.smt2")]
+
+
+def test_convert_string_formats(hs073):
+    assert convert_string(hs073, NL_FORMAT, ConversionOptions()).output.startswith("g3")
+    with pytest.raises(ValueError):
+        convert_string(hs073, "pdf", ConversionOptions())
+    with pytest.raises(ValueError):
+        convert_string(hs073, SMTLIB_FORMAT, ConversionOptions(decompose=True))
+
+
+def test_convert_string_canonical(hs073):
+    output = convert_string(hs073, SMTLIB_FORMAT, ConversionOptions(canonical=True, daggify=True)).output
+    assert output == convert_string(hs073, SMTLIB_FORMAT, ConversionOptions(canonical=True, daggify=True)).output
+    assert "(check-sat)" in output
+
+
+def test_convert_out_of_core(hs073_path, hs073, tmp_path):
+    output = str(tmp_path / "out.smt2")
+    options = ConversionOptions(daggify=True, report=True, out_of_core=str(tmp_path))
+    result = convert(hs073_path, output, options)
+    assert result.paths == [output]
+    assert result.messages == convert_string(hs073, SMTLIB_FORMAT, ConversionOptions(report=True)).messages
+    with open(output) as f:
+        assert f.read() == convert_string(hs073, SMTLIB_FORMAT, ConversionOptions(daggify=True)).output
+    # the store is removed once the conversion is done
+    assert os.listdir(tmp_path) == ["out.smt2"]
+    with pytest.raises(ValueError):
+        convert(hs073_path, str(tmp_path / "out.nl"), ConversionOptions(out_of_core=str(tmp_path)))
+    with pytest.raises(ValueError):
+        convert(hs073_path, output, ConversionOptions(fbbt=True, out_of_core=str(tmp_path)))
@@ -0,0 +1,119 @@
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from ampl2omt import cli
+from ampl2omt.client import ConversionClient, is_loopback, parse_address, LOCALHOST, SERVER_ENV
+from ampl2omt.conversion import ConversionOptions, convert_string, SMTLIB_FORMAT, NL_FORMAT
+from ampl2omt.server import ConversionServer, run_job
+
+
+def test_parse_address():
+    assert parse_address("localhost:8000") == ("localhost", 8000)
+    assert parse_address(":8000") == (LOCALHOST, 8000)
+    assert parse_address("/tmp/ampl2omt.sock") == "/tmp/ampl2omt.sock"
+    assert parse_address("./a:1") == "./a:1"
+
+
+def test_loopback_only():
+    assert is_loopback("localhost") and is_loopback(LOCALHOST) and is_loopback("::1")
+    assert not is_loopback("0.0.0.0") and not is_loopback("192.168.1.1") and not is_loopback("example.com")
+    with pytest.raises(ValueError, match="non-loopback"):
+        ConversionServer("0.0.0.0:0", workers=1)
+
+
+def test_run_job_errors():
+    assert not run_job({})["ok"]
+    assert "Unknown conversion option" in run_job({"data": "", "options": {"dagify": True}})["error"]
+    assert "FileNotFoundError" in run_job({"input": "missing.nl", "output": "out.smt2"})["error"]
+
+
+@pytest.fixture(params=["unix", "tcp"])
+def server(request, tmp_path):
+    address = str(tmp_path / "server.sock") if request.param == "unix" else ":0"
+    with ConversionServer(address, workers=2) as server:
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        yield server
+        server.shutdown()
+        thread.join()
+
+
+def test_convert_string(server, hs073):
+    client = ConversionClient(server.address)
+    result = client.convert_string(hs073, NL_FORMAT, ConversionOptions())
+    assert result.output == convert_string(hs073, NL_FORMAT, ConversionOptions()).output
+
+
+def test_convert_file(server, hs073_path, hs073, tmp_path):
+    client = ConversionClient(server.address)
+    output = tmp_path / "out.smt2"
+    result = client.convert(hs073_path, str(output), ConversionOptions(report=True))
+    assert result.paths == [str(output)]
+    assert len(result.messages) == 1
+    assert output.read_text() == convert_string(hs073, SMTLIB_FORMAT, ConversionOptions()).output
+
+
+def test_concurrent_jobs(server, hs073):
+    client = ConversionClient(server.address)
+    outputs = [None] * 8
+
+    def job(i):
+        outputs[i] = client.convert_string(hs073).output
+
+    threads = [threading.Thread(target=job, args=(i,)) for i in range(len(outputs))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(set(outputs)) == 1 and outputs[0] is not None
+
+
+def test_failed_job(server):
+    with pytest.raises(ValueError, match="Invalid header"):
+        ConversionClient(server.address).convert_string("")
+
+
+def test_client_does_not_import_the_converter():
+    # the command line delegating to a server must not pay for importing the converter
+    code = "import sys, ampl2omt.cli; print(sorted({'ampl2omt.conversion', 'numpy'} & set(sys.modules)))"
+    assert subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout == "[]\n"
+
+
+def test_no_server(tmp_path):
+    with pytest.raises(OSError):
+        ConversionClient(str(tmp_path / "none.sock")).convert_string("")
+
+
+def test_busy(tmp_path):
+    with ConversionServer(str(tmp_path / "server.sock"), workers=1, max_pending=1) as server:
+        server._pending.acquire()
+        assert "busy" in server.submit({"data": ""})["error"]
+        server._pending.release()
+
+
+def test_cli_falls_back_when_busy(tmp_path, hs073_path, hs073, monkeypatch):
+    output = tmp_path / "out.smt2"
+    with ConversionServer(str(tmp_path / "server.sock"), workers=1, max_pending=1) as server:
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        server._pending.acquire()
+        monkeypatch.setenv(SERVER_ENV, server.address)
+        monkeypatch.setattr(sys, "argv", ["ampl2omt", hs073_path, str(output)])
+        with pytest.raises(ConnectionRefusedError):
+            ConversionClient(server.address).convert_string(hs073)
+        cli.main()
+        server._pending.release()
+        server.shutdown()
+        thread.join()
+    assert output.read_text() == convert_string(hs073, SMTLIB_FORMAT, ConversionOptions()).output
+
+
+def test_cli_reports_failed_jobs(server, tmp_path, monkeypatch):
+    monkeypatch.setenv(SERVER_ENV, server.address)
+    monkeypatch.setattr(sys, "argv", ["ampl2omt", str(tmp_path / "missing.nl"), str(tmp_path / "out.smt2")])
+    with pytest.raises(SystemExit) as e:
+        cli.main()
+    assert e.value.code.startswith("ampl2omt: error: FileNotFoundError")
@@ -0,0 +1,140 @@
+import gzip
+import io
+import lzma
+import os
+import sys
+
+import pytest
+
+from ampl2omt.conversion import ConversionOptions, convert, convert_string, output_format, NL_FORMAT, SMTLIB_FORMAT
+from ampl2omt.parsing.nlparser import NLParser
+from ampl2omt.parsing.stream import LineStream
+from ampl2omt.streams import open_input, open_output, compression_of, split_extension, strip_compression, GZIP, \
+    XZ, ZSTD, COMPRESSIONS
+
+BASE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_parser")
+EXTENSION = {GZIP: ".gz", XZ: ".xz", ZSTD: ".zst"}
+
+
+@pytest.fixture
+def hs073():
+    with open(os.path.join(BASE_DIR, "hs073.nl")) as f:
+        return f.read()
+
+
+@pytest.fixture(params=COMPRESSIONS)
+def compression(request):
+    if request.param == ZSTD:
+        pytest.importorskip("zstandard")
+    return request.param
+
+
+def test_paths():
+    assert compression_of("out.smt2.gz") == GZIP
+    assert compression_of("out.smt2") is None
+    assert split_extension("dir.v1/out.smt2.zst") == ("dir.v1/out", ".smt2.zst")
+    assert split_extension("out.smt2") == ("out", ".smt2")
+    assert strip_compression("in.nl.xz") == "in.nl"
+    assert output_format("out.nl.gz") == NL_FORMAT
+    assert output_format("-") == SMTLIB_FORMAT
+
+
+def test_round_trip(compression, tmp_path):
+    path = str(tmp_path / f"out.txt{EXTENSION[compression]}")
+    with open_output(path) as f:
+        f.write("hello\nworld\n")
+    with open(path, "rb") as f:
+        assert not f.read().startswith(b"hello")
+    # the compression is detected from the content, not from the extension
+    os.rename(path, tmp_path / "out.txt")
+    with open_input(str(tmp_path / "out.txt")) as f:
+        assert f.read() == "hello\nworld\n"
+
+
+def test_known_formats(tmp_path):
+    (tmp_path / "a.gz").write_bytes(gzip.compress(b"gzip"))
+    (tmp_path / "a.xz").write_bytes(lzma.compress(b"xz"))
+    for name, content in (("a.gz", "gzip"), ("a.xz", "xz")):
+        with open_input(str(tmp_path / name)) as f:
+            assert f.read() == content
+
+
+def test_stdio(monkeypatch):
+    stdin = io.TextIOWrapper(io.BufferedReader(io.BytesIO(gzip.compress(b"from stdin\n"))))
+    monkeypatch.setattr(sys, "stdin", stdin)
+    with open_input("-") as f:
+        assert f.read() == "from stdin\n"
+    assert not stdin.closed
+
+    stdout = io.TextIOWrapper(io.BytesIO())
+    monkeypatch.setattr(sys, "stdout", stdout)
+    print("before")
+    with open_output("-", GZIP) as f:
+        f.write("to stdout\n")
+    assert not stdout.closed
+    data = stdout.buffer.getvalue()
+    assert data.startswith(b"before\n")
+    assert gzip.decompress(data[len("before\n"):]) == b"to stdout\n"
+
+
+def test_parse_compressed(mgr, hs073, tmp_path):
+    path = tmp_path / "hs073.nl.xz"
+    path.write_bytes(lzma.compress(hs073.encode()))
+    parser = NLParser(mgr)
+    assert parser.parse_file(str(path)).constraints == parser.parse_string(hs073).constraints
+    os.rename(path, tmp_path / "hs073.xz")
+    with pytest.raises(ValueError):
+        parser.parse_file(str(tmp_path / "hs073.xz"))
+
+
+def test_peek_non_seekable():
+    class Pipe(io.StringIO):
+        def seekable(self):
+            return False
+
+        def tell(self):
+            raise io.UnsupportedOperation
+
+    stream = LineStream(Pipe("a\nb\n"))
+    assert stream.peek() == "a"
+    assert stream.next_line() == "a"
+    assert stream.next_line() == "b"
+
+
+def test_convert_compressed(hs073, tmp_path):
+    path = tmp_path / "hs073.nl.gz"
+    path.write_bytes(gzip.compress(hs073.encode()))
+    output = str(tmp_path / "out.smt2.xz")
+    assert convert(str(path), output, ConversionOptions()).paths == [output]
+    with lzma.open(output, "rt") as f:
+        assert f.read() == convert_string(hs073, SMTLIB_FORMAT, ConversionOptions()).output
+
+
+def test_convert_decompose_compressed(hs073, tmp_path):
+    path = tmp_path / "hs073.nl"
+    path.write_text(hs073)
+    paths = convert(str(path), str(tmp_path / "out.smt2.gz"), ConversionOptions(decompose=True)).paths
+    assert paths and all(p.endswith(".smt2.gz") and os.path.basename(p).startswith("out.") for p in paths)
+
+
+def test_convert_split_compressed(hs073, tmp_path):
+    path = tmp_path / "hs073.nl"
+    path.write_text(hs073)
+    paths = convert(str(path), str(tmp_path / "out.smt2"),
+                    ConversionOptions(split_objectives="split", compress=GZIP)).paths
+    assert paths == [str(tmp_path / "out.preamble.smt2"), str(tmp_path / "out.obj0.smt2")]
+    # concatenated gzip members decompress to the complete script
+    with open(paths[0], "rb") as f, open(paths[1], "rb") as g:
+        script = gzip.decompress(f.read() + g.read()).decode()
+    assert script == convert_string(hs073, SMTLIB_FORMAT, ConversionOptions()).output
+
+
+def test_convert_stdout(hs073, tmp_path, monkeypatch):
+    path = tmp_path / "hs073.nl"
+    path.write_text(hs073)
+    stdout = io.TextIOWrapper(io.BytesIO())
+    monkeypatch.setattr(sys, "stdout", stdout)
+    convert(str(path), "-", ConversionOptions(format=NL_FORMAT))
+    assert stdout.buffer.getvalue().decode().startswith("g3")
+    with pytest.raises(ValueError):
+        convert(str(path), "-", ConversionOptions(decompose=True))
@@ -0,0 +1,91 @@
+import pytest
+
+from ampl2omt.analysis.interval import Interval
+from ampl2omt.problem.objective import Objective
+from ampl2omt.problem.problem import NLPProblem
+from ampl2omt.transform.cuts import TangentCuts, GUESS_POINT, MIDPOINT_POINT, SAMPLE_POINT
+
+pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def x(mgr):
+    return [mgr.VarReal(f"x{i}") for i in range(3)]
+
+
+def disk(mgr, x, **kwargs):
+    # x0^2 + x1^2 <= 4, 0 <= x0 <= 2
+    return NLPProblem(
+        variables=x[:2],
+        objectives=[Objective(Objective.MAXIMIZE, mgr.Plus(x[0], x[1]))],
+        constraints=[
+            mgr.Le(mgr.Plus(mgr.Pow(x[0], mgr.Real(2)), mgr.Pow(x[1], mgr.Real(2))), mgr.Real(4)),
+            mgr.Ge(x[0], mgr.Real(0)),
+            mgr.Le(x[0], mgr.Real(2)),
+        ],
+        **kwargs)
+
+
+def test_tangent_cuts(mgr, x):
+    problem = disk(mgr, x, primal_initial_guess={0: 1., 1: 1.})
+    cuts = TangentCuts(mgr, n_cuts=1, tol=0.).cuts(problem)
+    # at (1, 1): 2 + 2 (x0 - 1) + 2 (x1 - 1) - 4 <= 0
+    assert cuts == [mgr.Le(mgr.Sum([mgr.Mult(mgr.Real(2.), x[0]), mgr.Mult(mgr.Real(2.), x[1])]), mgr.Real(6.))]
+
+
+def test_cuts_are_valid(mgr, x):
+    problem = disk(mgr, x)
+    cuts = TangentCuts(mgr, n_cuts=5, points=[SAMPLE_POINT]).cuts(problem)
+    assert len(cuts) == 5
+    # every point of the disk satisfies the cuts
+    check = NLPProblem(variables=x[:2], objectives=[], constraints=cuts)
+    for p in [(2., 0.), (0., 2.), (0., -2.), (2 ** 0.5, 2 ** 0.5), (1., 0.)]:
+        assert max(check.compile_constraints()(p)) == 0.
+
+
+def test_concave_ge_constraint(mgr, x):
+    problem = NLPProblem(
+        variables=x[:2],
+        objectives=[],
+        constraints=[mgr.Ge(mgr.Log(x[0]), x[1])],
+        primal_initial_guess={0: 1.})
+    cuts = TangentCuts(mgr, n_cuts=1, tol=0.).cuts(problem)
+    # log(x0) - x1 >= 0 at (1, 0): x0 - 1 - x1 >= 0, i.e. -x0 + x1 <= -1
+    assert cuts == [mgr.Le(mgr.Sum([mgr.Mult(mgr.Real(-1.), x[0]), mgr.Mult(mgr.Real(1.), x[1])]), mgr.Real(-1.))]
+
+
+def test_no_cuts(mgr, x):
+    problem = NLPProblem(
+        variables=x[:2],
+        objectives=[],
+        constraints=[
+            # affine
+            mgr.Le(mgr.Plus(x[0], x[1]), mgr.Real(1)),
+            # concave body in <= form: the feasible set is not convex
+            mgr.Le(mgr.Neg(mgr.Pow(x[0], mgr.Real(2))), x[1]),
+            # unknown curvature
+            mgr.Le(mgr.Sin(x[0]), x[1]),
+        ])
+    assert TangentCuts(mgr).cuts(problem) == []
+
+
+def test_undefined_point_skipped(mgr, x):
+    problem = NLPProblem(variables=x[:2], objectives=[], constraints=[mgr.Ge(mgr.Sqrt(x[0]), x[1])])
+    # the guess 0 is at the boundary of the domain of sqrt, where its derivative is infinite
+    assert TangentCuts(mgr, n_cuts=1, points=[GUESS_POINT]).cuts(problem) == []
+
+
+def test_cut_points(mgr, x):
+    problem = disk(mgr, x, primal_initial_guess={0: 5., 1: 1.})
+    bounds = {x[0]: Interval(0., 2.), x[1]: Interval(-2., 2.)}
+    generator = TangentCuts(mgr, n_cuts=4, points=[GUESS_POINT, MIDPOINT_POINT, SAMPLE_POINT])
+    points = generator.cut_points(problem, bounds)
+    assert len(points) == 4
+    # the guess is clamped to the bounds
+    assert points[:2] == [[2., 1.], [1., 0.]]
+    assert all(0 <= p[0] <= 2 and -2 <= p[1] <= 2 for p in points)
+
+
+def test_unknown_strategy(mgr):
+    with pytest.raises(ValueError):
+        TangentCuts(mgr, points=["vertex"])
@@ -0,0 +1,113 @@
+import math
+
+import pytest
+
+from ampl2omt.problem.objective import Objective
+from ampl2omt.problem.problem import NLPProblem
+from ampl2omt.transform.normalize import Normalizer, POW_RULE, ABS_RULE
+from ampl2omt.writing.smtlibwriter import SmtlibWriter
+
+
+@pytest.fixture
+def x(mgr):
+    return [mgr.VarReal(f"x{i}") for i in range(3)]
+
+
+@pytest.fixture
+def normalizer(mgr):
+    return Normalizer(mgr)
+
+
+def test_pow_to_multiplication_chain(mgr, normalizer, x):
+    x2 = mgr.Mult(x[0], x[0])
+    assert normalizer.rewrite(mgr.Pow(x[0], mgr.Real(2))) == x2
+    assert normalizer.rewrite(mgr.Pow(x[0], mgr.Real(5))) == mgr.Mult(mgr.Mult(x2, x2), x[0])
+    assert normalizer.rewrite(mgr.Pow(x[0], mgr.Real(-1))) == mgr.Div(mgr.Real(1), x[0])
+    assert normalizer.rewrite(mgr.Pow(x[0], mgr.Real(0))) == mgr.Real(1)
+
+
+def test_pow_left_alone(mgr, normalizer, x):
+    for term in [mgr.Pow(x[0], mgr.Real(0.5)), mgr.Pow(x[0], x[1]), mgr.Pow(x[0], mgr.Real(100))]:
+        assert normalizer.rewrite(term) == term
+
+
+def test_sqrt(mgr, normalizer, x):
+    assert normalizer.rewrite(mgr.Sqrt(mgr.Real(4))) == mgr.Real(2)
+    y = normalizer.rewrite(mgr.Sqrt(x[0]))
+    assert normalizer.variables == [y]
+    assert normalizer.constraints == [mgr.Ge(y, mgr.Real(0)), mgr.Eq(mgr.Mult(y, y), x[0])]
+
+
+def test_conditional_sqrt_left_alone(mgr, normalizer, x):
+    # the global constraint y * y = x would force x >= 0, which the ite does not
+    guarded = mgr.If(mgr.Ge(x[0], mgr.Real(0)), mgr.Sqrt(x[0]), mgr.Real(0))
+    assert normalizer.rewrite(guarded) == guarded
+    either = mgr.Or(mgr.Le(x[1], mgr.Real(0)), mgr.Le(mgr.Sqrt(x[1]), mgr.Real(1)))
+    assert normalizer.rewrite(either) == either
+    assert normalizer.rewrite(mgr.Sqrt(mgr.Real(-1))) == mgr.Sqrt(mgr.Real(-1))
+    assert normalizer.variables == [] and normalizer.constraints == []
+    # the condition of an ite is always evaluated
+    y = normalizer.rewrite(mgr.If(mgr.Ge(mgr.Sqrt(x[2]), mgr.Real(1)), x[0], x[1])).children[0].children[0]
+    assert normalizer.variables == [y]
+
+
+def test_log10(mgr, normalizer, x):
+    assert normalizer.rewrite(mgr.Log10(x[0])) == mgr.Div(mgr.Log(x[0]), mgr.Real(math.log(10)))
+
+
+def test_abs(mgr, normalizer, x):
+    assert normalizer.rewrite(mgr.Abs(x[0])) == mgr.If(mgr.Ge(x[0], mgr.Real(0)), x[0], mgr.Neg(x[0]))
+
+
+def test_min_max(mgr, normalizer, x):
+    min01 = mgr.If(mgr.Le(x[0], x[1]), x[0], x[1])
+    assert normalizer.rewrite(mgr.Min(x)) == mgr.If(mgr.Le(min01, x[2]), min01, x[2])
+    assert normalizer.rewrite(mgr.Max(x[:2])) == mgr.If(mgr.Ge(x[0], x[1]), x[0], x[1])
+
+
+def test_min_max_size(mgr, normalizer):
+    args = [mgr.VarReal(f"y{i}") for i in range(20)]
+    expanded = SmtlibWriter().term_to_string(normalizer.rewrite(mgr.Min(args)), daggify=False)
+    # about 4K characters, where a chain of ites, doubling at each argument, takes about 10M
+    assert len(expanded) < 10_000
+
+
+def test_neg_of_constants(mgr, normalizer, x):
+    assert normalizer.rewrite(mgr.Neg(mgr.Real(2))) == mgr.Real(-2)
+    assert normalizer.rewrite(mgr.Minus(mgr.Real(2), mgr.Real(3))) == mgr.Real(-1)
+    assert normalizer.rewrite(mgr.Neg(x[0])) == mgr.Neg(x[0])
+
+
+def test_nested_rewrites(mgr, normalizer, x):
+    term = mgr.Abs(mgr.Pow(mgr.Neg(mgr.Real(2)), mgr.Real(2)))
+    square = mgr.Mult(mgr.Real(-2), mgr.Real(-2))
+    assert normalizer.rewrite(term) == mgr.If(mgr.Ge(square, mgr.Real(0)), square, mgr.Neg(square))
+
+
+def test_selected_rules(mgr, x):
+    normalizer = Normalizer(mgr, [ABS_RULE])
+    term = mgr.Abs(mgr.Pow(x[0], mgr.Real(2)))
+    power = mgr.Pow(x[0], mgr.Real(2))
+    assert normalizer.rewrite(term) == mgr.If(mgr.Ge(power, mgr.Real(0)), power, mgr.Neg(power))
+    assert Normalizer(mgr, [POW_RULE]).rewrite(term) == mgr.Abs(mgr.Mult(x[0], x[0]))
+
+
+def test_unknown_rule(mgr):
+    with pytest.raises(ValueError):
+        Normalizer(mgr, ["foo"])
+
+
+def test_normalize_problem(mgr, normalizer, x):
+    shared = mgr.Sqrt(x[0])
+    problem = NLPProblem(
+        variables=x[:2],
+        objectives=[Objective(Objective.MINIMIZE, mgr.Plus(shared, x[1]))],
+        constraints=[mgr.Le(shared, mgr.Real(2))])
+    normalized = normalizer.normalize(problem)
+    y = mgr.VarReal("aux_sqrt_0")
+    assert normalized.variables == x[:2] + [y]
+    assert normalized.objectives == [Objective(Objective.MINIMIZE, mgr.Plus(y, x[1]))]
+    assert normalized.constraints == [mgr.Le(y, mgr.Real(2)), mgr.Ge(y, mgr.Real(0)),
+                                      mgr.Eq(mgr.Mult(y, y), x[0])]
+    # the original problem is left untouched
+    assert problem.constraints == [mgr.Le(shared, mgr.Real(2))]
@@ -0,0 +1,110 @@
+import math
+
+import pytest
+
+from ampl2omt.analysis.degree import classify
+from ampl2omt.analysis.interval import Interval
+from ampl2omt.problem.objective import Objective
+from ampl2omt.problem.problem import NLPProblem
+from ampl2omt.term import types
+from ampl2omt.transform.pwl import PiecewiseLinearizer, breakpoints
+
+
+@pytest.fixture
+def x(mgr):
+    return [mgr.VarReal(f"x{i}") for i in range(3)]
+
+
+def test_breakpoints():
+    assert breakpoints(lambda t: 2 * t + 1, 0., 10., 1e-6, 64) == [0., 10.]
+    points = breakpoints(math.exp, 0., 2., 1e-3, 64)
+    assert points[0] == 0. and points[-1] == 2.
+    assert points == sorted(points)
+    for a, b in zip(points, points[1:]):
+        m = (a + b) / 2
+        assert abs((math.exp(a) + math.exp(b)) / 2 - math.exp(m)) <= 1e-3
+    assert len(breakpoints(math.exp, 0., 2., 1e-12, 8)) == 9
+    assert breakpoints(math.exp, 1., 1., 1e-3, 8) == [1.]
+
+
+def test_linearize(mgr, x):
+    shared = mgr.Exp(x[0])
+    problem = NLPProblem(
+        variables=x[:2],
+        objectives=[Objective(Objective.MINIMIZE, mgr.Plus(shared, x[1]))],
+        constraints=[
+            mgr.Ge(x[0], mgr.Real(0)),
+            mgr.Le(x[0], mgr.Real(2)),
+            mgr.Le(shared, mgr.Mult(mgr.Real(3), x[1])),
+        ])
+    assert classify(problem).logic == "QF_NRAT"
+    linearized = PiecewiseLinearizer(mgr, error=1e-2).linearize(problem)
+    assert classify(linearized).logic == "QF_LRA"
+    # the shared node is encoded once, by a single fresh variable
+    y, = linearized.variables[2:]
+    assert linearized.objectives[0].term == mgr.Plus(y, x[1])
+    assert linearized.constraints[2] == mgr.Le(y, mgr.Mult(mgr.Real(3), x[1]))
+    disjunction = linearized.constraints[-1]
+    assert disjunction.term_type.id == types.ORN
+    # the argument bounds are already constraints of the problem
+    assert len(linearized.constraints) == 4
+
+
+def test_approximation_error(mgr, x):
+    problem = NLPProblem(variables=x[:1], objectives=[Objective(Objective.MINIMIZE, mgr.Sin(x[0]))], constraints=[])
+    bounds = {x[0]: Interval(-3., 3.)}
+    linearized = PiecewiseLinearizer(mgr, error=1e-3, max_segments=256, bounds=bounds).linearize(problem)
+    y = linearized.objectives[0].term
+    assert y == linearized.variables[-1]
+    # each segment is the chord of sin on [a, b], within the error bound, and the segments cover [-3, 3]
+    disjunction = linearized.constraints[-1]
+    ends = []
+    for segment in disjunction.children:
+        lower, upper, line = segment.children
+        a, b = lower.children[1].payload, upper.children[1].payload
+        mult, constant = line.children[1].children
+        slope, intercept = mult.children[0].payload, constant.payload
+        for i in range(11):
+            t = a + (b - a) * i / 10
+            assert abs(slope * t + intercept - math.sin(t)) <= 1e-3
+        ends.append((a, b))
+    assert ends[0][0] == -3. and ends[-1][1] == 3.
+    assert all(b == c for (_, b), (c, _) in zip(ends, ends[1:]))
+
+
+def test_argument_bound_to_variable(mgr, x):
+    arg = mgr.Plus(x[0], x[1])
+    problem = NLPProblem(variables=x[:2], objectives=[Objective(Objective.MINIMIZE, mgr.Log(arg))], constraints=[])
+    linearizer = PiecewiseLinearizer(mgr, bounds={x[0]: Interval(1., 2.), x[1]: Interval(0., 1.)})
+    linearized = linearizer.linearize(problem)
+    t, y = linearized.variables[2:]
+    assert mgr.Eq(t, arg) in linearized.constraints
+    lower, = [c for c in linearized.constraints if c.term_type.id == types.GE and c.children[0] == t]
+    assert lower.children[1].payload == pytest.approx(1.)
+    assert linearized.objectives[0].term == y
+
+
+@pytest.mark.parametrize("build, bounds", [
+    # unbounded argument
+    (lambda m, a: m.Exp(a), None),
+    # outside the domain
+    (lambda m, a: m.Log(a), Interval(0., 1.)),
+    (lambda m, a: m.Pow(a, m.Real(0.5)), Interval(-1., 1.)),
+    # across an asymptote
+    (lambda m, a: m.Tan(a), Interval(1., 2.)),
+    # not transcendental
+    (lambda m, a: m.Pow(a, m.Real(3)), Interval(0., 1.)),
+])
+def test_left_alone(mgr, x, build, bounds):
+    term = build(mgr, x[0])
+    problem = NLPProblem(variables=x[:1], objectives=[Objective(Objective.MINIMIZE, term)], constraints=[])
+    linearized = PiecewiseLinearizer(mgr, bounds={x[0]: bounds} if bounds else {}).linearize(problem)
+    assert linearized.objectives[0].term == term
+    assert linearized.variables == x[:1]
+
+
+def test_constants_folded(mgr, x):
+    objective = Objective(Objective.MINIMIZE, mgr.Plus(x[0], mgr.Exp(mgr.Real(1))))
+    problem = NLPProblem(variables=x[:1], objectives=[objective], constraints=[])
+    linearized = PiecewiseLinearizer(mgr).linearize(problem)
+    assert linearized.objectives[0].term == mgr.Plus(x[0], mgr.Real(math.e))
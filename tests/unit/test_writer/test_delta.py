@@ -0,0 +1,138 @@
+import os
+import time
+
+import pytest
+
+from ampl2omt.parsing.nlparser import NLParser
+from ampl2omt.problem.objective import Objective
+from ampl2omt.problem.problem import NLPProblem
+from ampl2omt.term.manager import TermManager
+from ampl2omt.writing.delta import DeltaConverter
+
+HS085 = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_parser", "hs085.nl")
+
+
+@pytest.fixture
+def nl():
+    with open(HS085) as f:
+        return f.read()
+
+
+@pytest.fixture
+def parser(mgr):
+    return NLParser(mgr)
+
+
+def test_unchanged(mgr, parser, writer, nl):
+    problem = parser.parse_string(nl)
+    assert DeltaConverter(mgr, problem, writer).convert() == writer.to_smtlib(problem)
+
+
+def test_var_bounds(mgr, parser, writer, nl):
+    problem = parser.parse_string(nl)
+    converter = DeltaConverter(mgr, problem, writer)
+    # x0 fixed, x2 unbounded, x4 bounded above only
+    variant = nl.replace("0 704.4148 906.3855\n", "4 800\n") \
+        .replace("0 0 134.75\n", "3\n") \
+        .replace("0 25 84.1988\n", "1 50.5\n")
+    expected = writer.to_smtlib(parser.parse_string(variant))
+    ranges = {0: (800., 800.), 2: (None, None), 4: (None, 50.5)}
+    assert converter.convert(var_ranges=ranges) == expected
+    # a full sequence of bounds
+    full = [(800, 800), (68.6, 288.88), (None, None), (193, 287.0966), (None, 50.5)]
+    assert converter.convert(var_ranges=full) == expected
+    # the problem itself is untouched
+    assert converter.convert() == writer.to_smtlib(problem)
+
+
+def test_cons_ranges(mgr, parser, writer, nl):
+    problem = parser.parse_string(nl)
+    converter = DeltaConverter(mgr, problem, writer)
+    # one range constraint more in the header
+    variant = nl.replace(" 5 38 1 0 0", " 5 38 1 1 0").replace("r\n2 17.505\n", "r\n0 17.5 18\n")
+    expected = writer.to_smtlib(parser.parse_string(variant))
+    assert converter.convert(cons_ranges={0: (17.5, 18)}) == expected
+    assert converter.variant(cons_ranges={0: (17.5, 18)}).constraints == parser.parse_string(variant).constraints
+
+
+def test_daggified_bodies(mgr, writer, x):
+    body = mgr.Plus(mgr.Exp(x[0]), mgr.Exp(x[0]))
+    problem = NLPProblem(
+        variables=x[:1],
+        objectives=[Objective(Objective.MINIMIZE, x[0])],
+        constraints=[mgr.Le(body, mgr.Real(3.))],
+        var_ranges={0: (None, None)},
+        cons_bodies={0: body},
+        cons_ranges={0: (None, 3.)},
+    )
+    for daggify in (False, True):
+        converter = DeltaConverter(mgr, problem, writer, daggify=daggify)
+        assert converter.convert() == writer.to_smtlib(problem, daggify=daggify)
+        ranges = {0: (1., 2.)}
+        assert (converter.convert(cons_ranges=ranges) ==
+                writer.to_smtlib(converter.variant(cons_ranges=ranges), daggify=daggify))
+        assert (converter.convert(var_ranges=ranges, cons_ranges=ranges) ==
+                writer.to_smtlib(converter.variant(var_ranges=ranges, cons_ranges=ranges), daggify=daggify))
+    assert "(let ((.def_0 (exp x0)))" in converter.convert()
+
+
+def test_canonical_equalities(writer):
+    mgr = TermManager(canonical=True)
+    x = mgr.VarReal("x0")
+    bound = mgr.Real(2.)
+    body = mgr.Exp(x)
+    problem = NLPProblem(
+        variables=[x],
+        objectives=[Objective(Objective.MINIMIZE, x)],
+        constraints=[mgr.Eq(x, mgr.Real(1.)), mgr.Eq(body, bound)],
+        var_ranges={0: (1., 1.)},
+        cons_bodies={0: body},
+        cons_ranges={0: (2., 2.)},
+    )
+    # the bound of the body was created first, and is on the left
+    assert problem.constraints[1].children == (bound, body)
+    converter = DeltaConverter(mgr, problem, writer)
+    assert converter.convert() == writer.to_smtlib(problem)
+    ranges = {0: (3., 3.)}
+    assert converter.convert(cons_ranges=ranges) == writer.to_smtlib(converter.variant(cons_ranges=ranges))
+
+
+def test_logic_follows_ranges(mgr, writer, x):
+    body = mgr.Mult(x[0], x[1])
+    problem = NLPProblem(
+        variables=x[:2],
+        objectives=[Objective(Objective.MINIMIZE, x[0])],
+        constraints=[],
+        var_ranges={0: (None, None), 1: (None, None)},
+        cons_bodies={0: body},
+        cons_ranges={0: (None, None)},
+    )
+    converter = DeltaConverter(mgr, problem, writer)
+    assert converter.convert().startswith("(set-logic QF_LRA)")
+    assert converter.convert(cons_ranges={0: (None, 1.)}).startswith("(set-logic QF_NRA)")
+
+
+def test_transformed_problem_rejected(mgr, parser, nl):
+    problem = parser.parse_string(nl)
+    problem.constraints = problem.constraints[1:]
+    with pytest.raises(ValueError):
+        DeltaConverter(mgr, problem)
+
+
+def test_unknown_range(mgr, parser, nl):
+    converter = DeltaConverter(mgr, parser.parse_string(nl))
+    with pytest.raises(ValueError):
+        converter.convert(var_ranges={5: (0., 1.)})
+
+
+def test_faster_than_full_conversion(mgr, parser, writer, nl):
+    problem = parser.parse_string(nl)
+    converter = DeltaConverter(mgr, problem, writer)
+    start = time.perf_counter()
+    for k in range(20):
+        converter.convert(var_ranges={4: (25., 80. + k)})
+    delta = time.perf_counter() - start
+    start = time.perf_counter()
+    for k in range(20):
+        writer.to_smtlib(converter.variant(var_ranges={4: (25., 80. + k)}))
+    assert delta < time.perf_counter() - start
@@ -0,0 +1,61 @@
+import dataclasses
+
+import pytest
+
+from ampl2omt.analysis.degree import classify
+from ampl2omt.problem.objective import Objective
+from ampl2omt.problem.problem import NLPProblem
+from ampl2omt.writing.fanout import write_per_objective, SPLIT_MODE
+
+
+@pytest.fixture
+def problem(mgr, x):
+    return NLPProblem(
+        variables=x[:2],
+        constraints=[mgr.Le(mgr.Plus(x[0], x[1]), mgr.Real(4))],
+        objectives=[Objective(Objective.MINIMIZE, mgr.Mult(x[0], x[1])), Objective(Objective.MAXIMIZE, x[0])],
+        primal_initial_guess={0: 1., 1: 2.},
+    )
+
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def single(problem, k):
+    return dataclasses.replace(problem, objectives=[problem.objectives[k]])
+
+
+def test_concat(writer, problem, tmp_path):
+    paths = write_per_objective(writer, problem, str(tmp_path / "out.smt2"))
+    assert paths == [str(tmp_path / "out.obj0.smt2"), str(tmp_path / "out.obj1.smt2")]
+    logic = classify(problem).logic
+    for k, path in enumerate(paths):
+        assert read(path) == writer.to_smtlib(single(problem, k), logic=logic)
+
+
+def test_split(writer, problem, tmp_path):
+    paths = write_per_objective(writer, problem, str(tmp_path / "out.smt2"), SPLIT_MODE)
+    assert paths == [str(tmp_path / "out.preamble.smt2"), str(tmp_path / "out.obj0.smt2"),
+                     str(tmp_path / "out.obj1.smt2")]
+    preamble = read(paths[0])
+    assert "(minimize" not in preamble and "(maximize" not in preamble
+    for k, path in enumerate(paths[1:]):
+        chunk = read(path)
+        assert "declare-fun" not in chunk
+        assert preamble + chunk == writer.to_smtlib(single(problem, k), logic="QF_NRA")
+
+
+def test_warm_start(writer, problem, tmp_path):
+    # the bound of each objective is safe in its own script, even if the problem has several objectives
+    paths = write_per_objective(writer, problem, str(tmp_path / "out.smt2"), warm_start=True)
+    assert "(assert (<= (* x0 x1) 2.000000002))" in read(paths[0])
+    assert "(assert (>= x0 0.999999999))" in read(paths[1])
+    for k, path in enumerate(paths):
+        assert read(path) == writer.to_smtlib(single(problem, k), logic="QF_NRA", warm_start=True)
+
+
+def test_unknown_mode(writer, problem, tmp_path):
+    with pytest.raises(ValueError):
+        write_per_objective(writer, problem, str(tmp_path / "out.smt2"), "symlink")
@@ -0,0 +1,122 @@
+import dataclasses
+import os
+
+import pytest
+
+from ampl2omt.parsing.nlparser import NLParser
+from ampl2omt.problem.objective import Objective
+from ampl2omt.problem.problem import NLPProblem
+from ampl2omt.writing.lpwriter import LpWriter
+
+HS073 = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_parser", "hs073.nl")
+
+
+@pytest.fixture
+def lp_writer():
+    return LpWriter()
+
+
+@pytest.fixture
+def hs073(mgr):
+    return NLParser(mgr).parse_file(HS073)
+
+
+@pytest.fixture
+def problem(mgr, x):
+    # maximize 2 x0 - x1 + 1 s.t. -1 <= x0 - x1 <= 1, x0 + x2 = 2, x0 free, x1 <= -1, 1 <= x2 <= 3, x3 integer
+    return NLPProblem(
+        variables=x[:3] + [mgr.VarInt("n")],
+        constraints=[
+            mgr.Ge(mgr.Minus(x[0], x[1]), mgr.Real(-1)),
+            mgr.Le(mgr.Minus(x[0], x[1]), mgr.Real(1)),
+            mgr.Eq(mgr.Plus(x[0], x[2]), mgr.Real(2)),
+            mgr.Le(x[1], mgr.Real(-1)),
+            mgr.Ge(x[2], mgr.Real(1)),
+            mgr.Le(x[2], mgr.Real(3)),
+        ],
+        objectives=[Objective(Objective.MAXIMIZE,
+                              mgr.Sum([mgr.Mult(mgr.Real(2), x[0]), mgr.Neg(x[1]), mgr.Real(1)]))],
+    )
+
+
+def test_mps(lp_writer, problem):
+    assert lp_writer.to_mps(problem, name="test") == """NAME test
+OBJSENSE
+    MAX
+ROWS
+ N  obj
+ G  c0
+ E  c1
+COLUMNS
+    x0 obj 2
+    x0 c0 1
+    x0 c1 1
+    x1 obj -1
+    x1 c0 -1
+    x2 c1 1
+    MARKER 'MARKER' 'INTORG'
+    n obj 0
+    MARKER 'MARKER' 'INTEND'
+RHS
+    RHS obj -1
+    RHS c0 -1
+    RHS c1 2
+RANGES
+    RNG c0 2
+BOUNDS
+ FR BND x0
+ MI BND x1
+ UP BND x1 -1
+ LO BND x2 1
+ UP BND x2 3
+ FR BND n
+ENDATA
+"""
+
+
+def test_lp(lp_writer, problem):
+    assert lp_writer.to_lp(problem, name="test") == """\\ Problem: test
+Maximize
+ obj: 2 x0 - 1 x1 + 1
+Subject To
+ c0_lo: 1 x0 - 1 x1 >= -1
+ c0_up: 1 x0 - 1 x1 <= 1
+ c1: 1 x0 + 1 x2 = 2
+Bounds
+ x0 free
+ -inf <= x1 <= -1
+ 1 <= x2 <= 3
+ n free
+General
+ n
+End
+"""
+
+
+def test_relax_nonlinear(lp_writer, hs073):
+    with pytest.raises(ValueError):
+        lp_writer.to_mps(hs073)
+    mps = lp_writer.to_mps(hs073, relax_nonlinear=True, name="hs073")
+    # the nonlinear constraint is dropped, the other two are kept
+    assert " G  c0\n E  c1\nCOLUMNS\n" in mps
+    assert "    x3 c0 1.3\n" in mps
+    assert " LO BND x3 0\n" in mps
+
+
+def test_relax_logical_constraints(mgr, lp_writer, problem, x):
+    disjunction = mgr.Or(mgr.Le(x[0], mgr.Real(0)), mgr.Ge(x[1], mgr.Real(2)))
+    extended = dataclasses.replace(problem, constraints=problem.constraints + [disjunction])
+    with pytest.raises(ValueError):
+        lp_writer.to_lp(extended)
+    with pytest.raises(ValueError):
+        lp_writer.to_mps(extended)
+    assert lp_writer.to_lp(extended, relax_nonlinear=True) == lp_writer.to_lp(problem)
+    assert lp_writer.to_mps(extended, relax_nonlinear=True) == lp_writer.to_mps(problem)
+
+
+def test_long_lp_rows(mgr, lp_writer):
+    x = [mgr.VarReal(f"x{i}") for i in range(200)]
+    problem = NLPProblem(variables=x, constraints=[mgr.Le(mgr.Sum(x), mgr.Real(1))], objectives=[])
+    lp = lp_writer.to_lp(problem)
+    assert max(map(len, lp.split("\n"))) < 510
+    assert lp.count("+ 1 x") == 199
@@ -0,0 +1,134 @@
+import os
+
+import pytest
+
+from ampl2omt.parsing.nlparser import NLParser
+from ampl2omt.problem.objective import Objective
+from ampl2omt.problem.problem import NLPProblem
+from ampl2omt.writing.nlwriter import NlWriter
+
+BASE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_parser")
+
+
+def read(name):
+    with open(os.path.join(BASE_DIR, name)) as f:
+        return f.read()
+
+
+@pytest.fixture
+def parser(mgr):
+    return NLParser(mgr)
+
+
+@pytest.fixture
+def nl_writer():
+    return NlWriter()
+
+
+@pytest.mark.parametrize("name", ["hs001", "hs073"])
+def test_same_as_ampl(parser, nl_writer, name):
+    nl = read(f"{name}.nl")
+    written = nl_writer.to_nl(parser.parse_string(nl), name)
+    # only the options in the first line differ
+    assert written.split("\n")[1:] == nl.split("\n")[1:]
+
+
+def test_round_trip_hs085(parser, nl_writer):
+    problem = parser.parse_string(read("hs085.nl"))
+    written = nl_writer.to_nl(problem)
+    header = written.split("\n")[:10]
+    assert header[2].startswith(" 35 1\t")
+    assert header[4].startswith(" 5 5 5\t")
+    assert header[7].startswith(" 119 5\t")
+    parsed = parser.parse_string(written)
+    assert nl_writer.to_nl(parsed) == written
+
+    np = pytest.importorskip("numpy")
+    lower, upper = [704.4148, 68.6, 0, 193, 25], [906.3855, 288.88, 134.75, 287.0966, 84.1988]
+    points = np.random.default_rng(0).uniform(lower, upper, size=(20, 5))
+    for point in points.tolist():
+        assert parsed.compile_objectives()(point) == pytest.approx(problem.compile_objectives()(point))
+        assert parsed.compile_constraints()(point) == pytest.approx(problem.compile_constraints()(point), abs=1e-6)
+
+
+def test_common_expressions(mgr, nl_writer, x):
+    shared = mgr.Sin(x[1])
+    problem = NLPProblem(
+        variables=x[:3],
+        constraints=[
+            mgr.Le(mgr.Plus(shared, x[0]), mgr.Real(1)),
+            mgr.Ge(mgr.Plus(x[0], shared), mgr.Real(-1)),
+            mgr.Ge(mgr.Mult(mgr.Cos(x[2]), mgr.Cos(x[2])), mgr.Real(0)),
+        ],
+        objectives=[Objective(Objective.MAXIMIZE, mgr.Plus(mgr.Mult(mgr.Real(2), shared), mgr.Real(3)))],
+    )
+    assert nl_writer.to_nl(problem, "test") == """g3 1 1 0\t# problem test
+ 3 2 1 1 0\t# vars, constraints, objectives, ranges, eqns
+ 2 1\t# nonlinear constraints, objectives
+ 0 0\t# network constraints: nonlinear, linear
+ 2 1 1\t# nonlinear vars in constraints, objectives, both
+ 0 0 0 1\t# linear network variables; functions; arith, flags
+ 0 0 0 0 0\t# discrete variables: binary, integer, nonlinear (b,c,o)
+ 3 1\t# nonzeros in Jacobian, gradients
+ 0 0\t# max name lengths: constraints, variables
+ 1 0 0 1 0\t# common exprs: b,c,o,c1,o1
+b
+3
+3
+3
+r
+0 -1 1
+2 0
+V3 0 0
+o41
+v0
+C0
+v3
+V4 0 2
+o46
+v1
+C1
+o2
+v4
+v4
+O0 1
+o0
+o2
+n2
+v3
+n3
+k2
+1
+2
+J0 2
+0 0
+2 1
+J1 1
+1 0
+G0 1
+0 0
+"""
+
+
+def test_variable_order(mgr, nl_writer, x):
+    problem = NLPProblem(
+        variables=x[:3],
+        constraints=[mgr.Le(mgr.Plus(x[0], mgr.Exp(x[2])), mgr.Real(1)), mgr.Ge(x[0], mgr.Real(0))],
+        objectives=[Objective(Objective.MINIMIZE, mgr.Plus(mgr.Pow(x[1], mgr.Real(2)), x[0]))],
+        primal_initial_guess={0: 1., 1: 2., 2: 3.},
+    )
+    written = nl_writer.to_nl(problem)
+    # x2 is nonlinear in the constraints, x1 in the objectives and x0 is linear
+    assert " 1 2 0\t# nonlinear vars in constraints, objectives, both" in written
+    assert "b\n3\n3\n2 0\nx3\n0 3\n1 2\n2 1\n" in written
+    parsed = NLParser(mgr).parse_string(written)
+    point = [1.5, -0.5, 0.25]
+    permuted = [point[2], point[1], point[0]]
+    assert parsed.compile_objectives()(permuted) == problem.compile_objectives()(point)
+    assert sorted(parsed.compile_constraints()(permuted)) == sorted(problem.compile_constraints()(point))
+
+
+def test_unsupported_constraint(mgr, nl_writer, x):
+    problem = NLPProblem(variables=x[:1], constraints=[mgr.OrN([mgr.Le(x[0], mgr.Real(0))])], objectives=[])
+    with pytest.raises(ValueError):
+        nl_writer.to_nl(problem)
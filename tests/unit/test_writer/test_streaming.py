@@ -0,0 +1,71 @@
+import io
+import os
+
+import pytest
+
+from ampl2omt.analysis.degree import classify
+from ampl2omt.parsing.nlparser import NLParser
+from ampl2omt.progress import CancelToken, WRITE
+from ampl2omt.term.manager import TermManager
+from ampl2omt.term.store import MappedTermManager
+from ampl2omt.writing.streaming import StreamingSmtlibWriter
+from benchmarks.generators import deep_nested, huge_sum, shared_dag
+
+PARSER_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_parser")
+
+
+def _read(name):
+    with open(os.path.join(PARSER_DIR, name)) as f:
+        return f.read()
+
+
+@pytest.fixture
+def store_mgr(tmp_path):
+    with MappedTermManager(str(tmp_path)) as mgr:
+        yield mgr
+
+
+def _stream(problem, **kwargs):
+    out = io.StringIO()
+    StreamingSmtlibWriter().write(problem, out, **kwargs)
+    return out.getvalue()
+
+
+@pytest.mark.parametrize("text", [_read("hs073.nl"), _read("hs085.nl"), deep_nested(50), shared_dag(10)],
+                         ids=["hs073", "hs085", "deep", "shared"])
+@pytest.mark.parametrize("daggify", [False, True])
+def test_same_output_as_in_memory(text, daggify, store_mgr, writer):
+    expected = writer.to_smtlib(NLParser(TermManager()).parse_string(text), daggify=daggify)
+    problem = NLParser(store_mgr).parse_string(text)
+    assert _stream(problem, daggify=daggify) == expected
+    # the handles of the store work with the in-memory writer as well
+    assert writer.to_smtlib(problem, daggify=daggify) == expected
+
+
+def test_classify(store_mgr):
+    text = _read("hs085.nl")
+    problem = NLParser(store_mgr).parse_string(text)
+    report = StreamingSmtlibWriter().classify(problem)
+    assert report == classify(NLParser(TermManager()).parse_string(text))
+    # the report is cached on the problem, and shared with classify
+    assert classify(problem) is report
+
+
+def test_logic_and_progress(store_mgr):
+    problem = NLParser(store_mgr).parse_string(huge_sum(4000))
+    reports = []
+    output = _stream(problem, daggify=True, logic="ALL", progress=reports.append)
+    assert output.startswith("(set-logic ALL)")
+    assert len(reports) >= 2 and all(r.phase == WRITE for r in reports)
+    assert reports[-1].segments == reports[-1].total_segments
+    assert reports[-1].bytes <= len(output)
+    token = CancelToken()
+    token.cancel()
+    with pytest.raises(Exception, match="cancelled"):
+        _stream(problem, token=token)
+
+
+def test_rejects_in_memory_terms(mgr):
+    problem = NLParser(mgr).parse_string(_read("hs073.nl"))
+    with pytest.raises(ValueError):
+        _stream(problem)
@@ -63,7 +63,7 @@ def test_deeply_nested_to_string_dag(mgr, writer, x):
         )
     )
     assert (writer.term_to_string(term, daggify=True) ==
-            "(let ((.def_0 (* 2.0 x0))) (let ((.def_1 (* x0 x1))) (let ((.def_2 (+ .def_1 1.0))) (let ((.def_3 (+ .def_0 .def_2))) (let ((.def_4 (- x0))) (let ((.def_5 (* x0 x1))) (let ((.def_6 (+ .def_4 .def_5))) (let ((.def_7 (<= .def_3 .def_6))) .def_7))))))))")
+            "(let ((.def_0 (* 2.0 x0))) (let ((.def_1 (* x0 x1))) (let ((.def_2 (+ .def_1 1.0))) (let ((.def_3 (+ .def_0 .def_2))) (let ((.def_4 (- x0))) (let ((.def_5 (+ .def_4 .def_1))) (let ((.def_6 (<= .def_3 .def_5))) .def_6)))))))")
 
 
 def test_deeply_nested_to_string_no_dag(mgr, writer, x):
@@ -107,3 +107,83 @@ def test_to_smtlib(mgr, writer, x):
             "(maximize (* (+ x1 x2) x3))\n\n"
             "(check-sat)\n"
             "(get-objectives)")
+
+
+def test_to_smtlib_daggify(mgr, writer, x):
+    shared = mgr.Mult(x[0], x[1])
+    problem = NLPProblem(
+        variables=x[:2],
+        constraints=[mgr.Le(mgr.Plus(shared, shared), mgr.Real(1))],
+        objectives=[Objective(Objective.MINIMIZE, shared)],
+    )
+    script = writer.to_smtlib(problem, daggify=True)
+    assert "(assert (let ((.def_0 (* x0 x1))) (let ((.def_1 (+ .def_0 .def_0))) " in script
+    assert "(minimize (let ((.def_0 (* x0 x1))) .def_0))" in script
+    preamble, chunks = writer.to_smtlib_per_objective(problem, daggify=True)
+    assert preamble + chunks[0] == script
+
+
+def test_string_walker_shared_between_terms(mgr, writer, x):
+    shared = mgr.Mult(x[0], x[1])
+    walker = writer.string_walker()
+    assert writer.term_to_string(mgr.Plus(shared, x[2]), False, walker) == "(+ (* x0 x1) x2)"
+    assert shared in walker
+    assert writer.term_to_string(mgr.Neg(shared), False, walker) == "(- (* x0 x1))"
+
+
+def test_to_smtlib_linear_logic(mgr, writer, x):
+    problem = NLPProblem(
+        variables=x[:2],
+        constraints=[mgr.Le(mgr.Plus(x[0], x[1]), mgr.Real(1))],
+        objectives=[Objective(Objective.MAXIMIZE, x[0])],
+    )
+    assert writer.to_smtlib(problem).startswith("(set-logic QF_LRA)\n")
+
+
+def test_to_smtlib_explicit_logic(mgr, writer, x):
+    problem = NLPProblem(variables=x[:1], constraints=[mgr.Le(x[0], mgr.Real(1))], objectives=[])
+    assert writer.to_smtlib(problem, logic="QF_NRA").startswith("(set-logic QF_NRA)\n")
+
+
+def test_constant_to_string(writer):
+    assert writer.constant_to_string(2.5) == "2.5"
+    assert writer.constant_to_string(-2.5) == "(- 2.5)"
+    assert writer.constant_to_string(1e-10) == "0.0000000001"
+    assert writer.constant_to_string(-1.5e20) == "(- 150000000000000000000)"
+
+
+def test_warm_start(mgr, writer, x):
+    problem = NLPProblem(
+        variables=x[:2],
+        constraints=[mgr.Le(mgr.Plus(x[0], x[1]), mgr.Real(4))],
+        objectives=[Objective(Objective.MINIMIZE, mgr.Mult(x[0], x[1]))],
+        primal_initial_guess={0: 1., 1: 2.},
+    )
+    assert writer.declare_warm_start(problem, False) == "(assert (<= (* x0 x1) 2.000000002))"
+    assert "(assert (<= (* x0 x1) 2.000000002))\n\n(minimize" in writer.to_smtlib(problem, warm_start=True)
+    assert "2.000000002" not in writer.to_smtlib(problem)
+
+    problem.objectives = [Objective(Objective.MAXIMIZE, mgr.Mult(x[0], x[1]))]
+    assert writer.declare_warm_start(problem, False) == "(assert (>= (* x0 x1) 1.999999998))"
+
+
+def test_warm_start_infeasible_guess(mgr, writer, x):
+    problem = NLPProblem(
+        variables=x[:2],
+        constraints=[mgr.Le(mgr.Plus(x[0], x[1]), mgr.Real(1))],
+        objectives=[Objective(Objective.MINIMIZE, x[0])],
+        primal_initial_guess={0: 1., 1: 2.},
+    )
+    assert writer.declare_warm_start(problem, False) == ""
+    # missing guesses default to 0, which is feasible
+    problem.primal_initial_guess = {0: 1.}
+    assert writer.declare_warm_start(problem, False) == "(assert (<= x0 1.000000001))"
+
+
+def test_warm_start_multiple_objectives(mgr, writer, x):
+    problem = NLPProblem(
+        variables=x[:1],
+        constraints=[],
+        objectives=[Objective(Objective.MINIMIZE, x[0]), Objective(Objective.MAXIMIZE, x[0])],
+    )
+    assert writer.declare_warm_start(problem, False) == ""